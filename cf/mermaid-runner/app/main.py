@@ -1,12 +1,18 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
+import os
 from typing import Any, Dict, Optional
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
+from app.standin import CORS_HEADERS, KEY_HEADER, StandInConfig, handle_render, not_found
+
 app = FastAPI()
+standin = StandInConfig()
 
 
 class IngestPayload(BaseModel):
@@ -14,6 +20,10 @@ class IngestPayload(BaseModel):
     meta: Optional[Dict[str, Any]] = None
 
 
+def json_response(body: Dict[str, Any], status: int = 200, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    return JSONResponse(body, status_code=status, headers={**CORS_HEADERS, **(headers or {})})
+
+
 @app.get("/api/health")
 async def health() -> Dict[str, bool]:
     return {"ok": True}
@@ -28,3 +38,27 @@ async def ingest(payload: IngestPayload) -> Dict[str, Any]:
         "receivedChars": len(source),
         "sha256": digest,
     }
+
+
+@app.post("/render")
+async def render(request: Request) -> JSONResponse:
+    """Local stand-in for the Worker's POST /render, for load tests and CI benchmarks.
+
+    The contract, deterministic output and fault injection live in app/standin.py.
+    """
+    body = await request.body()
+    delay, status, payload, headers = handle_render(
+        body, request.headers.get(KEY_HEADER), os.environ.get("GEARY_KEY"), standin
+    )
+    if delay > 0:
+        await asyncio.sleep(delay)
+    return json_response(payload, status, headers)
+
+
+@app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"])
+async def fallback(request: Request, path: str) -> Response:
+    """Everything else answers as the Worker does: 204 to CORS preflights, otherwise 404 not_found."""
+    if request.method == "OPTIONS":
+        return Response(status_code=204, headers=CORS_HEADERS)
+    status, payload = not_found(request.method, request.url.path)
+    return json_response(payload, status)
@@ -0,0 +1,180 @@
+"""Framework-free core of the local /render stand-in served by app/main.py.
+
+Everything here is plain Python so the Worker contract, the deterministic output and the fault
+injection can be exercised without FastAPI installed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import html
+import json
+import os
+import random
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Same limit as the Worker (src/index.ts): request bodies over 200KB get 413.
+MAX_MERMAID_BYTES = 200 * 1024
+KEY_HEADER = "X-Geary-Key"
+CORS_HEADERS = {
+    "access-control-allow-origin": "*",
+    "access-control-allow-methods": "POST, OPTIONS",
+    "access-control-allow-headers": f"Content-Type, {KEY_HEADER}",
+    "access-control-max-age": "86400",
+}
+
+
+class StandInConfig:
+    """Fault injection for the stand-in, read from the environment.
+
+    STANDIN_LATENCY_MS      fixed delay added to every render (default 0)
+    STANDIN_JITTER_MS       extra uniform delay of up to this many ms (default 0)
+    STANDIN_ERROR_RATE      share of renders that fail with 500 injected_error (0..1, default 0)
+    STANDIN_RATE_LIMIT_RATE share of renders answered 429 rate_limited (0..1, default 0)
+    STANDIN_SEED            seed for jitter and injected faults, so a run can be repeated (default 0)
+    """
+
+    def __init__(self, environ: Optional[Dict[str, str]] = None) -> None:
+        env = os.environ if environ is None else environ
+        self.latency_ms = float(env.get("STANDIN_LATENCY_MS", "0"))
+        self.jitter_ms = float(env.get("STANDIN_JITTER_MS", "0"))
+        self.error_rate = float(env.get("STANDIN_ERROR_RATE", "0"))
+        self.rate_limit_rate = float(env.get("STANDIN_RATE_LIMIT_RATE", "0"))
+        self.random = random.Random(int(env.get("STANDIN_SEED", "0")))
+
+    def roll(self) -> Tuple[float, Optional[int]]:
+        """Delay in seconds for the next render and the injected status (429, 500 or None)."""
+        delay_ms = self.latency_ms + self.random.uniform(0, self.jitter_ms)
+        draw = self.random.random()
+        if draw < self.rate_limit_rate:
+            return delay_ms / 1000, 429
+        if draw < self.rate_limit_rate + self.error_rate:
+            return delay_ms / 1000, 500
+        return delay_ms / 1000, None
+
+
+def sorted_names(names: set) -> List[str]:
+    return sorted(name for name in names if name)
+
+
+def basic_mermaid_parse(mermaid: str) -> Dict[str, Any]:
+    """Python port of basicMermaidParse in src/index.ts, the Worker's format=json output."""
+    trimmed = mermaid.strip()
+    lines = [line.strip() for line in re.split(r"\r?\n", trimmed)]
+
+    if re.match(r"^\s*(flowchart|graph)\b", trimmed, re.I):
+        nodes, edges = set(), []
+        for line in lines:
+            match = re.search(r"([A-Za-z0-9_]+)\s*[-.]+>\s*\|?.*?\|?\s*([A-Za-z0-9_]+)", line)
+            if match:
+                nodes.update(match.groups())
+                edges.append({"from": match.group(1), "to": match.group(2)})
+        return {"kind": "flowchart", "nodes": sorted_names(nodes), "edges": edges}
+
+    if re.match(r"^\s*sequenceDiagram\b", trimmed, re.I):
+        participants, messages = set(), []
+        for line in lines:
+            participant = re.match(r"^participant\s+([A-Za-z0-9_]+)", line, re.I)
+            if participant:
+                participants.add(participant.group(1))
+            match = re.search(r"([A-Za-z0-9_]+)\s*[-=]+>\s*([A-Za-z0-9_]+)\s*:\s*(.+)$", line)
+            if match:
+                participants.update(match.group(1, 2))
+                messages.append({"from": match.group(1), "to": match.group(2), "message": match.group(3)})
+        return {"kind": "sequenceDiagram", "participants": sorted_names(participants), "messages": messages}
+
+    if re.match(r"^\s*stateDiagram\b", trimmed, re.I):
+        nodes, edges = set(), []
+        for line in lines:
+            match = re.search(r"([A-Za-z0-9_]+)\s*-->\s*([A-Za-z0-9_]+)", line)
+            if match:
+                nodes.update(match.groups())
+                edges.append({"from": match.group(1), "to": match.group(2)})
+        return {"kind": "stateDiagram", "nodes": sorted_names(nodes), "edges": edges}
+
+    if re.match(r"^\s*classDiagram\b", trimmed, re.I):
+        classes, relations = set(), []
+        for line in lines:
+            declared = re.match(r"^class\s+([A-Za-z0-9_]+)", line, re.I)
+            if declared:
+                classes.add(declared.group(1))
+            match = re.search(r"([A-Za-z0-9_]+)\s*([<|o*.]+--[<|o*.]+|--|<\|--|\*--|o--)\s*([A-Za-z0-9_]+)", line)
+            if match:
+                classes.update(match.group(1, 3))
+                relations.append({"from": match.group(1), "to": match.group(3), "type": match.group(2)})
+        return {"kind": "classDiagram", "classes": sorted_names(classes), "relations": relations}
+
+    return {"kind": "unknown", "raw": mermaid}
+
+
+def deterministic_svg(mermaid: str) -> str:
+    """A stable placeholder SVG: the same input always yields byte-identical output."""
+    ast = basic_mermaid_parse(mermaid)
+    digest = hashlib.sha256(mermaid.encode("utf-8")).hexdigest()
+    labels = ast.get("nodes") or ast.get("participants") or ast.get("classes") or [ast["kind"]]
+    height = 24 * len(labels) + 16
+    texts = "".join(
+        f'<text x="8" y="{24 * idx + 28}">{html.escape(label)}</text>' for idx, label in enumerate(labels)
+    )
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="240" height="{height}" '
+        f'data-kind="{html.escape(ast["kind"])}" data-sha256="{digest}">{texts}</svg>'
+    )
+
+
+def request_id_for(seed: bytes) -> str:
+    return f"standin-{hashlib.sha256(seed).hexdigest()[:16]}"
+
+
+def error_body(message: str, request_id: str) -> Dict[str, Any]:
+    return {"ok": False, "error": message, "requestId": request_id}
+
+
+def not_found(method: str, path: str) -> Tuple[int, Dict[str, Any]]:
+    """The Worker's answer to anything but POST /render."""
+    return 404, error_body("not_found", request_id_for(f"{method} {path}".encode("utf-8")))
+
+
+def handle_render(
+    body: bytes, key: Optional[str], expected_key: Optional[str], config: StandInConfig
+) -> Tuple[float, int, Dict[str, Any], Dict[str, str]]:
+    """Answer one POST /render as (delay seconds, status, JSON body, extra headers).
+
+    Checks run in the Worker's order (size, auth, JSON, mermaid) with its status codes and error
+    strings; only a valid request rolls for latency and injected faults. `requestId` is the
+    payload id or a hash of the body. When `expected_key` is empty any non-empty key is accepted.
+    """
+    request_id = request_id_for(body)
+    if len(body) > MAX_MERMAID_BYTES:
+        return 0.0, 413, error_body("payload_too_large", request_id), {}
+    if not key or (expected_key and key != expected_key):
+        return 0.0, 401, error_body("unauthorized", request_id), {}
+    try:
+        payload = json.loads(body.decode("utf-8")) if body.strip() else {}
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return 0.0, 400, error_body("invalid_json", request_id), {}
+    if not isinstance(payload, dict):
+        return 0.0, 400, error_body("invalid_json", request_id), {}
+    if payload.get("id"):
+        request_id = str(payload["id"])
+    mermaid = payload.get("mermaid")
+    mermaid = mermaid.strip() if isinstance(mermaid, str) else ""
+    if not mermaid:
+        return 0.0, 400, error_body("missing_mermaid", request_id), {}
+
+    delay, fault = config.roll()
+    if fault == 429:
+        return delay, 429, error_body("rate_limited", request_id), {"Retry-After": "1"}
+    if fault == 500:
+        return delay, 500, error_body("injected_error", request_id), {}
+
+    render_id = payload.get("id") or None
+    fmt = payload.get("format")
+    fmt = fmt.strip().lower() if isinstance(fmt, str) else ""
+    if fmt == "svg":
+        result = {"ok": True, "id": render_id, "svg": deterministic_svg(mermaid), "warnings": []}
+    else:
+        result = {"ok": True, "id": render_id, "warnings": [], "ast": basic_mermaid_parse(mermaid)}
+    result["requestId"] = request_id
+    return delay, 200, result, {}
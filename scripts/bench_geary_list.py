@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Benchmark `geary list` and single-slice lookups: slices.json/slices.yml vs the slices.db store.
+
+Builds a synthetic registry (default 1500 slices, one alias per 10 slices), then times
+`geary.py list` end to end in a subprocess and, in process, a full list load and a
+single-alias install lookup against both sources. Both sources must print the same listing.
+
+Usage:
+  python scripts/bench_geary_list.py [--slices 1500] [--repeat 5]
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+GEARY_PATH = Path(__file__).resolve().parents[1] / "tools" / "geary" / "geary.py"
+
+
+def load_geary_module():
+    spec = importlib.util.spec_from_file_location("geary_cli", GEARY_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+geary = load_geary_module()
+
+
+def build_synthetic_registry(root: Path, total: int):
+    slices = []
+    for idx in range(total):
+        name = f"reports-Folder{idx:05d}" if idx % 2 else f"dashboards-Folder{idx:05d}"
+        depends_on = [f"reports-Folder{idx - 1:05d}"] if idx % 2 == 0 and idx else []
+        slices.append({
+            "name": name,
+            "manifest": f"manifest/slice-{name}.xml",
+            "kind": name.split("-")[0],
+            "counts": {"reports": 3, "dashboards": 1 if idx % 2 == 0 else 0, "folders": 1},
+            "dependsOn": depends_on,
+            "folders": [f"Folder{idx:05d}"],
+        })
+    out_dir = root / "geary" / "out"
+    out_dir.mkdir(parents=True)
+    registry = {"apiVersion": "62.0", "generatedFrom": "synthetic", "slices": slices}
+    (out_dir / "slices.json").write_text(json.dumps(registry, indent=2) + "\n", encoding="utf-8")
+    lines = ["version: 1", "aliases:"]
+    for idx in range(0, total, 10):
+        lines.append(f"  alias-{idx:05d}:")
+        lines.append(f"    includes: [{slices[idx]['name']}]")
+        lines.append("    withDeps: true")
+    (root / "geary" / "slices.yml").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return slices
+
+
+def use_store(enabled: bool):
+    os.environ["GEARY_REGISTRY_STORE"] = "1" if enabled else "0"
+    geary.RegistryStore._opened.clear()
+
+
+def list_once(root: Path):
+    with contextlib.redirect_stdout(io.StringIO()) as buffer:
+        geary.run_list(root)
+    return buffer.getvalue()
+
+
+def lookup_once(root: Path, alias: str):
+    _, slices = geary.load_registry(root)
+    aliases = geary.load_aliases(root)
+    dep_map = geary.dependency_map(slices)
+    targets, _, _ = geary.resolve_targets(alias, aliases, slices)
+    return geary.topo_sort(geary.expand_with_deps(targets, dep_map, slices), dep_map)
+
+
+def best_ms(func, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def cli_ms(root: Path, store: bool, repeat: int):
+    env = dict(os.environ, GEARY_REGISTRY_STORE="1" if store else "0")
+    cmd = [sys.executable, str(GEARY_PATH), "list", "--root", str(root)]
+    return best_ms(lambda: subprocess.run(cmd, env=env, check=True, stdout=subprocess.DEVNULL), repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark geary list against the registry store.")
+    parser.add_argument("--slices", type=int, default=1500, help="Synthetic registry size (default: 1500)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions per measurement")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="geary-list-bench-")
+    root = Path(tmpdir).resolve()
+    try:
+        build_synthetic_registry(root, args.slices)
+        print(f"synthetic registry: {args.slices} slices, {len(range(0, args.slices, 10))} aliases")
+        geary.build_registry_store(root)
+        alias = f"alias-{(args.slices // 2) // 10 * 10:05d}"
+
+        use_store(False)
+        json_listing = list_once(root)
+        json_list = best_ms(lambda: list_once(root), args.repeat)
+        json_lookup = best_ms(lambda: lookup_once(root, alias), args.repeat)
+        json_order = lookup_once(root, alias)
+        use_store(True)
+        store_listing = list_once(root)
+        store_list = best_ms(lambda: list_once(root), args.repeat)
+        store_lookup = best_ms(lambda: geary.RegistryStore._opened.clear() or lookup_once(root, alias), args.repeat)
+        store_order = lookup_once(root, alias)
+
+        json_cli = cli_ms(root, False, args.repeat)
+        store_cli = cli_ms(root, True, args.repeat)
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    if json_listing != store_listing or json_order != store_order:
+        print("FAIL: store and JSON registry disagree", file=sys.stderr)
+        return 1
+    print(f"{'':<22}{'json':>10}{'store':>10}")
+    print(f"{'geary list (cli)':<22}{json_cli:>8.1f}ms{store_cli:>8.1f}ms")
+    print(f"{'list (in process)':<22}{json_list:>8.1f}ms{store_list:>8.1f}ms")
+    print(f"{'alias lookup + deps':<22}{json_lookup:>8.1f}ms{store_lookup:>8.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""Benchmark the geary slice scanner against the legacy per-type globbing.
+
+Builds a synthetic SFDX package dir (default ~50k files), then times both scanners and
+counts the scandir/stat calls each one makes. Results must match member-for-member.
+
+Usage:
+  python scripts/bench_geary_scan.py [--files 50000] [--repeat 3] [--package-dir PATH]
+"""
+import argparse
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def load_geary_slices_module():
+    root = Path(__file__).resolve().parents[1]
+    slices_path = root / "tools" / "geary" / "slices.py"
+    spec = importlib.util.spec_from_file_location("geary_slices", slices_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+slices = load_geary_slices_module()
+strip_suffix = slices.strip_suffix
+
+
+def legacy_glob_scan(package_dir: Path):
+    """The pre-walker scanner: one glob/rglob pass per metadata type."""
+    scan = slices.empty_scan()
+    base = package_dir / "main" / "default"
+
+    def bundle_has_files(bundle_path: Path) -> bool:
+        return any(child.is_file() for child in bundle_path.rglob("*"))
+
+    simple = [
+        ("flows", "flows", "*.flow-meta.xml", ".flow-meta.xml"),
+        ("classes", "apex_classes", "*.cls", ".cls"),
+        ("classes", "apex_classes", "*.cls-meta.xml", ".cls-meta.xml"),
+        ("triggers", "apex_triggers", "*.trigger", ".trigger"),
+        ("triggers", "apex_triggers", "*.trigger-meta.xml", ".trigger-meta.xml"),
+        ("testSuites", "apex_test_suites", "*.testSuite-meta.xml", ".testSuite-meta.xml"),
+        ("cspTrustedSites", "csp_sites", "*.cspTrustedSite-meta.xml", ".cspTrustedSite-meta.xml"),
+        ("CSPTrustedSites", "csp_sites", "*.cspTrustedSite-meta.xml", ".cspTrustedSite-meta.xml"),
+        ("csptrustedsites", "csp_sites", "*.cspTrustedSite-meta.xml", ".cspTrustedSite-meta.xml"),
+        ("permissionsets", "permission_sets", "*.permissionset-meta.xml", ".permissionset-meta.xml"),
+        ("profiles", "profiles", "*.profile-meta.xml", ".profile-meta.xml"),
+    ]
+    for dirname, key, pattern, suffix in simple:
+        directory = base / dirname
+        if directory.exists():
+            scan[key].extend(strip_suffix(path.name, suffix) for path in directory.glob(pattern))
+
+    for dirname, key in (("lwc", "lwc_bundles"), ("aura", "aura_bundles")):
+        directory = base / dirname
+        if directory.exists():
+            scan[key].extend(sorted(p.name for p in directory.iterdir() if p.is_dir() and bundle_has_files(p)))
+
+    objects_dir = base / "objects"
+    if objects_dir.exists():
+        for obj_path in sorted(objects_dir.iterdir()):
+            if not obj_path.is_dir():
+                continue
+            obj_api_name = obj_path.name
+            obj_meta = obj_path / f"{obj_api_name}.object-meta.xml"
+            if obj_meta.exists() and obj_api_name.endswith("__c"):
+                scan["custom_objects"].append(obj_api_name)
+            fields_dir = obj_path / "fields"
+            if fields_dir.exists():
+                for field_path in sorted(fields_dir.glob("*.field-meta.xml")):
+                    field_name = strip_suffix(field_path.name, ".field-meta.xml")
+                    scan["custom_fields"].append(f"{obj_api_name}.{field_name}")
+                    scan["fields_by_object"].setdefault(obj_api_name, []).append(field_name)
+
+    for kind, member_suffix, folder_suffix in (
+        ("report", slices.REPORT_SUFFIX, slices.REPORT_FOLDER_SUFFIX),
+        ("dashboard", slices.DASHBOARD_SUFFIX, slices.DASHBOARD_FOLDER_SUFFIX),
+    ):
+        members_dir = base / f"{kind}s"
+        folders_dir = base / f"{kind}Folders"
+        if members_dir.exists():
+            for path in members_dir.glob(f"*/*{member_suffix}"):
+                folder = path.parent.name
+                name = strip_suffix(path.name, member_suffix)
+                scan[f"{kind}s"].append(f"{folder}/{name}")
+                scan[f"{kind}s_by_folder"].setdefault(folder, []).append(name)
+                scan[f"{kind}_folders"].add(folder)
+        if folders_dir.exists():
+            scan[f"{kind}_folder_meta"].update(
+                strip_suffix(path.name, folder_suffix) for path in folders_dir.glob(f"*{folder_suffix}")
+            )
+        if members_dir.exists():
+            scan[f"{kind}_folder_meta"].update(
+                strip_suffix(path.name, folder_suffix) for path in members_dir.glob(f"*{folder_suffix}")
+            )
+    # The legacy path globbed the dashboards directory a second time to parse each dashboard.
+    dashboards_dir = base / "dashboards"
+    if dashboards_dir.exists():
+        scan["dashboard_paths"].extend(dashboards_dir.glob(f"*/*{slices.DASHBOARD_SUFFIX}"))
+    return scan
+
+
+def normalize(scan):
+    result = {}
+    for key, value in scan.items():
+        if isinstance(value, dict):
+            result[key] = {k: sorted(v) for k, v in sorted(value.items())}
+        else:
+            result[key] = sorted(str(item) for item in value)
+    return result
+
+
+def write_file(path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"<x/>\n")
+
+
+def build_synthetic_tree(package_dir: Path, total_files: int):
+    base = package_dir / "main" / "default"
+    # Rough proportions of a large org: half objects/fields, then Apex, reports, LWC, flows.
+    budget = {
+        "fields": total_files * 40 // 100,
+        "classes": total_files * 20 // 100,
+        "reports": total_files * 12 // 100,
+        "lwc": total_files * 10 // 100,
+        "flows": total_files * 6 // 100,
+        "triggers": total_files * 4 // 100,
+        "dashboards": total_files * 4 // 100,
+        "permissionsets": total_files * 2 // 100,
+    }
+    written = 0
+    objects = max(1, budget["fields"] // 100)
+    for obj in range(objects):
+        obj_name = f"Obj{obj:04d}__c"
+        write_file(base / "objects" / obj_name / f"{obj_name}.object-meta.xml")
+        written += 1
+        for field in range(budget["fields"] // objects):
+            write_file(base / "objects" / obj_name / "fields" / f"Field{field:03d}__c.field-meta.xml")
+            written += 1
+    for idx in range(budget["classes"] // 2):
+        write_file(base / "classes" / f"Class{idx:05d}.cls")
+        write_file(base / "classes" / f"Class{idx:05d}.cls-meta.xml")
+        written += 2
+    for idx in range(budget["triggers"] // 2):
+        write_file(base / "triggers" / f"Trigger{idx:05d}.trigger")
+        write_file(base / "triggers" / f"Trigger{idx:05d}.trigger-meta.xml")
+        written += 2
+    for idx in range(budget["flows"]):
+        write_file(base / "flows" / f"Flow{idx:05d}.flow-meta.xml")
+        written += 1
+    for idx in range(budget["lwc"] // 4):
+        bundle = base / "lwc" / f"bundle{idx:05d}"
+        for name in ("x.js", "x.html", "x.css", "x.js-meta.xml"):
+            write_file(bundle / name)
+        written += 4
+    for idx in range(budget["permissionsets"]):
+        write_file(base / "permissionsets" / f"Perm{idx:04d}.permissionset-meta.xml")
+        written += 1
+    for kind, count in (("report", budget["reports"]), ("dashboard", budget["dashboards"])):
+        folders = 20
+        for folder in range(folders):
+            folder_name = f"{kind.title()}Folder{folder:02d}"
+            write_file(base / f"{kind}s" / f"{folder_name}.{kind}Folder-meta.xml")
+            written += 1
+            for idx in range(count // folders):
+                write_file(base / f"{kind}s" / folder_name / f"{kind.title()}{idx:04d}.{kind}-meta.xml")
+                written += 1
+    return written
+
+
+class CallCounter:
+    """Counts os.scandir/os.stat/os.lstat calls made while active."""
+
+    def __init__(self):
+        self.counts = {"scandir": 0, "stat": 0, "lstat": 0}
+        self.originals = {}
+
+    def __enter__(self):
+        for name in self.counts:
+            original = getattr(os, name)
+            self.originals[name] = original
+
+            def wrapper(*args, _name=name, _original=original, **kwargs):
+                self.counts[_name] += 1
+                return _original(*args, **kwargs)
+
+            setattr(os, name, wrapper)
+        return self
+
+    def __exit__(self, *exc):
+        for name, original in self.originals.items():
+            setattr(os, name, original)
+        return False
+
+
+def bench(label, func, package_dir: Path, repeat: int):
+    with CallCounter() as counter:
+        result = func(package_dir)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(package_dir)
+        timings.append(time.perf_counter() - started)
+    best_ms = min(timings) * 1000
+    calls = sum(counter.counts.values())
+    detail = " ".join(f"{name}={count}" for name, count in counter.counts.items())
+    print(f"{label:<8} best {best_ms:8.1f} ms  fs calls {calls:7d} ({detail})")
+    return result, best_ms, calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the geary slice scanner.")
+    parser.add_argument("--files", type=int, default=50000, help="Synthetic tree size (default: 50000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repetitions per scanner")
+    parser.add_argument("--package-dir", help="Scan an existing package dir instead of a synthetic tree")
+    args = parser.parse_args()
+
+    tmpdir = None
+    if args.package_dir:
+        package_dir = Path(args.package_dir).resolve()
+        print(f"package dir: {package_dir}")
+    else:
+        tmpdir = tempfile.mkdtemp(prefix="geary-scan-bench-")
+        package_dir = Path(tmpdir) / "pkg"
+        written = build_synthetic_tree(package_dir, args.files)
+        print(f"synthetic tree: {written} files under {package_dir}")
+    try:
+        legacy, legacy_ms, legacy_calls = bench("legacy", legacy_glob_scan, package_dir, args.repeat)
+        walker, walker_ms, walker_calls = bench("walker", slices.scan_package_dir, package_dir, args.repeat)
+    finally:
+        if tmpdir:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+    if normalize(legacy) != normalize(walker):
+        print("FAIL: walker and legacy scan disagree", file=sys.stderr)
+        return 1
+    print(f"speedup {legacy_ms / walker_ms:.2f}x, fs calls {legacy_calls} -> {walker_calls}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
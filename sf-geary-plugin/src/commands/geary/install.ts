@@ -16,10 +16,18 @@ export default class GearyInstall extends SfCommand<void> {
     'allow-empty': Flags.boolean({description: 'Allow installing empty slices'}),
     'test-level': Flags.string({
       description: 'Test level',
-      options: ['NoTestRun', 'RunLocalTests', 'RunAllTestsInOrg', 'RunSpecifiedTests'],
+      options: ['NoTestRun', 'RunLocalTests', 'RunAllTestsInOrg', 'RunSpecifiedTests', 'auto'],
     }),
     tests: Flags.string({description: 'Comma-separated tests (RunSpecifiedTests only)'}),
     debug: Flags.boolean({description: 'Show full traceback on errors'}),
+    jobs: Flags.integer({description: 'Deploy up to N independent slices at once', min: 1}),
+    force: Flags.boolean({description: 'Redeploy slices even if unchanged since the last deploy'}),
+    coalesce: Flags.boolean({description: 'Deploy all slices as one merged package.xml'}),
+    refresh: Flags.boolean({description: 'Ignore cached org info and re-query the target org'}),
+    since: Flags.string({description: 'Deploy only members changed since this git ref'}),
+    resume: Flags.string({description: 'Continue a failed install run by run id'}),
+    retries: Flags.integer({description: 'Retry a deploy up to N times after a transient sf error', min: 0}),
+    'retry-backoff': Flags.integer({description: 'Seconds before the first retry, doubled each time', min: 0}),
     'no-auto-update': Flags.boolean({description: 'Disable auto update when slices.json is missing'}),
   };
 
@@ -52,6 +60,14 @@ export default class GearyInstall extends SfCommand<void> {
       testLevel: flags['test-level'],
       tests: flags.tests,
       debug: flags.debug,
+      jobs: flags.jobs,
+      force: flags.force,
+      coalesce: flags.coalesce,
+      refresh: flags.refresh,
+      since: flags.since,
+      resume: flags.resume,
+      retries: flags.retries,
+      retryBackoff: flags['retry-backoff'],
     });
 
     const code = await runPython(pyArgs);
@@ -69,6 +85,14 @@ export type InstallArgInput = {
   testLevel?: string;
   tests?: string;
   debug?: boolean;
+  jobs?: number;
+  force?: boolean;
+  coalesce?: boolean;
+  refresh?: boolean;
+  since?: string;
+  resume?: string;
+  retries?: number;
+  retryBackoff?: number;
 };
 
 export function buildInstallArgs(input: InstallArgInput): string[] {
@@ -86,5 +110,13 @@ export function buildInstallArgs(input: InstallArgInput): string[] {
   if (input.testLevel) args.push('--test-level', input.testLevel);
   if (input.tests) args.push('--tests', input.tests);
   if (input.debug) args.push('--debug');
+  if (input.jobs) args.push('--jobs', String(input.jobs));
+  if (input.force) args.push('--force');
+  if (input.coalesce) args.push('--coalesce');
+  if (input.refresh) args.push('--refresh');
+  if (input.since) args.push('--since', input.since);
+  if (input.resume) args.push('--resume', input.resume);
+  if (input.retries !== undefined) args.push('--retries', String(input.retries));
+  if (input.retryBackoff !== undefined) args.push('--retry-backoff', String(input.retryBackoff));
   return args;
 }
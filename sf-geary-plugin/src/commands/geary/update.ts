@@ -8,13 +8,18 @@ export default class GearyUpdate extends SfCommand<void> {
 
   public static flags = {
     root: Flags.string({description: 'Repo root', required: false}),
+    full: Flags.boolean({description: 'Ignore the scan cache and rescan everything'}),
+    watch: Flags.boolean({description: 'Stay resident and regenerate slices as files change'}),
   };
 
   public async run(): Promise<void> {
     const {flags} = await this.parse(GearyUpdate);
     const root = resolveRepoRoot(flags.root);
     const script = path.join(root, 'tools', 'geary', 'geary.py');
-    const code = await runPython([script, 'update', '--root', root]);
+    const pyArgs = [script, 'update', '--root', root];
+    if (flags.full) pyArgs.push('--full');
+    if (flags.watch) pyArgs.push('--watch');
+    const code = await runPython(pyArgs);
     if (code !== 0) this.exit(code);
   }
 }
@@ -12,6 +12,14 @@ describe('argument mapping', () => {
       testLevel: 'RunLocalTests',
       tests: 'TestA,TestB',
       debug: true,
+      jobs: 4,
+      force: true,
+      coalesce: true,
+      refresh: true,
+      since: 'origin/main',
+      resume: '20260101T000000Z_abcd1234',
+      retries: 0,
+      retryBackoff: 10,
     });
 
     expect(args).toEqual([
@@ -29,6 +37,19 @@ describe('argument mapping', () => {
       '--tests',
       'TestA,TestB',
       '--debug',
+      '--jobs',
+      '4',
+      '--force',
+      '--coalesce',
+      '--refresh',
+      '--since',
+      'origin/main',
+      '--resume',
+      '20260101T000000Z_abcd1234',
+      '--retries',
+      '0',
+      '--retry-backoff',
+      '10',
     ]);
   });
 });
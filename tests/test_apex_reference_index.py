@@ -0,0 +1,71 @@
+import importlib.util
+import json
+import os
+import tempfile
+from pathlib import Path
+
+
+def load_geary_module():
+    root = Path(__file__).resolve().parents[1]
+    geary_path = root / "tools" / "geary" / "geary.py"
+    spec = importlib.util.spec_from_file_location("geary_cli", geary_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def write(path: Path, text: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def main():
+    geary = load_geary_module()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir).resolve()
+        classes = root / "force-app" / "main" / "default" / "classes"
+        triggers = root / "force-app" / "main" / "default" / "triggers"
+        write(classes / "Helper.cls", "public class Helper { public static Integer one() { return 1; } }\n")
+        write(classes / "BillingService.cls", "public class BillingService { Integer run() { return helper.one(); } }\n")
+        write(classes / "Orphan.cls", "public class Orphan {}\n")
+        write(classes / "InvoiceHandler.cls", "public class InvoiceHandler { public static void handle() {} }\n")
+        write(
+            classes / "BillingServiceTest.cls",
+            "@IsTest\nprivate class BillingServiceTest {\n  @IsTest static void runs() { new BillingService(); }\n"
+            "  // Orphan is only mentioned in a comment\n  static String s = 'Orphan';\n}\n",
+        )
+        write(classes / "InvoiceFactory.cls", "@isTest\npublic class InvoiceFactory { public static Invoice__c make() { return new Invoice__c(); } }\n")
+        write(
+            classes / "InvoiceTest.cls",
+            "@IsTest\nprivate class InvoiceTest { static testMethod void inserts() { insert InvoiceFactory.make(); } }\n",
+        )
+        write(triggers / "InvoiceTrigger.trigger", "trigger InvoiceTrigger on Invoice__c (after insert) { InvoiceHandler.handle(); }\n")
+
+        index = geary.ApexReferenceIndex.load(root)
+        assert index.rescanned == 8
+        # Transitive and case-insensitive; comments and strings do not count as references.
+        assert index.covering_tests("class", "Helper") == {"billingservicetest"}
+        assert index.covering_tests("class", "Orphan") == set()
+        # A trigger is reached through its sObject, via the factory; classes it calls inherit that.
+        assert index.covering_tests("trigger", "InvoiceTrigger") == {"invoicetest"}
+        assert index.covering_tests("class", "InvoiceHandler") == {"invoicetest"}
+        # Factories are traversed but never selected to run.
+        assert "invoicefactory" in index.tests and "invoicefactory" not in index.runnable_tests
+
+        tests, uncovered = index.select_tests(["BillingService", "Helper", "BillingServiceTest"], ["InvoiceTrigger"])
+        assert tests == ["BillingServiceTest", "InvoiceTest"] and uncovered == []
+        assert index.select_tests(["Orphan", "Helper"], []) == (["BillingServiceTest"], ["Orphan"])
+
+        # Reloading only rescans files whose stat signature changed.
+        cache_path = root / "geary" / "out" / geary.APEX_REFERENCE_INDEX_NAME
+        assert json.loads(cache_path.read_text(encoding="utf-8"))["version"] == geary.APEX_REFERENCE_INDEX_VERSION
+        assert geary.ApexReferenceIndex.load(root).rescanned == 0
+        write(classes / "OrphanTest.cls", "@IsTest\nclass OrphanTest { @IsTest static void t() { new Orphan(); } }\n")
+        os.utime(classes / "Orphan.cls", ns=(1, 1))
+        index = geary.ApexReferenceIndex.load(root)
+        assert index.rescanned == 2
+        assert index.select_tests(["Orphan", "Helper"], []) == (["BillingServiceTest", "OrphanTest"], [])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import importlib.util
+import tempfile
+from pathlib import Path
+
+
+def load_geary_module():
+    root = Path(__file__).resolve().parents[1]
+    geary_path = root / "tools" / "geary" / "geary.py"
+    spec = importlib.util.spec_from_file_location("geary_cli", geary_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def write(path: Path, text: str = "<x/>\n"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def manifest(*types):
+    body = "".join(
+        "<types>" + "".join(f"<members>{name}</members>" for name in names) + f"<name>{type_name}</name></types>"
+        for type_name, names in types
+    )
+    return f"<Package>{body}</Package>\n"
+
+
+def main():
+    geary = load_geary_module()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir).resolve()
+        write(root / "sfdx-project.json", '{"packageDirectories": [{"path": "core"}, {"path": "ui"}]}\n')
+        core = root / "core" / "main" / "default"
+        ui = root / "ui" / "main" / "default"
+        write(core / "classes" / "Alpha.cls", "public class Alpha {}\n")
+        write(ui / "classes" / "Alpha.cls-meta.xml")
+        write(core / "objects" / "Thing__c" / "fields" / "Owner__c.field-meta.xml")
+        write(ui / "lwc" / "card" / "card.js", "export default class Card {}\n")
+        write(ui / "lwc" / "card" / "card.js-meta.xml")
+        slice_path = root / "manifest" / "slice-core.xml"
+        write(
+            slice_path,
+            manifest(
+                ("ApexClass", ["Alpha"]),
+                ("CustomField", ["Thing__c.Owner__c"]),
+                ("LightningComponentBundle", ["card"]),
+            ),
+        )
+
+        first = geary.slice_fingerprint(root, slice_path)
+        assert first and first.startswith("sha256:")
+        assert geary.slice_fingerprint(root, slice_path) == first
+
+        # Any member file, including one inside a bundle in another package dir, changes it.
+        write(ui / "lwc" / "card" / "card.js", "export default class Card { x = 1; }\n")
+        second = geary.slice_fingerprint(root, slice_path)
+        assert second != first
+        write(ui / "classes" / "Alpha.cls-meta.xml", "<y/>\n")
+        assert geary.slice_fingerprint(root, slice_path) != second
+
+        # Members without local sources are never fingerprinted, so they always deploy.
+        write(root / "manifest" / "slice-wild.xml", manifest(("ApexClass", ["*"])))
+        assert geary.slice_fingerprint(root, root / "manifest" / "slice-wild.xml") is None
+        write(root / "manifest" / "slice-odd.xml", manifest(("Workflow", ["Case"])))
+        assert geary.slice_fingerprint(root, root / "manifest" / "slice-odd.xml") is None
+
+        # Fingerprints are kept per target org.
+        assert geary.load_deploy_fingerprints(root, "dev") == {}
+        recorded = {"core": {"fingerprint": first, "deployedAt": "2026-01-01T00:00:00Z"}}
+        geary.save_deploy_fingerprints(root, "dev", recorded)
+        assert geary.load_deploy_fingerprints(root, "dev") == recorded
+        assert geary.load_deploy_fingerprints(root, "user@example.com") == {}
+        path = geary.deploy_fingerprint_path(root, "ops/uat")
+        assert path.parent == root / "geary" / "out" / "deploys" and path.name == "ops_uat.json"
+
+
+if __name__ == "__main__":
+    main()
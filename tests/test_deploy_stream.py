@@ -0,0 +1,60 @@
+import importlib.util
+import os
+from pathlib import Path
+
+FAKE_SF = Path(__file__).resolve().parent / "fake_sf" / "sf"
+
+
+def load_geary_module():
+    root = Path(__file__).resolve().parents[1]
+    geary_path = root / "tools" / "geary" / "geary.py"
+    spec = importlib.util.spec_from_file_location("geary_cli", geary_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def main():
+    geary = load_geary_module()
+    parser = geary.DeployOutputParser(tail_lines=3)
+    events = []
+    for line in [
+        "Deploying v62.0 metadata to ops@example.com using the v62.0 SOAP API.",
+        "Status: In Progress",
+        "\x1b[32mComponents: 4/10 (40%)\x1b[0m",
+        "Components: 4/10 (40%)",
+        "Components: 10/10 (100%) | Tests: 2/7 (28%)",
+        "",
+        "Average test coverage across all Apex Classes and Triggers is 74%, at least 75% test coverage is required.",
+    ]:
+        events.extend(parser.feed(line))
+    # Repeated progress is dropped; one line can carry several counters.
+    assert events == [
+        {"kind": "status", "status": "In Progress"},
+        {"kind": "components", "done": 4, "total": 10},
+        {"kind": "components", "done": 10, "total": 10},
+        {"kind": "tests", "done": 2, "total": 7},
+        {"kind": "coverage", "percent": 74.0},
+    ], events
+    assert parser.lines == 6 and len(parser.tail) == 3
+    assert parser.tail[0] == "Components: 4/10 (40%)"
+    assert geary.format_deploy_event(events[3]) == "tests 2/7"
+
+    # Output is parsed as it streams and only the tail is kept, however long the deploy talks.
+    os.environ["FAKE_SF_DEPLOY_LINES"] = "5000"
+    os.environ["FAKE_SF_FAIL"] = "slice-apex.xml"
+    try:
+        seen = []
+        cmd = [str(FAKE_SF), "project", "deploy", "start", "--manifest", "manifest/slice-apex.xml", "--test-level", "RunLocalTests"]
+        returncode, parser = geary.stream_deploy(cmd, on_event=seen.append, tail_lines=50)
+    finally:
+        del os.environ["FAKE_SF_DEPLOY_LINES"]
+        del os.environ["FAKE_SF_FAIL"]
+    assert returncode == 1
+    assert parser.lines > 5000 and len(parser.tail) == 50
+    assert parser.tail[-1].startswith("Average test coverage")
+    assert [event["kind"] for event in seen] == ["status", "components", "components", "tests", "status", "coverage"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+GEARY = REPO_ROOT / "tools" / "geary" / "geary.py"
+FAKE_SF_DIR = Path(__file__).resolve().parent / "fake_sf"
+
+
+def load_geary_module():
+    spec = importlib.util.spec_from_file_location("geary_cli", GEARY)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def write(path: Path, text: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def geary_cli(root: Path, *args, **env):
+    full_env = dict(os.environ, PATH=f"{FAKE_SF_DIR}{os.pathsep}{os.environ['PATH']}", **env)
+    cmd = [sys.executable, str(GEARY), *args, "--root", str(root)]
+    return subprocess.run(cmd, env=full_env, capture_output=True, text=True)
+
+
+def past_install(root: Path, run_id: str, target_org: str, durations: dict):
+    events = [{"type": "run.started", "data": {"command": "install", "target_org": target_org}}]
+    for name, duration_ms in durations.items():
+        events.append({"type": "slice.deploy.finished", "data": {"slice": name, "duration_ms": duration_ms, "exit_code": 0}})
+    write(root / "runs" / run_id / "emissions.ndjson", "".join(json.dumps(event) + "\n" for event in events))
+
+
+def main():
+    geary = load_geary_module()
+    order = ["objects", "reports", "apex", "dashboards", "perms"]
+    dep_map = {"dashboards": ["reports"], "apex": ["objects"]}
+    deps = geary.schedule_dependencies(order, dep_map, is_last=lambda name: name == "perms")
+    assert geary.plan_levels(order, deps) == [["objects", "reports"], ["apex", "dashboards"], ["perms"]]
+    durations = {"objects": 10, "reports": 30, "apex": 50, "dashboards": 5, "perms": 2}
+    assert geary.critical_path(order, deps, durations) == (["objects", "apex", "perms"], 62)
+    # One job runs everything back to back; two jobs are bounded by the critical path.
+    assert geary.estimate_makespan(order, deps, 1, durations) == sum(durations.values())
+    assert geary.estimate_makespan(order, deps, 2, durations) == 62
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir).resolve()
+        slices = [
+            {"name": "objects", "manifest": "manifest/slice-objects.xml", "kind": "objects", "counts": {"customObjects": 1, "customFields": 4}, "dependsOn": []},
+            {"name": "apex", "manifest": "manifest/slice-apex.xml", "kind": "apex", "counts": {"apexClasses": 3}, "dependsOn": ["objects"]},
+            {"name": "perms", "manifest": "manifest/slice-perms.xml", "kind": "permissionsets", "counts": {"permissionSets": 1}, "dependsOn": []},
+        ]
+        registry = {"apiVersion": "62.0", "generatedFrom": "repo scan", "slices": slices}
+        write(root / "geary" / "out" / "slices.json", json.dumps(registry, indent=2) + "\n")
+        write(root / "geary" / "slices.yml", "version: 1\naliases:\n  core:\n    includes: [apex, perms]\n    withDeps: true\n")
+        _, loaded = geary.load_registry(root)
+        aliases = geary.load_aliases(root)
+        assert geary.resolve_install_order("core", aliases, loaded, geary.dependency_map(loaded)) == ["objects", "apex", "perms"]
+
+        past_install(root, "run-1", "prod", {"objects": 4000, "apex": 60000, "perms": 1000})
+        past_install(root, "run-2", "prod", {"objects": 6000, "apex": 80000})
+        past_install(root, "run-3", "sandbox", {"apex": 1000})
+
+        result = geary_cli(root, "plan", "core", "--target-org", "prod", FAKE_SF_ORG_TYPE="production")
+        assert result.returncode == 0, result.stdout + result.stderr
+        out = result.stdout
+        assert "Production org detected; defaulting to RunLocalTests" in out
+        row = lambda name: next(line for line in out.splitlines() if f" {name} " in line)
+        assert "RunLocalTests" in row("apex") and "apexClasses 3" in row("apex")
+        # Nearest-rank p50 over that org's runs only; the objects slice has no tests to run.
+        assert "60.0s" in row("apex") and "4.0s" in row("objects") and "RunLocalTests" not in row("objects")
+        assert "* Critical path: objects -> apex -> perms (est. 65.0s)" in out
+        assert "No deploy history" not in out
+
+        # Nothing is deployed, and a sandbox keeps the requested (empty) test level.
+        log = root / "sf.log"
+        result = geary_cli(root, "plan", "core", "--target-org", "uat", FAKE_SF_ORG_TYPE="sandbox", FAKE_SF_LOG=str(log))
+        assert result.returncode == 0, result.stdout + result.stderr
+        assert all("deploy" not in json.loads(line) for line in log.read_text(encoding="utf-8").splitlines())
+        assert "org default" in result.stdout and "Critical path: unknown" in result.stdout
+        assert "No deploy history under" in result.stdout
+        assert not list((root / "runs").glob("*/receipt.json"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import importlib.util
+import tempfile
+from pathlib import Path
+
+
+def load_geary_module():
+    root = Path(__file__).resolve().parents[1]
+    geary_path = root / "tools" / "geary" / "geary.py"
+    spec = importlib.util.spec_from_file_location("geary_cli", geary_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def write(path: Path, text: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def main():
+    geary = load_geary_module()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir).resolve()
+        write(
+            root / "slice-apex.xml",
+            "<Package><types><members>Beta</members><members>Alpha</members><name>ApexClass</name></types></Package>\n",
+        )
+        write(
+            root / "slice-comms.xml",
+            "<Package><types><members>Comms__c</members><name>CustomObject</name></types>"
+            "<types><members>Alpha</members><members>Gamma</members><name>ApexClass</name></types></Package>\n",
+        )
+        merged = geary.merge_manifest_members([root / "slice-apex.xml", root / "slice-comms.xml"])
+        assert merged == {"ApexClass": ["Alpha", "Beta", "Gamma"], "CustomObject": ["Comms__c"]}, merged
+
+        package_path = root / "out" / "package-1.xml"
+        geary.write_package_manifest(package_path, "62.0", merged)
+        assert geary.manifest_members(package_path) == merged
+        assert "<version>62.0</version>" in package_path.read_text(encoding="utf-8")
+
+    # Permission sets stay in their own, final deploy; everything else goes in one.
+    order = ["objects", "apex", "reports", "perms"]
+    is_perms = lambda name: name == "perms"
+    assert geary.coalesce_batches(order, is_perms) == [["objects", "apex", "reports"], ["perms"]]
+    assert geary.coalesce_batches(["perms"], is_perms) == [["perms"]]
+    assert geary.coalesce_batches(["apex"], is_perms) == [["apex"]]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+GEARY = REPO_ROOT / "tools" / "geary" / "geary.py"
+FAKE_SF_DIR = Path(__file__).resolve().parent / "fake_sf"
+
+
+def load_geary_module():
+    spec = importlib.util.spec_from_file_location("geary_cli", GEARY)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def write(path: Path, text: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def geary_cli(root: Path, *args, **env):
+    full_env = dict(os.environ, PATH=f"{FAKE_SF_DIR}{os.pathsep}{os.environ['PATH']}", **env)
+    cmd = [sys.executable, str(GEARY), *args, "--root", str(root)]
+    return subprocess.run(cmd, env=full_env, capture_output=True, text=True)
+
+
+def main():
+    geary = load_geary_module()
+    assert geary.percentile([], 50) is None
+    assert geary.percentile([5, 1, 3, 2, 4], 50) == 3
+    assert geary.percentile(list(range(1, 101)), 95) == 95
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir).resolve()
+        write(root / "force-app" / "main" / "default" / "flows" / "Intake.flow-meta.xml", "<Flow/>\n")
+        write(
+            root / "manifest" / "slice-flows.xml",
+            "<Package><types><members>Intake</members><name>Flow</name></types></Package>\n",
+        )
+        registry = {
+            "apiVersion": "62.0",
+            "generatedFrom": "repo scan",
+            "slices": [{"name": "flows", "manifest": "manifest/slice-flows.xml", "kind": "flows", "counts": {"flows": 1}, "dependsOn": []}],
+        }
+        write(root / "geary" / "out" / "slices.json", json.dumps(registry, indent=2) + "\n")
+
+        ok = geary_cli(root, "install", "flows", "--target-org", "dev")
+        assert ok.returncode == 0, ok.stdout + ok.stderr
+        failed = geary_cli(root, "install", "flows", "--target-org", "dev", "--force", FAKE_SF_FAIL="slice-flows.xml")
+        assert failed.returncode == 1, failed.stdout + failed.stderr
+
+        runs = {}
+        for run_id, events in geary.iter_run_emissions(root / "runs"):
+            runs[run_id] = events
+        assert len(runs) == 2
+        for run_id, events in runs.items():
+            types = [event["type"] for event in events]
+            assert types[0] == "run.started" and types[-1] == "run.completed"
+            assert "slice.deploy.started" in types and "slice.deploy.finished" in types
+            finished = next(event["data"] for event in events if event["type"] == "slice.deploy.finished")
+            assert finished["slice"] == "flows" and finished["members"] == 1 and finished["duration_ms"] >= 0
+            receipt = json.loads((root / "runs" / run_id / "receipt.json").read_text(encoding="utf-8"))
+            assert receipt["command"] == "install" and receipt["exit_code"] == finished["exit_code"]
+            assert receipt["slices"] == [{"name": "flows", "status": "deployed" if finished["exit_code"] == 0 else "failed", "exit_code": finished["exit_code"], "duration_ms": finished["duration_ms"], "attempts": finished["attempts"]}]
+
+        total_runs, by_slice = geary.install_deploy_durations(root / "runs")
+        assert total_runs == 2 and sorted(record["exit_code"] for record in by_slice["flows"]) == [0, 1]
+        assert geary.install_deploy_durations(root / "runs", "prod") == (0, {})
+        stats = geary_cli(root, "stats", "install")
+        assert stats.returncode == 0 and "flows" in stats.stdout and "p95" in stats.stdout, stats.stdout
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+GEARY = REPO_ROOT / "tools" / "geary" / "geary.py"
+FAKE_SF_DIR = Path(__file__).resolve().parent / "fake_sf"
+
+
+def load_geary_module():
+    spec = importlib.util.spec_from_file_location("geary_cli", GEARY)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def write(path: Path, text: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def geary_cli(root: Path, *args, **env):
+    full_env = dict(os.environ, PATH=f"{FAKE_SF_DIR}{os.pathsep}{os.environ['PATH']}", **env)
+    cmd = [sys.executable, str(GEARY), *args, "--root", str(root)]
+    return subprocess.run(cmd, env=full_env, capture_output=True, text=True)
+
+
+def deployed_manifests(log: Path):
+    calls = [json.loads(line) for line in log.read_text(encoding="utf-8").splitlines()]
+    return [Path(argv[argv.index("--manifest") + 1]).name for argv in calls if argv[:3] == ["project", "deploy", "start"]]
+
+
+def main():
+    geary = load_geary_module()
+    parser = geary.DeployOutputParser()
+    parser.feed("Status: In Progress")
+    parser.feed("Error (1): request failed, reason: socket hang up (ECONNRESET)")
+    assert parser.transient_error() == "socket hang up"
+    # Once the org reports a final status the failure is the deploy's own, whatever else was printed.
+    parser.feed("Status: Failed")
+    assert parser.transient_error() is None
+    assert geary.DeployOutputParser().transient_error() is None
+    assert [geary.deploy_retry_delay(attempt, 5) for attempt in (1, 2, 3)] == [5, 10, 20]
+    assert geary.deploy_retry_delay(20, 5) == geary.DEPLOY_RETRY_BACKOFF_MAX_SECONDS
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir).resolve()
+        slices = []
+        for name, deps in (("a", []), ("b", ["flows-a"]), ("c", ["flows-b"])):
+            write(root / "force-app" / "main" / "default" / "flows" / f"{name}.flow-meta.xml", "<Flow/>\n")
+            write(
+                root / "manifest" / f"slice-flows-{name}.xml",
+                f"<Package><types><members>{name}</members><name>Flow</name></types></Package>\n",
+            )
+            slices.append({"name": f"flows-{name}", "manifest": f"manifest/slice-flows-{name}.xml", "kind": "flows", "counts": {"flows": 1}, "dependsOn": deps})
+        write(root / "geary" / "out" / "slices.json", json.dumps({"apiVersion": "62.0", "slices": slices}) + "\n")
+        write(root / "geary" / "slices.yml", "version: 1\naliases:\n  chain:\n    includes: [flows-c]\n    withDeps: true\n")
+
+        failed = geary_cli(root, "install", "chain", "--target-org", "dev", FAKE_SF_FAIL="slice-flows-b.xml")
+        assert failed.returncode == 1, failed.stdout + failed.stderr
+        run_id = failed.stderr.split("run id: ", 1)[1].split()[0]
+        assert f"Resume with: geary install --resume {run_id} --target-org dev" in failed.stderr
+        state = geary.load_install_state(root / "runs", run_id)
+        assert state["status"] == "fail" and state["completed"] == ["flows-a"] and state["failed"] == ["flows-b"]
+        assert state["invocation"]["name"] == "chain"
+
+        # The resume reuses the alias, skips what finished, and retries b's connection reset.
+        mismatch = geary_cli(root, "install", "--resume", run_id, "--target-org", "prod")
+        assert mismatch.returncode != 0 and "installed to dev" in mismatch.stderr
+        log = root / "resume.log"
+        resumed = geary_cli(
+            root, "install", "--resume", run_id, "--target-org", "dev", "--force", "--retry-backoff", "0",
+            FAKE_SF_LOG=str(log), FAKE_SF_TRANSIENT="slice-flows-b.xml:1",
+        )
+        assert resumed.returncode == 0, resumed.stdout + resumed.stderr
+        assert f"Skipping flows-a: completed in run {run_id}." in resumed.stdout
+        assert "transient sf error (socket hang up); retry 1/2" in resumed.stdout
+        assert deployed_manifests(log) == ["slice-flows-b.xml", "slice-flows-b.xml", "slice-flows-c.xml"]
+        second_id = resumed.stderr.split("run id: ", 1)[1].split()[0]
+        receipt = json.loads((root / "runs" / second_id / "receipt.json").read_text(encoding="utf-8"))
+        assert receipt["resumed_from"] == run_id and receipt["target"] == "chain"
+        assert [(entry["name"], entry["status"], entry.get("attempts")) for entry in receipt["slices"]] == [
+            ("flows-a", "skipped", None),
+            ("flows-b", "deployed", 2),
+            ("flows-c", "deployed", 1),
+        ]
+        events = [json.loads(line) for line in (root / "runs" / second_id / "emissions.ndjson").read_text(encoding="utf-8").splitlines()]
+        assert [event["data"]["attempt"] for event in events if event["type"] == "slice.deploy.retry"] == [1]
+        assert geary.load_install_state(root / "runs", second_id)["completed"] == ["flows-a", "flows-b", "flows-c"]
+
+        done = geary_cli(root, "install", "--resume", second_id, "--target-org", "dev")
+        assert done.returncode == 0 and "already completed" in done.stdout
+
+        # Retries run out on a persistent transient error; genuine failures are never retried.
+        log = root / "exhausted.log"
+        exhausted = geary_cli(
+            root, "install", "flows-a", "--target-org", "dev", "--force", "--retries", "1", "--retry-backoff", "0",
+            FAKE_SF_LOG=str(log), FAKE_SF_TRANSIENT="slice-flows-a.xml:5",
+        )
+        assert exhausted.returncode == 1 and "Still failing after 2 attempts" in exhausted.stdout
+        assert deployed_manifests(log) == ["slice-flows-a.xml"] * 2
+        log = root / "genuine.log"
+        genuine = geary_cli(root, "install", "flows-a", "--target-org", "dev", "--force", FAKE_SF_LOG=str(log), FAKE_SF_FAIL="slice-flows-a.xml")
+        assert genuine.returncode == 1 and deployed_manifests(log) == ["slice-flows-a.xml"]
+
+
+if __name__ == "__main__":
+    main()
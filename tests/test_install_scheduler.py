@@ -0,0 +1,76 @@
+import importlib.util
+import threading
+import time
+from pathlib import Path
+
+
+def load_geary_module():
+    root = Path(__file__).resolve().parents[1]
+    geary_path = root / "tools" / "geary" / "geary.py"
+    spec = importlib.util.spec_from_file_location("geary_cli", geary_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class Recorder:
+    def __init__(self, fail=(), delay=0.05):
+        self.fail = set(fail)
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.started = []
+        self.finished = []
+
+    def __call__(self, name):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.started.append(name)
+        # Failures return at once so siblings are still in flight when the failure lands.
+        time.sleep(0 if name in self.fail else self.delay)
+        with self.lock:
+            self.active -= 1
+            self.finished.append(name)
+        return RuntimeError(name) if name in self.fail else None
+
+
+def main():
+    geary = load_geary_module()
+    dep_map = {
+        "dashboards-A": ["reports-A"],
+        "dashboards-B": ["reports-B"],
+        "dashboards": ["reports"],
+    }
+    order = ["reports", "reports-A", "reports-B", "dashboards", "dashboards-A", "dashboards-B", "perms"]
+    is_last = lambda name: name == "perms"
+
+    recorder = Recorder()
+    succeeded, failures, not_started = geary.run_dag_schedule(order, dep_map, 3, recorder, is_last=is_last)
+    assert failures == [] and not_started == [] and sorted(succeeded) == sorted(order)
+    # Independent report slices run side by side, never more than `jobs` at once.
+    assert recorder.peak == 3, recorder.peak
+    assert recorder.started[:3] == ["reports", "reports-A", "reports-B"]
+    for name, deps in dep_map.items():
+        for dep in deps:
+            assert recorder.finished.index(dep) < recorder.started.index(name)
+    # Permission sets still go last.
+    assert recorder.started[-1] == "perms" and recorder.finished[-1] == "perms"
+
+    # jobs=1 keeps the given order.
+    recorder = Recorder(delay=0)
+    geary.run_dag_schedule(order, dep_map, 1, recorder, is_last=is_last)
+    assert recorder.started == order
+
+    # A failure stops new work; in-flight siblings drain and dependants never start.
+    recorder = Recorder(fail={"reports-A"}, delay=0.2)
+    succeeded, failures, not_started = geary.run_dag_schedule(order, dep_map, 3, recorder, is_last=is_last)
+    assert [name for name, _ in failures] == ["reports-A"]
+    assert sorted(succeeded) == ["reports", "reports-B"]
+    assert not_started == ["dashboards", "dashboards-A", "dashboards-B", "perms"]
+    assert recorder.active == 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+GEARY = REPO_ROOT / "tools" / "geary" / "geary.py"
+FAKE_SF_DIR = Path(__file__).resolve().parent / "fake_sf"
+
+
+def load_geary_module():
+    spec = importlib.util.spec_from_file_location("geary_cli", GEARY)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def write(path: Path, text: str = "<x/>\n"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def git(root: Path, *args):
+    cmd = ["git", "-c", "user.name=geary", "-c", "user.email=geary@example.com", *args]
+    subprocess.run(cmd, cwd=root, check=True, capture_output=True)
+
+
+def main():
+    geary = load_geary_module()
+    assert geary.source_member("objects/Case/fields/Topic__c.field-meta.xml") == ("CustomField", "Case.Topic__c")
+    assert geary.source_member("lwc/card/templates/card.html") == ("LightningComponentBundle", "card")
+    assert geary.source_member("reports/Ops/Weekly.report-meta.xml") == ("Report", "Ops/Weekly")
+    assert geary.source_member("classes/Alpha.cls-meta.xml") == ("ApexClass", "Alpha")
+    assert geary.source_member("layouts/Case-Layout.layout-meta.xml") is None
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir).resolve()
+        base = root / "force-app" / "main" / "default"
+        write(base / "objects" / "Case" / "fields" / "Topic__c.field-meta.xml")
+        write(base / "objects" / "Case" / "fields" / "Urgency__c.field-meta.xml")
+        write(base / "classes" / "Alpha.cls", "public class Alpha {}\n")
+        write(base / "classes" / "Alpha.cls-meta.xml")
+        write(base / "classes" / "Beta.cls", "public class Beta {}\n")
+        write(base / "classes" / "Beta.cls-meta.xml")
+        write(base / "flows" / "Intake.flow-meta.xml")
+        write(root / "manifest" / "slice-objects.xml", "<Package><types><members>Case.Topic__c</members><members>Case.Urgency__c</members><name>CustomField</name></types></Package>\n")
+        write(root / "manifest" / "slice-apex.xml", "<Package><types><members>Alpha</members><members>Beta</members><name>ApexClass</name></types></Package>\n")
+        write(root / "manifest" / "slice-apex-alpha.xml", "<Package><types><members>Alpha</members><name>ApexClass</name></types></Package>\n")
+        slices = [
+            {"name": "apex", "manifest": "manifest/slice-apex.xml", "kind": "apex", "counts": {"apexClasses": 2}, "dependsOn": []},
+            {"name": "apex-alpha", "manifest": "manifest/slice-apex-alpha.xml", "kind": "apex", "counts": {"apexClasses": 1}, "dependsOn": []},
+            {"name": "objects", "manifest": "manifest/slice-objects.xml", "kind": "objects", "counts": {"customFields": 2}, "dependsOn": []},
+        ]
+        write(root / "geary" / "out" / "slices.json", json.dumps({"apiVersion": "62.0", "generatedFrom": "repo scan", "slices": slices}) + "\n")
+        git(root, "init", "-q")
+        git(root, "add", "-A")
+        git(root, "commit", "-qm", "base")
+
+        write(base / "objects" / "Case" / "fields" / "Urgency__c.field-meta.xml", "<changed/>\n")
+        write(base / "classes" / "Alpha.cls", "public class Alpha { Integer x; }\n")
+        write(base / "classes" / "Gamma.cls", "public class Gamma {}\n")
+        (base / "flows" / "Intake.flow-meta.xml").unlink()
+
+        changed = geary.git_changed_files(root, "HEAD")
+        assert "force-app/main/default/classes/Gamma.cls" in changed
+        members, deleted, unmapped = geary.changed_members(root, changed)
+        assert members == {"CustomField": {"Case.Urgency__c"}, "ApexClass": {"Alpha", "Gamma"}}, members
+        assert deleted == ["force-app/main/default/flows/Intake.flow-meta.xml"] and unmapped == []
+
+        env = dict(os.environ, PATH=f"{FAKE_SF_DIR}{os.pathsep}{os.environ['PATH']}")
+        full = [sys.executable, str(GEARY), "install", "--all", "--root", str(root), "--target-org", "dev"]
+        assert subprocess.run(full, env=env, capture_output=True, text=True).returncode == 0
+        fingerprints = geary.load_deploy_fingerprints(root, "dev")
+        cmd = full + ["--since", "HEAD"]
+        result = subprocess.run(cmd, env=env, capture_output=True, text=True)
+        assert result.returncode == 0, result.stdout + result.stderr
+        delta_dir = root / "geary" / "out" / "delta"
+        # Alpha is in two slices but deploys once, with the first slice in the order.
+        assert sorted(path.name for path in delta_dir.iterdir()) == ["slice-apex.xml", "slice-objects.xml"]
+        assert geary.manifest_members(delta_dir / "slice-apex.xml") == {"ApexClass": ["Alpha"]}
+        assert geary.manifest_members(delta_dir / "slice-objects.xml") == {"CustomField": ["Case.Urgency__c"]}
+        assert "ApexClass:Gamma" in result.stdout
+        assert f"--manifest {delta_dir / 'slice-objects.xml'}" in result.stdout
+
+        # Delta deploys leave the full-deploy fingerprints alone, so an unchanged full install still skips.
+        assert {name: record["fingerprint"] for name, record in geary.load_deploy_fingerprints(root, "dev").items()} == {
+            name: record["fingerprint"] for name, record in fingerprints.items()
+        }
+        result = subprocess.run(full, env=env, capture_output=True, text=True)
+        assert result.returncode == 0, result.stdout + result.stderr
+        assert result.stdout.count("Skipping ") == 3 and "--manifest" not in result.stdout
+
+
+if __name__ == "__main__":
+    main()
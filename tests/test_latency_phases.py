@@ -0,0 +1,105 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+GEARY = REPO_ROOT / "tools" / "geary" / "geary.py"
+NETWORK_PHASES = ["dns_ms", "connect_ms", "tls_ms", "send_ms", "ttfb_ms", "transfer_ms"]
+
+
+def load_module(name: str, path: Path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class Worker(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", "0")))
+        # Stands in for the worker rendering, so it should land in time-to-first-byte.
+        time.sleep(0.1)
+        body = json.dumps({"ok": True, "svg": "<svg/>"}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def geary_cli(root: Path, base: str, *args):
+    env = dict(os.environ, WORKER_URL=base, GEARY_KEY="k")
+    cmd = [sys.executable, str(GEARY), *args]
+    return subprocess.run(cmd, env=env, capture_output=True, text=True, cwd=root)
+
+
+def main():
+    client = load_module("geary_mermaid_client", GEARY.parent / "mermaid_client.py")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Worker)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        pool = client.WorkerConnectionPool()
+        phases = {}
+        pool.request("POST", base + "/render", b"{}", phases=phases)
+        assert list(phases) == NETWORK_PHASES and phases["tls_ms"] == 0.0
+        assert phases["ttfb_ms"] >= 100 and phases["connect_ms"] < phases["ttfb_ms"]
+        # A reused connection skips DNS, connect and TLS.
+        pool.request("POST", base + "/render", b"{}", phases=phases)
+        assert phases["dns_ms"] == phases["connect_ms"] == 0.0 and phases["ttfb_ms"] >= 100
+
+        failed = {}
+        try:
+            client.WorkerConnectionPool().request("POST", "http://127.0.0.1:9/render", b"{}", timeout=2, phases=failed)
+        except client.urllib.error.URLError:
+            pass
+        else:
+            raise AssertionError("expected URLError for a closed port")
+        assert "dns_ms" in failed and "ttfb_ms" not in failed
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir).resolve()
+            (root / "diagram.mmd").write_text("flowchart TD\n  A-->B\n", encoding="utf-8")
+            for _ in range(2):
+                result = geary_cli(root, base, "run", "--in", "diagram.mmd", "--no-cache")
+                assert result.returncode == 0, result.stdout + result.stderr
+            result = geary_cli(root, base, "doctor")
+            assert result.returncode == 0, result.stdout + result.stderr
+            assert "latency phases: dns " in result.stdout
+
+            run_id = next(path.parent.name for path in (root / "runs").glob("*/receipt.json"))
+            receipt = json.loads((root / "runs" / run_id / "receipt.json").read_text(encoding="utf-8"))
+            assert list(receipt["latency_phases"]) == NETWORK_PHASES + ["decode_ms"]
+            events = [json.loads(line) for line in (root / "runs" / run_id / "emissions.ndjson").read_text(encoding="utf-8").splitlines()]
+            received = next(event["data"] for event in events if event["type"] == "response.received")
+            assert received["phases"] == receipt["latency_phases"]
+
+            result = geary_cli(root, base, "stats", "latency")
+            assert result.returncode == 0, result.stdout + result.stderr
+            assert result.stdout.startswith("3 worker response(s)")
+            ttfb = next(line for line in result.stdout.splitlines() if line.startswith("ttfb "))
+            assert float(ttfb.split()[2].rstrip("ms")) >= 100
+            assert "worker (ttfb): 9" in result.stdout
+            result = geary_cli(root, base, "stats", "latency", "--command", "doctor")
+            assert result.stdout.startswith("1 worker response(s)")
+            result = geary_cli(root, base, "stats", "latency", "--runs-dir", str(root / "missing"))
+            assert "No worker latency phases" in result.stdout
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
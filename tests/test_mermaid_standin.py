@@ -0,0 +1,88 @@
+import importlib
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+RUNNER_ROOT = REPO_ROOT / "cf" / "mermaid-runner"
+
+
+def load_standin_module():
+    spec = importlib.util.spec_from_file_location("mermaid_standin", RUNNER_ROOT / "app" / "standin.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def render(standin, payload, key="k", expected="k", config=None, raw=None):
+    body = raw if raw is not None else json.dumps(payload).encode("utf-8")
+    return standin.handle_render(body, key, expected, config or standin.StandInConfig({}))
+
+
+def check_endpoints(standin):
+    try:
+        from fastapi.testclient import TestClient
+    except ImportError:
+        print("fastapi (with httpx) not installed; skipping the endpoint checks.")
+        return
+    sys.path.insert(0, str(RUNNER_ROOT))
+    try:
+        client = TestClient(importlib.import_module("app.main").app)
+    finally:
+        sys.path.remove(str(RUNNER_ROOT))
+    headers = {standin.KEY_HEADER: "k"}
+    response = client.post("/render", json={"mermaid": "graph TD\nA-->B", "format": "svg"}, headers=headers)
+    assert response.status_code == 200 and "<svg" in response.json()["svg"]
+    assert client.post("/render", json={"mermaid": "graph TD"}).status_code == 401
+    for method, path in (("GET", "/render"), ("POST", "/elsewhere"), ("DELETE", "/")):
+        response = client.request(method, path)
+        assert response.status_code == 404, (method, path)
+        assert response.json()["ok"] is False and response.json()["error"] == "not_found" and response.json()["requestId"]
+    assert client.options("/render").status_code == 204
+    assert client.get("/api/health").json() == {"ok": True}
+
+
+def main():
+    standin = load_standin_module()
+
+    # Same input, same bytes; the SVG reflects the diagram and escapes labels.
+    first = render(standin, {"mermaid": "flowchart TD\n  A-->B", "format": "svg"})
+    again = render(standin, {"mermaid": "flowchart TD\n  A-->B", "format": "svg"})
+    assert first == again and first[1] == 200 and first[0] == 0.0
+    assert ">A</text>" in first[2]["svg"] and first[2]["requestId"].startswith("standin-")
+    assert render(standin, {"mermaid": "graph TD\n  A-->B<", "format": "svg", "id": "r1"})[2]["requestId"] == "r1"
+    ast = render(standin, {"mermaid": "classDiagram\nclass Foo\nFoo <|-- Bar"})[2]["ast"]
+    assert ast == {"kind": "classDiagram", "classes": ["Bar", "Foo"], "relations": [{"from": "Foo", "to": "Bar", "type": "<|--"}]}
+    assert standin.basic_mermaid_parse("pie\n") == {"kind": "unknown", "raw": "pie\n"}
+
+    # Checks run in the Worker's order: size, auth, JSON, mermaid; faults only after all of them.
+    always_limited = standin.StandInConfig({"STANDIN_RATE_LIMIT_RATE": "1"})
+    oversized = b"{" + b" " * standin.MAX_MERMAID_BYTES + b"}"
+    assert render(standin, None, key=None, raw=oversized, config=always_limited)[1:3] == (413, {"ok": False, "error": "payload_too_large", "requestId": standin.request_id_for(oversized)})
+    assert render(standin, None, key=None, raw=b"nope", config=always_limited)[2]["error"] == "unauthorized"
+    assert render(standin, None, key="wrong", raw=b"{}")[1] == 401
+    assert render(standin, {"mermaid": "graph TD"}, key="any", expected=None)[1] == 200
+    assert render(standin, None, raw=b"nope", config=always_limited)[2]["error"] == "invalid_json"
+    assert render(standin, {"mermaid": "  "}, config=always_limited)[2]["error"] == "missing_mermaid"
+    delay, status, body, headers = render(standin, {"mermaid": "graph TD"}, config=always_limited)
+    assert (status, body["error"], headers) == (429, "rate_limited", {"Retry-After": "1"})
+    assert render(standin, {"mermaid": "graph TD"}, config=standin.StandInConfig({"STANDIN_ERROR_RATE": "1"}))[1] == 500
+
+    # Injected rates and latency follow the configuration and repeat for the same seed.
+    env = {"STANDIN_RATE_LIMIT_RATE": "0.1", "STANDIN_ERROR_RATE": "0.2", "STANDIN_LATENCY_MS": "100", "STANDIN_JITTER_MS": "50", "STANDIN_SEED": "7"}
+    config = standin.StandInConfig(env)
+    rolls = [config.roll() for _ in range(4000)]
+    replay = standin.StandInConfig(env)
+    assert rolls == [replay.roll() for _ in range(4000)]
+    faults = [fault for _, fault in rolls]
+    assert 0.08 < faults.count(429) / 4000 < 0.12 and 0.17 < faults.count(500) / 4000 < 0.23
+    assert all(0.1 <= delay <= 0.15 for delay, _ in rolls)
+    assert standin.StandInConfig({}).roll() == (0.0, None)
+
+    assert standin.not_found("GET", "/render")[0] == 404
+    check_endpoints(standin)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import importlib.util
+import tempfile
+from pathlib import Path
+
+
+def load_geary_module():
+    root = Path(__file__).resolve().parents[1]
+    geary_path = root / "tools" / "geary" / "geary.py"
+    spec = importlib.util.spec_from_file_location("geary_cli", geary_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def write(path: Path, text: str = "<x/>\n"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def main():
+    geary = load_geary_module()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir).resolve()
+        write(root / "sfdx-project.json", '{"packageDirectories": [{"path": "core"}, {"path": "ui"}]}\n')
+        core = root / "core" / "main" / "default"
+        ui = root / "ui" / "main" / "default"
+        write(core / "classes" / "Alpha.cls")
+        write(ui / "classes" / "Alpha.cls-meta.xml")
+        write(core / "classes" / "Orphan.cls")
+        write(core / "triggers" / "CaseTrigger.trigger")
+        write(core / "triggers" / "CaseTrigger.trigger-meta.xml")
+        write(core / "objects" / "Thing__c" / "Thing__c.object-meta.xml")
+        write(
+            core / "objects" / "Thing__c" / "fields" / "Owner__c.field-meta.xml",
+            "<CustomField><type>Lookup</type><required>true</required></CustomField>\n",
+        )
+        write(ui / "objects" / "Ghost__c" / "fields" / "Name__c.field-meta.xml")
+        write(
+            core / "permissionsets" / "Ops.permissionset-meta.xml",
+            "<PermissionSet><classAccesses><apexClass>Missing</apexClass></classAccesses>"
+            "<objectPermissions><object>Ghost__c</object></objectPermissions></PermissionSet>\n",
+        )
+
+        index = geary.MetadataIndex.load(root)
+        # Source and meta may live in different package dirs; a lone .cls is not deployable.
+        assert index.has_apex_class("Alpha") and not index.has_apex_class("Orphan")
+        assert "Orphan" in index.apex_classes
+        assert index.has_apex_trigger("CaseTrigger")
+        assert index.has_object("Thing__c") and not index.has_object("Ghost__c")
+        assert index.has_field("Thing__c.Owner__c") and index.has_field("Ghost__c.Name__c")
+        assert index.has_permset("Ops")
+        lint = geary.schema_lint_errors(index)
+        assert len(lint) == 2 and "Ghost__c.object-meta.xml" in lint[0] and "Owner__c" in lint[1], lint
+        errors, warnings = geary.validate_permsets(index)
+        assert [missing for _, missing in errors] == [["Missing"]]
+        assert [missing for _, missing in warnings] == [["Ghost__c"]]
+
+        manifests = root / "manifest"
+        write(
+            manifests / "slice-apex.xml",
+            "<Package><types><members>Alpha</members><members>Orphan</members><name>ApexClass</name></types>"
+            "<types><members>CaseTrigger</members><members>Gone</members><name>ApexTrigger</name></types></Package>\n",
+        )
+        write(manifests / "slice-clean.xml", "<Package><types><members>Alpha</members><name>ApexClass</name></types></Package>\n")
+        results = geary.validate_manifest_members(index, sorted(manifests.glob("slice-*.xml")))
+        assert results == {
+            manifests / "slice-apex.xml": [("ApexClass", "Orphan"), ("ApexTrigger", "Gone")],
+            manifests / "slice-clean.xml": [],
+        }, results
+
+        # A fresh process reuses the snapshot until something it walked or parsed changes.
+        snapshot = geary.MetadataIndex.from_snapshot(root)
+        assert snapshot is not None and snapshot.has_apex_class("Alpha")
+        assert snapshot.lookup_errors == index.lookup_errors
+        write(core / "classes" / "Orphan.cls-meta.xml")
+        assert geary.MetadataIndex.from_snapshot(root) is None
+        write(
+            core / "objects" / "Thing__c" / "fields" / "Owner__c.field-meta.xml",
+            "<CustomField><type>Lookup</type><required>false</required></CustomField>\n",
+        )
+        index = geary.MetadataIndex.load(root, refresh=True)
+        assert index.has_apex_class("Orphan") and len(geary.schema_lint_errors(index)) == 1
+        assert geary.MetadataIndex.from_snapshot(root) is not None
+
+
+if __name__ == "__main__":
+    main()
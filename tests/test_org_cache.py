@@ -0,0 +1,78 @@
+import importlib.util
+import json
+import os
+import tempfile
+from pathlib import Path
+
+FAKE_SF_DIR = Path(__file__).resolve().parent / "fake_sf"
+
+
+def load_geary_module():
+    root = Path(__file__).resolve().parents[1]
+    geary_path = root / "tools" / "geary" / "geary.py"
+    spec = importlib.util.spec_from_file_location("geary_cli", geary_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def sf_calls(log_path: Path):
+    if not log_path.exists():
+        return []
+    return [json.loads(line) for line in log_path.read_text(encoding="utf-8").splitlines()]
+
+
+def main():
+    geary = load_geary_module()
+    saved_env = dict(os.environ)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir).resolve()
+        log_path = root / "sf-calls.ndjson"
+        os.environ["PATH"] = f"{FAKE_SF_DIR}{os.pathsep}{os.environ['PATH']}"
+        os.environ["FAKE_SF_LOG"] = str(log_path)
+        os.environ["FAKE_SF_ORG_TYPE"] = "production"
+        os.environ["FAKE_SF_FLOWS"] = "Intake,Escalation"
+        try:
+            cache = geary.OrgCache(root, "prod")
+            assert geary.is_production_org("prod", cache) is True
+            assert geary.is_production_org("prod", geary.OrgCache(root, "prod")) is True
+            assert len(sf_calls(log_path)) == 1
+            assert [event["hit"] for event in cache.events] == [False]
+
+            # Only the org flags are stored, never the access token.
+            stored = (root / "geary" / "out" / "orgs" / "prod.json").read_text(encoding="utf-8")
+            assert "fake-token" not in stored and "instanceUrl" not in stored
+
+            # The production policy still applies when the answer comes from the cache.
+            cache = geary.OrgCache(root, "prod")
+            assert geary.apply_test_level_policy("prod", "NoTestRun", None, cache) == ("RunLocalTests", None)
+            assert cache.hits() and len(sf_calls(log_path)) == 1
+
+            # --refresh and an expired entry both query the org again.
+            assert geary.is_production_org("prod", geary.OrgCache(root, "prod", refresh=True)) is True
+            assert len(sf_calls(log_path)) == 2
+            payload = json.loads(stored)
+            payload["entries"]["display"]["fetchedAtEpoch"] -= geary.ORG_INFO_TTL_SECONDS + 1
+            (root / "geary" / "out" / "orgs" / "prod.json").write_text(json.dumps(payload), encoding="utf-8")
+            assert geary.is_production_org("prod", geary.OrgCache(root, "prod")) is True
+            assert len(sf_calls(log_path)) == 3
+
+            # Metadata listings are cached next to the flags, per org.
+            flows, error = geary.list_org_flows("prod", geary.OrgCache(root, "prod"))
+            assert flows == {"Intake", "Escalation"} and error == ""
+            cache = geary.OrgCache(root, "prod")
+            assert geary.list_org_flows("prod", cache) == (flows, "")
+            assert cache.hits()[0]["key"] == "metadata:Flow"
+            os.environ["FAKE_SF_ORG_TYPE"] = "sandbox"
+            assert geary.is_production_org("dev", geary.OrgCache(root, "dev")) is False
+            assert [call[:2] for call in sf_calls(log_path)] == [["org", "display"]] * 3 + [
+                ["org", "list"],
+                ["org", "display"],
+            ]
+        finally:
+            os.environ.clear()
+            os.environ.update(saved_env)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import importlib.util
+import json
+import os
+import tempfile
+from pathlib import Path
+
+
+def load_geary_module():
+    root = Path(__file__).resolve().parents[1]
+    geary_path = root / "tools" / "geary" / "geary.py"
+    spec = importlib.util.spec_from_file_location("geary_cli", geary_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def main():
+    geary = load_geary_module()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir).resolve()
+        out_dir = root / "geary" / "out"
+        out_dir.mkdir(parents=True)
+        slices = [
+            {"name": "reports-Ops", "manifest": "manifest/slice-reports-Ops.xml", "kind": "reports", "counts": {"reports": 2}, "dependsOn": []},
+            {"name": "dashboards-Ops", "manifest": "manifest/slice-dashboards-Ops.xml", "kind": "dashboards", "counts": {"dashboards": 1}, "dependsOn": ["reports-Ops"]},
+        ]
+        registry = {"apiVersion": "62.0", "generatedFrom": "repo scan", "slices": slices}
+        (out_dir / "slices.json").write_text(json.dumps(registry, indent=2) + "\n", encoding="utf-8")
+        alias_path = root / "geary" / "slices.yml"
+        alias_path.write_text("version: 1\naliases:\n  ops:\n    includes: [dashboards-Ops]\n    withDeps: true\n", encoding="utf-8")
+
+        store = geary.RegistryStore.open(root)
+        assert store is not None and (out_dir / geary.REGISTRY_STORE_NAME).exists()
+        assert store.slice("dashboards-Ops") == slices[1]
+        assert store.slice("missing") is None
+        assert store.dependencies("dashboards-Ops") == ["reports-Ops"]
+        assert store.alias("ops") == {"includes": ["dashboards-Ops"], "withDeps": True}
+
+        # The lazy views behave like the dicts built from slices.json.
+        _, stored = geary.load_registry(root)
+        assert stored.store is store and list(stored) == ["reports-Ops", "dashboards-Ops"]
+        assert dict(stored.items()) == {entry["name"]: entry for entry in slices}
+        dep_map = geary.dependency_map(stored)
+        assert geary.topo_sort(geary.expand_with_deps(["dashboards-Ops"], dep_map, stored), dep_map) == [
+            "reports-Ops",
+            "dashboards-Ops",
+        ]
+
+        # Editing slices.yml makes the store stale; the next open rebuilds it.
+        alias_path.write_text(alias_path.read_text(encoding="utf-8") + "  ops-reports:\n    includes: [reports-Ops]\n", encoding="utf-8")
+        aliases = geary.load_aliases(root)
+        assert aliases["ops-reports"] == {"includes": ["reports-Ops"], "withDeps": False}
+        assert geary.RegistryStore.open(root) is not store
+
+        os.environ["GEARY_REGISTRY_STORE"] = "0"
+        try:
+            assert geary.RegistryStore.open(root) is None
+            _, plain = geary.load_registry(root)
+            assert isinstance(plain, dict) and plain == dict(stored.items())
+        finally:
+            del os.environ["GEARY_REGISTRY_STORE"]
+
+
+if __name__ == "__main__":
+    main()
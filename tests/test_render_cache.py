@@ -0,0 +1,139 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+GEARY = REPO_ROOT / "tools" / "geary" / "geary.py"
+
+
+def load_geary_module():
+    spec = importlib.util.spec_from_file_location("geary_cli", GEARY)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class Worker(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", "0")))
+        Worker.requests += 1
+        body = json.dumps({"ok": True, "svg": f"<svg id='{Worker.requests}'/>"}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def geary_run(root: Path, base: str, *args):
+    env = dict(os.environ, WORKER_URL=base, GEARY_KEY="k")
+    cmd = [sys.executable, str(GEARY), "run", *args, "--root", str(root)]
+    result = subprocess.run(cmd, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout + result.stderr
+    run_id = result.stderr.rsplit("run id: ", 1)[1].split()[0]
+    run_dir = root / "runs" / run_id
+    receipt = json.loads((run_dir / "receipt.json").read_text(encoding="utf-8"))
+    events = [json.loads(line)["type"] for line in (run_dir / "emissions.ndjson").read_text(encoding="utf-8").splitlines()]
+    return result, receipt, events
+
+
+def main():
+    geary = load_geary_module()
+    key = geary.RenderCache.key("abc", "svg", "https://worker.example")
+    assert key == geary.RenderCache.key("abc", "svg", "https://worker.example/render")
+    assert key != geary.RenderCache.key("abc", "png", "https://worker.example")
+    assert key != geary.RenderCache.key("abc", "svg", "https://other.example")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir).resolve()
+        # Least recently used entries go first once the cache is over its size bound.
+        cache = geary.RenderCache(root / "lru", max_bytes=25)
+        cache.put("a", "svg", b"x" * 10)
+        time.sleep(0.02)
+        cache.put("b", "svg", b"y" * 10)
+        time.sleep(0.02)
+        assert cache.get("a", "svg") == b"x" * 10
+        time.sleep(0.02)
+        cache.put("c", "svg", b"z" * 10)
+        assert cache.get("b", "svg") is None and cache.get("a", "svg") and cache.get("c", "svg")
+        cache.put("huge", "svg", b"h" * 100)
+        assert cache.get("huge", "svg") is None and cache.get("c", "svg")
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Worker)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            source = root / "diagram.mmd"
+            source.write_text("flowchart TD\n  A-->B\n", encoding="utf-8")
+            result, receipt, events = geary_run(root, base, "--in", str(source))
+            assert Worker.requests == 1 and receipt["cache_hit"] is False and "cache.hit" not in events
+            assert result.stdout == "<svg id='1'/>\n"
+
+            # Whitespace-only edits normalize to the same input, so nothing reaches the worker.
+            source.write_text("flowchart TD  \r\n  A-->B\r\n\r\n", encoding="utf-8")
+            result, receipt, events = geary_run(root, base, "--in", str(source))
+            assert Worker.requests == 1 and receipt["cache_hit"] is True and receipt["status"] == "ok"
+            assert "cache.hit" in events and "request.sent" not in events
+            assert result.stdout == "<svg id='1'/>\n"
+
+            result, receipt, events = geary_run(root, base, "--in", str(source), "--no-cache")
+            assert Worker.requests == 2 and receipt["cache_hit"] is False and result.stdout == "<svg id='2'/>\n"
+
+            # Each batch item checks the cache on its own.
+            (root / "docs").mkdir()
+            (root / "docs" / "same.mmd").write_text("flowchart TD\n  A-->B\n", encoding="utf-8")
+            (root / "docs" / "new.mmd").write_text("flowchart TD\n  C-->D\n", encoding="utf-8")
+            env = dict(os.environ, WORKER_URL=base, GEARY_KEY="k")
+            batch = subprocess.run(
+                [sys.executable, str(GEARY), "run", "--batch", "docs", "--root", str(root)],
+                env=env,
+                capture_output=True,
+                text=True,
+            )
+            assert batch.returncode == 0, batch.stdout + batch.stderr
+            batch_id = batch.stderr.rsplit("run id: ", 1)[1].split()[0]
+            summary = json.loads((root / "runs" / batch_id / "receipt.json").read_text(encoding="utf-8"))
+            assert summary["cache_hits"] == 1 and Worker.requests == 3
+            assert list((root / "runs" / ".cache").glob("*.svg"))
+
+            # A cache that cannot be written, or a bad size bound, never fails the render.
+            other = root / "unwritable"
+            (other / "runs").mkdir(parents=True)
+            (other / "runs" / ".cache").write_text("not a directory\n", encoding="utf-8")
+            os.environ["GEARY_RENDER_CACHE_MAX_MB"] = "abc"
+            try:
+                result, receipt, events = geary_run(other, base, "--in", str(source))
+                assert receipt["status"] == "ok" and receipt["cache_hit"] is False
+                assert "cache.store_skipped" in events and "run.completed" in events
+                assert result.stdout.startswith("<svg") and "Ignoring GEARY_RENDER_CACHE_MAX_MB='abc'" in result.stderr
+                result, receipt, _ = geary_run(other, base, "--in", str(source), "--offline")
+                assert receipt["status"] == "ok" and "Ignoring" not in result.stderr
+                batch = subprocess.run(
+                    [sys.executable, str(GEARY), "run", "--batch", str(root / "docs"), "--root", str(other)],
+                    env=env,
+                    capture_output=True,
+                    text=True,
+                )
+                assert batch.returncode == 0, batch.stdout + batch.stderr
+            finally:
+                del os.environ["GEARY_RENDER_CACHE_MAX_MB"]
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+GEARY = REPO_ROOT / "tools" / "geary" / "geary.py"
+
+
+def load_geary_module():
+    spec = importlib.util.spec_from_file_location("geary_cli", GEARY)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def write(path: Path, text: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+class Worker(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    lock = threading.Lock()
+    in_flight = 0
+    peak = 0
+    throttle = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", "0")))
+        with Worker.lock:
+            Worker.in_flight += 1
+            Worker.peak = max(Worker.peak, Worker.in_flight)
+            limited = Worker.throttle > 0
+            Worker.throttle -= int(limited)
+        time.sleep(0.05)
+        with Worker.lock:
+            Worker.in_flight -= 1
+        status, payload = (429, {"ok": False, "error": "rate limited"}) if limited else (200, {"ok": True, "svg": "<svg/>"})
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def batch(root: Path, base: str, *args):
+    env = dict(os.environ, WORKER_URL=base, GEARY_KEY="k")
+    cmd = [sys.executable, str(GEARY), "run", *args, "--root", str(root)]
+    result = subprocess.run(cmd, env=env, capture_output=True, text=True)
+    batch_id = result.stderr.rsplit("run id: ", 1)[1].split()[0]
+    receipt = json.loads((root / "runs" / batch_id / "receipt.json").read_text(encoding="utf-8"))
+    return result, receipt
+
+
+def main():
+    geary = load_geary_module()
+    limiter = geary.AdaptiveConcurrency(4, retries=2, backoff=0.01)
+    assert limiter.on_rate_limited(1) == 0.01 and limiter.limit == 2
+    # Concurrent 429s inside one back-off window halve the cap once.
+    assert limiter.on_rate_limited(1) == 0.01 and limiter.limit == 2
+    time.sleep(0.02)
+    limiter.on_success()
+    limiter.on_success()
+    assert limiter.limit == 3 and limiter.lowest == 2
+    assert limiter.on_rate_limited(3) is None and limiter.rate_limited == 3
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir).resolve()
+        for idx in range(12):
+            write(root / "diagrams" / ("nested" if idx % 3 == 0 else "") / f"d{idx:02d}.mmd", f"flowchart TD\n  A{idx}-->B\n")
+        write(root / "jobs.ndjson", '{"id": "inline/one", "mermaid": "flowchart TD\\n  X-->Y\\n"}\n\n{"path": "diagrams/d01.mmd"}\n')
+        items = geary.batch_inputs(root, "diagrams")
+        assert len(items) == 12 and items[0][0] == "d01" and items[-1][0] == "nested/d09"
+        assert [label for label, _, _ in geary.batch_inputs(root, "diagrams/d0*.mmd")][:2] == ["diagrams/d01", "diagrams/d02"]
+        assert geary.batch_inputs(root, "jobs.ndjson") == [
+            ("inline_one", None, "flowchart TD\n  X-->Y\n"),
+            ("3", root / "diagrams" / "d01.mmd", None),
+        ]
+        write(root / "bad.ndjson", '{"id": "x"}\n')
+        try:
+            geary.batch_inputs(root, "bad.ndjson")
+        except ValueError as err:
+            assert "bad.ndjson:1" in str(err)
+        else:
+            raise AssertionError("expected ValueError")
+
+        # An input that raises is recorded as failed; the rest of the batch and its receipt survive.
+        render, load_env = geary.render_mermaid_run, geary.load_env_files
+        env_loads = []
+
+        def flaky(root_arg, item_args, *args, **kwargs):
+            if item_args.input_path.endswith("d04.mmd"):
+                raise OSError("disk full")
+            return render(root_arg, item_args, *args, **kwargs)
+
+        geary.render_mermaid_run = flaky
+        geary.load_env_files = lambda *args: env_loads.append(args)
+        try:
+            batch_args = argparse.Namespace(
+                batch="diagrams", format="svg", out=None, env_file=None, offline=True, no_cache=False, concurrency=4
+            )
+            with contextlib.redirect_stderr(io.StringIO()) as err:
+                assert geary.run_batch(root, batch_args) == 1
+        finally:
+            geary.render_mermaid_run, geary.load_env_files = render, load_env
+        assert len(env_loads) == 1
+        batch_id = err.getvalue().rsplit("run id: ", 1)[1].split()[0]
+        receipt = json.loads((root / "runs" / batch_id / "receipt.json").read_text(encoding="utf-8"))
+        assert receipt["ok"] == 11 and receipt["failed"] == 1
+        failed = next(entry for entry in receipt["items"] if entry["status"] == "fail")
+        assert failed["input"] == "d04" and failed["error_code"] == "UNKNOWN" and "disk full" in failed["error_message"]
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Worker)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            result, receipt = batch(root, base, "--batch", "diagrams", "--concurrency", "4", "--out", "out")
+            assert result.returncode == 0, result.stdout + result.stderr
+            assert result.stdout == ""
+            assert receipt["command"] == "run.batch" and receipt["ok"] == 12 and receipt["rate_limited"] == 0
+            assert 1 < Worker.peak <= 4 and receipt["peak_in_flight"] <= 4
+            assert (root / "out" / "nested" / "d00.svg").read_text(encoding="utf-8") == "<svg/>"
+            for entry in receipt["items"]:
+                item = json.loads((root / "runs" / entry["run_id"] / "receipt.json").read_text(encoding="utf-8"))
+                assert item["command"] == "run" and item["status"] == "ok" and item["output_hash"]
+
+            # 429s lower the concurrency and are retried inside each input's own run.
+            Worker.throttle = 3
+            result, receipt = batch(root, base, "--batch", "jobs.ndjson", "--concurrency", "4")
+            assert result.returncode == 0, result.stdout + result.stderr
+            assert receipt["ok"] == 2 and receipt["rate_limited"] >= 1 and receipt["lowest_concurrency"] < 4
+            limited = []
+            for entry in receipt["items"]:
+                emissions = (root / "runs" / entry["run_id"] / "emissions.ndjson").read_text(encoding="utf-8")
+                limited += [json.loads(line) for line in emissions.splitlines() if '"request.rate_limited"' in line]
+            assert limited and "rate-limited response(s)" in result.stderr
+
+            missing = subprocess.run(
+                [sys.executable, str(GEARY), "run", "--batch", "nothing/*.mmd", "--root", str(root)],
+                capture_output=True,
+                text=True,
+            )
+            assert missing.returncode == 2 and "No Mermaid inputs" in missing.stderr
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
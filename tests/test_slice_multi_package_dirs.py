@@ -0,0 +1,72 @@
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+
+def write(path: Path, text: str = "<x/>\n"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def build_repo(root: Path):
+    write(root / "sfdx-project.json", '{"packageDirectories": [{"path": "core"}, {"path": "ui"}, {"path": "ops"}]}\n')
+    core = root / "core" / "main" / "default"
+    write(core / "classes" / "Alpha.cls")
+    write(core / "classes" / "Alpha.cls-meta.xml")
+    write(core / "objects" / "Thing__c" / "Thing__c.object-meta.xml")
+    write(core / "objects" / "Thing__c" / "fields" / "Name__c.field-meta.xml")
+    write(core / "reports" / "Ops.reportFolder-meta.xml")
+    write(core / "reports" / "Ops" / "Open.report-meta.xml")
+    ui = root / "ui" / "main" / "default"
+    write(ui / "lwc" / "panel" / "panel.js")
+    write(ui / "classes" / "Alpha.cls")
+    write(ui / "objects" / "Thing__c" / "fields" / "Extra__c.field-meta.xml")
+    ops = root / "ops" / "main" / "default"
+    write(ops / "dashboards" / "Ops.dashboardFolder-meta.xml")
+    write(
+        ops / "dashboards" / "Ops" / "Home.dashboard-meta.xml",
+        "<Dashboard><dashboardComponent><report>Ops/Open</report></dashboardComponent>"
+        "<dashboardComponent><report>Ops/Gone</report></dashboardComponent></Dashboard>\n",
+    )
+    write(ops / "reports" / "Ops" / "Closed.report-meta.xml")
+
+
+def run_slices(root: Path, out: str, manifest_dir: str, jobs: int):
+    script = Path(__file__).resolve().parents[1] / "tools" / "geary" / "slices.py"
+    cmd = [sys.executable, str(script), "--root", str(root), "--out", out, "--manifest-dir", manifest_dir]
+    cmd.extend(["--jobs", str(jobs), "--full"])
+    subprocess.run(cmd, check=True, capture_output=True, text=True)
+    outputs = {}
+    for path in sorted((root / manifest_dir).glob("slice-*.xml")):
+        outputs[path.name] = path.read_bytes()
+    for name in ("slices.json", "slices.md"):
+        outputs[name] = (root / out / name).read_bytes()
+    return outputs
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        build_repo(root)
+        serial = run_slices(root, "out-serial", "manifest-serial", 1)
+        parallel = run_slices(root, "out-parallel", "manifest-parallel", 4)
+        assert serial.keys() == parallel.keys()
+        for name in serial:
+            expected = serial[name].replace(b"manifest-serial", b"manifest-parallel")
+            assert expected == parallel[name], name
+        assert b"<members>Thing__c.Extra__c</members>" in serial["slice-objects.xml"]
+        assert b"missing_report: Ops/Gone" in serial["slices.json"]
+
+        # A no-op rerun leaves every output untouched and reports nothing changed.
+        manifest = root / "manifest-serial" / "slice-objects.xml"
+        before = manifest.stat().st_mtime_ns
+        run_slices(root, "out-serial", "manifest-serial", 1)
+        assert manifest.stat().st_mtime_ns == before
+        changed = json.loads((root / "out-serial" / "changed.json").read_text(encoding="utf-8"))
+        assert changed == {"changed": []}
+
+
+if __name__ == "__main__":
+    main()
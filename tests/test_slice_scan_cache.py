@@ -0,0 +1,83 @@
+import importlib.util
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+
+def load_geary_slices_module():
+    root = Path(__file__).resolve().parents[1]
+    slices_path = root / "tools" / "geary" / "slices.py"
+    spec = importlib.util.spec_from_file_location("geary_slices", slices_path)
+    module = importlib.util.module_from_spec(spec)
+    # Registered so the dashboard process pool can pickle module-level functions.
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def main():
+    module = load_geary_slices_module()
+    dashboard = """<?xml version="1.0" encoding="UTF-8"?>
+<Dashboard xmlns="http://soap.sforce.com/2006/04/metadata">
+    <dashboardGridComponents>
+        <dashboardComponent>
+            <report>Ops/Open_Cases</report>
+        </dashboardComponent>
+    </dashboardGridComponents>
+</Dashboard>
+"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        path = root / "dashboards" / "Ops" / "Ops_Home.dashboard-meta.xml"
+        path.parent.mkdir(parents=True)
+        path.write_text(dashboard, encoding="utf-8")
+        cache_path = root / "out" / module.SCAN_CACHE_NAME
+
+        cache = module.ScanCache(cache_path, root)
+        cache.load()
+        data = cache.lookup(path, module.parse_dashboard_refs)
+        assert data == {"parseError": False, "refs": ["Ops/Open_Cases"]}
+        assert (cache.hits, cache.misses) == (0, 1)
+        cache.save()
+
+        # Unchanged stat: served from cache without re-parsing.
+        cache = module.ScanCache(cache_path, root)
+        cache.load()
+        cache.lookup(path, lambda changed: (_ for _ in ()).throw(AssertionError("re-parsed")))
+        assert (cache.hits, cache.misses) == (1, 0)
+        cache.save()
+
+        # Touched but identical content: hash match keeps it a hit.
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+        cache = module.ScanCache(cache_path, root)
+        cache.load()
+        cache.lookup(path, module.parse_dashboard_refs)
+        assert (cache.hits, cache.misses) == (1, 0)
+        cache.save()
+
+        # Changed content: miss and fresh parse.
+        path.write_text(dashboard.replace("Open_Cases", "Closed_Cases"), encoding="utf-8")
+        cache = module.ScanCache(cache_path, root)
+        cache.load()
+        data = cache.lookup(path, module.parse_dashboard_refs)
+        assert data["refs"] == ["Ops/Closed_Cases"]
+        assert (cache.hits, cache.misses) == (0, 1)
+
+        broken = root / "dashboards" / "Ops" / "Broken.dashboard-meta.xml"
+        broken.write_text("<Dashboard>", encoding="utf-8")
+        assert cache.lookup(broken, module.parse_dashboard_refs) == {"parseError": True, "refs": []}
+
+        # Only report-bearing tags count; slashes in headers are not report references.
+        noisy = root / "dashboards" / "Ops" / "Noisy.dashboard-meta.xml"
+        noisy.write_text(dashboard.replace("<report>", "<header>Cases / Week</header><report>"), encoding="utf-8")
+        assert module.parse_dashboard_refs(noisy)["refs"] == ["Ops/Open_Cases"]
+
+        # Pool and inline parsing agree, in input order.
+        paths = [noisy, broken, path] * module.DASHBOARD_POOL_MIN
+        assert module.parse_dashboards(paths, 2) == module.parse_dashboards(paths, 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import importlib.util
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def load_geary_module():
+    root = Path(__file__).resolve().parents[1]
+    geary_path = root / "tools" / "geary" / "geary.py"
+    spec = importlib.util.spec_from_file_location("geary_cli", geary_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def write(path: Path, text: str = "<x/>\n"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def main():
+    geary = load_geary_module()
+    script = Path(__file__).resolve().parents[1] / "tools" / "geary" / "slices.py"
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir).resolve()
+        base = root / "force-app" / "main" / "default"
+        write(base / "classes" / "Alpha.cls")
+        write(base / "flows" / "Intake.flow-meta.xml")
+        info_path = root / "geary" / "out" / "watch.json"
+
+        cmd = [sys.executable, str(script), "--root", str(root), "--watch", "--interval", "0.1", "--jobs", "1"]
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+        try:
+            deadline = time.monotonic() + 20
+            while not info_path.exists():
+                assert proc.poll() is None, "watch daemon exited early"
+                assert time.monotonic() < deadline, "watch daemon never published watch.json"
+                time.sleep(0.05)
+
+            _, slices = geary.load_registry(root)
+            assert slices["apex-classes"]["counts"]["apexClasses"] == 1
+            flows_manifest = root / "manifest" / "slice-flows.xml"
+            flows_mtime = flows_manifest.stat().st_mtime_ns
+
+            # A query right after a save sees it, without a cold `geary update`.
+            write(base / "classes" / "Beta.cls")
+            _, slices = geary.load_registry(root)
+            assert slices["apex-classes"]["counts"]["apexClasses"] == 2
+            assert b"<members>Beta</members>" in (root / "manifest" / "slice-apex-classes.xml").read_bytes()
+            assert flows_manifest.stat().st_mtime_ns == flows_mtime
+
+            # New type directories are picked up too.
+            write(base / "permissionsets" / "Ops.permissionset-meta.xml")
+            _, slices = geary.load_registry(root)
+            assert "permissionsets" in slices
+
+            status = geary.query_watch_daemon(root, "status")
+            assert status["generation"] >= 3, status
+        finally:
+            proc.send_signal(signal.SIGINT)
+            proc.wait(timeout=20)
+
+        assert not info_path.exists()
+        # With the daemon gone the registry comes from slices.json again.
+        _, slices = geary.load_registry(root)
+        assert "permissionsets" in slices
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,137 @@
 #!/usr/bin/env python3
 import argparse
+import contextlib
 import datetime
+import functools
+import glob
 import hashlib
+import heapq
 import importlib.util
 import json
+import math
 import os
 import re
 import shutil
+import socket
+import sqlite3
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 import urllib.error
 import urllib.parse
-import urllib.request
 import xml.etree.ElementTree as ET
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 
 
 DEFAULT_WORKER_URL = "https://geary-mermaid-runner-v1.stokoe.workers.dev"
 MAX_MERMAID_BYTES = 200 * 1024
 REPAIR_SCHEMA_VERSION = "0.1.2"
+WATCH_QUERY_TIMEOUT = 5
+METADATA_INDEX_NAME = "metadata-index.json"
+METADATA_INDEX_VERSION = 1
+APEX_REFERENCE_INDEX_NAME = "apex-refs.json"
+APEX_REFERENCE_INDEX_VERSION = 1
+APEX_COMMENT_OR_STRING_RE = re.compile(r"//[^\n]*|/\*.*?\*/|'(?:\\.|[^'\\\n])*'", re.DOTALL)
+APEX_IDENTIFIER_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+APEX_IS_TEST_RE = re.compile(r"@istest\b", re.IGNORECASE)
+APEX_TRIGGER_RE = re.compile(r"\btrigger\s+(\w+)\s+on\s+(\w+)", re.IGNORECASE)
+DEPLOY_FINGERPRINT_DIR = Path("geary") / "out" / "deploys"
+COALESCED_MANIFEST_DIR = Path("geary") / "out" / "coalesced"
+ORG_CACHE_DIR = Path("geary") / "out" / "orgs"
+DEPLOY_TAIL_LINES = 200
+ANSI_ESCAPE_RE = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+DEPLOY_PROGRESS_RES = (
+    ("components", re.compile(r"\bComponents:\s*(\d+)\s*/\s*(\d+)", re.IGNORECASE)),
+    ("tests", re.compile(r"\bTests:\s*(\d+)\s*/\s*(\d+)", re.IGNORECASE)),
+)
+DEPLOY_COVERAGE_RE = re.compile(r"coverage\D*?(\d+(?:\.\d+)?)\s*%", re.IGNORECASE)
+DEPLOY_STATUS_RE = re.compile(r"^Status:\s*(\S.*?)\s*$", re.IGNORECASE)
+# sf errors where the org never judged the deploy (limits, a busy org, the network) and a retry
+# can succeed. A deploy that reached a final status failed on its components or tests instead.
+TRANSIENT_DEPLOY_ERROR_RE = re.compile(
+    r"REQUEST_LIMIT_EXCEEDED|ECONNRESET|ETIMEDOUT|EAI_AGAIN|socket hang up|Service Unavailable|"
+    r"Bad Gateway|Gateway Time-?out|(?:another|a) deploy(?:ment)? is (?:already )?in progress",
+    re.IGNORECASE,
+)
+DEPLOY_FINAL_STATUSES = {"succeeded", "succeededpartial", "failed", "canceled"}
+DEPLOY_RETRIES_DEFAULT = 2
+DEPLOY_RETRY_BACKOFF_SECONDS = 5.0
+DEPLOY_RETRY_BACKOFF_MAX_SECONDS = 300.0
+INSTALL_STATE_NAME = "install-state.json"
+# Worker request phases recorded on `response.received` (see WorkerConnectionPool.request), plus
+# decoding the response; everything except ttfb and decode is time spent on the network.
+LATENCY_PHASES = ("dns_ms", "connect_ms", "tls_ms", "send_ms", "ttfb_ms", "transfer_ms", "decode_ms")
+LATENCY_NETWORK_PHASES = ("dns_ms", "connect_ms", "tls_ms", "send_ms", "transfer_ms")
+RENDER_CACHE_DIR_NAME = ".cache"
+RENDER_CACHE_MAX_BYTES = 64 * 1024 * 1024
+BATCH_CONCURRENCY_DEFAULT = 4
+BATCH_RATE_LIMIT_RETRIES = 5
+BATCH_RATE_LIMIT_BACKOFF_SECONDS = 1.0
+# Options a resumed install takes from the run it continues; --jobs, --force and retries stay per invocation.
+INSTALL_RESUME_OPTIONS = ("name", "all", "with_deps", "allow_empty", "test_level", "tests", "since", "coalesce")
+# Whether an alias points at production practically never changes; org metadata listings do.
+ORG_INFO_TTL_SECONDS = 24 * 60 * 60
+ORG_METADATA_TTL_SECONDS = 10 * 60
+# Source files behind each manifest member, relative to <package dir>/main/default. A trailing
+# slash means the whole bundle directory.
+MEMBER_SOURCES = {
+    "CustomObject": ["objects/{name}/{name}.object-meta.xml"],
+    "CustomField": ["objects/{object}/fields/{field}.field-meta.xml"],
+    "Flow": ["flows/{name}.flow-meta.xml"],
+    "ApexClass": ["classes/{name}.cls", "classes/{name}.cls-meta.xml"],
+    "ApexTrigger": ["triggers/{name}.trigger", "triggers/{name}.trigger-meta.xml"],
+    "ApexTestSuite": ["testSuites/{name}.testSuite-meta.xml"],
+    "LightningComponentBundle": ["lwc/{name}/"],
+    "AuraDefinitionBundle": ["aura/{name}/"],
+    "CSPTrustedSite": [
+        "cspTrustedSites/{name}.cspTrustedSite-meta.xml",
+        "CSPTrustedSites/{name}.cspTrustedSite-meta.xml",
+        "csptrustedsites/{name}.cspTrustedSite-meta.xml",
+    ],
+    "PermissionSet": ["permissionsets/{name}.permissionset-meta.xml"],
+    "Profile": ["profiles/{name}.profile-meta.xml"],
+    "ReportFolder": ["reports/{name}.reportFolder-meta.xml", "reportFolders/{name}.reportFolder-meta.xml"],
+    "Report": ["reports/{name}.report-meta.xml"],
+    "DashboardFolder": ["dashboards/{name}.dashboardFolder-meta.xml", "dashboardFolders/{name}.dashboardFolder-meta.xml"],
+    "Dashboard": ["dashboards/{name}.dashboard-meta.xml"],
+}
+# Member names that may span folders (reports/Parent/Child.report-meta.xml -> Parent/Child).
+NESTED_NAME_TYPES = {"Report", "ReportFolder", "Dashboard", "DashboardFolder"}
+# Registry `counts` keys per metadata type, as slices.py computes them.
+MEMBER_COUNT_KEYS = {
+    "CustomObject": "customObjects",
+    "CustomField": "customFields",
+    "Dashboard": "dashboards",
+    "Report": "reports",
+    "DashboardFolder": "folders",
+    "ReportFolder": "folders",
+    "Flow": "flows",
+    "ApexClass": "apexClasses",
+    "ApexTrigger": "apexTriggers",
+    "ApexTestSuite": "apexTestSuites",
+    "LightningComponentBundle": "lwc",
+    "AuraDefinitionBundle": "aura",
+    "CSPTrustedSite": "csp",
+    "PermissionSet": "permissionSets",
+    "Profile": "profiles",
+}
+DELTA_MANIFEST_DIR = Path("geary") / "out" / "delta"
+REGISTRY_STORE_NAME = "slices.db"
+REGISTRY_STORE_VERSION = 1
+REGISTRY_STORE_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE slices (name TEXT PRIMARY KEY, position INTEGER NOT NULL, entry TEXT NOT NULL) WITHOUT ROWID;
+CREATE TABLE depends_on (name TEXT NOT NULL, dep TEXT NOT NULL, position INTEGER NOT NULL, PRIMARY KEY (name, dep)) WITHOUT ROWID;
+CREATE TABLE aliases (alias TEXT PRIMARY KEY, position INTEGER NOT NULL, entry TEXT NOT NULL) WITHOUT ROWID;
+"""
+# `geary install comms-web` deploys these one after another; only the Apex step runs tests.
+COMMS_WEB_STEPS = ("objects-case", "objects-comms", "apex-comms-core", "comms-perms", "lwc-web")
+COMMS_WEB_TEST_STEP = "apex-comms-core"
 REPAIR_ALLOWED_TARGETS = {
     "DigSlaScheduler": {"kind": "apex_class"},
     "DIG_Membership_Screened_Onboarding": {"kind": "flow"},
@@ -35,6 +146,9 @@ def parse_args():
 
     update = subparsers.add_parser("update", help="Rebuild slice registry")
     update.add_argument("--root", default=".", help="Repo root")
+    update.add_argument("--full", action="store_true", help="Ignore the scan cache and rescan everything")
+    update.add_argument("--watch", action="store_true", help="Stay resident and regenerate slices as files change")
+    update.add_argument("--interval", type=float, default=0.5, help="Watch poll interval in seconds")
 
     listing = subparsers.add_parser("list", help="List slices and aliases")
     listing.add_argument("--root", default=".", help="Repo root")
@@ -55,9 +169,41 @@ def parse_args():
     install.add_argument("--target-org", required=True, help="Salesforce target org alias")
     install.add_argument("--with-deps", action="store_true", help="Install dependencies")
     install.add_argument("--allow-empty", action="store_true", help="Allow installing empty slices")
-    install.add_argument("--test-level", choices=["NoTestRun", "RunLocalTests", "RunAllTestsInOrg", "RunSpecifiedTests"], help="Test level for deploy")
+    install.add_argument("--test-level", choices=["NoTestRun", "RunLocalTests", "RunAllTestsInOrg", "RunSpecifiedTests", "auto"], help="Test level for deploy (auto: the smallest set of tests covering the Apex being deployed)")
     install.add_argument("--tests", help="Comma-separated test class names (RunSpecifiedTests only)")
     install.add_argument("--debug", action="store_true", help="Show full traceback on errors")
+    install.add_argument("--jobs", type=int, default=1, help="Deploy up to N independent slices at once (default: 1)")
+    install.add_argument("--force", action="store_true", help="Redeploy slices even if unchanged since the last successful deploy")
+    install.add_argument("--coalesce", action="store_true", help="Deploy all slices as one merged package.xml (permission sets in a second deploy)")
+    install.add_argument("--refresh", action="store_true", help="Ignore cached org info and re-query the target org")
+    install.add_argument("--runs-dir", help="Override runs directory for the install receipt and emissions")
+    install.add_argument("--since", metavar="REF", help="Deploy only members changed since git REF, one minimal package.xml per slice")
+    install.add_argument("--resume", metavar="RUN_ID", help="Continue a failed install run with its options, skipping the slices it completed")
+    install.add_argument("--retries", type=int, default=DEPLOY_RETRIES_DEFAULT, help=f"Retry a deploy up to N times after a transient sf error (default: {DEPLOY_RETRIES_DEFAULT})")
+    install.add_argument("--retry-backoff", type=float, default=DEPLOY_RETRY_BACKOFF_SECONDS, metavar="SECONDS", help=f"Delay before the first retry, doubled for each further one (default: {DEPLOY_RETRY_BACKOFF_SECONDS:g})")
+
+    plan = subparsers.add_parser("plan", help="Show the install DAG, test levels and estimated duration without deploying")
+    plan.add_argument("name", nargs="?", help="Slice name or alias")
+    plan.add_argument("--all", action="store_true", help="Plan all slices")
+    plan.add_argument("--root", default=".", help="Repo root")
+    plan.add_argument("--target-org", help="Org to apply the test-level policy and deploy history for")
+    plan.add_argument("--with-deps", action="store_true", help="Include dependencies")
+    plan.add_argument("--test-level", choices=["NoTestRun", "RunLocalTests", "RunAllTestsInOrg", "RunSpecifiedTests", "auto"], help="Test level the install would request")
+    plan.add_argument("--tests", help="Comma-separated test class names (RunSpecifiedTests only)")
+    plan.add_argument("--jobs", type=int, default=1, help="Also estimate wall time for install --jobs N")
+    plan.add_argument("--runs-dir", help="Override runs directory for deploy history")
+    plan.add_argument("--refresh", action="store_true", help="Ignore cached org info and re-query the target org")
+
+    stats = subparsers.add_parser("stats", help="Aggregate timings from past runs")
+    stats_sub = stats.add_subparsers(dest="stats_command", required=True)
+    stats_install = stats_sub.add_parser("install", help="Per-slice deploy durations across install runs")
+    stats_install.add_argument("--root", default=".", help="Repo root")
+    stats_install.add_argument("--runs-dir", help="Override runs directory")
+    stats_install.add_argument("--target-org", help="Only count installs to this org")
+    stats_latency = stats_sub.add_parser("latency", help="Worker request phase timings across run and doctor runs")
+    stats_latency.add_argument("--root", default=".", help="Repo root")
+    stats_latency.add_argument("--runs-dir", help="Override runs directory")
+    stats_latency.add_argument("--command", dest="source_command", choices=["run", "doctor"], help="Only count runs of this command")
 
     recipe = subparsers.add_parser("recipe", help="Recipe operations")
     recipe_sub = recipe.add_subparsers(dest="recipe_command", required=True)
@@ -94,9 +240,12 @@ def parse_args():
     run.add_argument("--in", dest="input_path", help="Mermaid source file")
     run.add_argument("--stdin", action="store_true", help="Read Mermaid source from stdin")
     run.add_argument("--format", choices=["json", "svg"], default="svg", help="Worker output format")
-    run.add_argument("--out", help="Write output to PATH instead of stdout")
+    run.add_argument("--out", help="Write output to PATH instead of stdout (with --batch: a directory)")
     run.add_argument("--env-file", help="Load env vars from this dotenv file before running")
     run.add_argument("--offline", action="store_true", help="Skip contacting the worker and run structural checks only")
+    run.add_argument("--no-cache", action="store_true", help="Always call the worker; do not read or fill the render cache")
+    run.add_argument("--batch", metavar="SRC", help="Render every input in a directory, glob or .ndjson file, one run each")
+    run.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY_DEFAULT, help=f"Concurrent renders for --batch (default: {BATCH_CONCURRENCY_DEFAULT})")
 
     replay = subparsers.add_parser("replay", help="Verify a prior run by hash")
     replay.add_argument("run_id", help="Run id to replay")
@@ -107,6 +256,8 @@ def parse_args():
     repair.add_argument("--root", default=".", help="Repo root")
     repair.add_argument("--from-validate-log", required=True, help="Path to make dig-validate output")
     repair.add_argument("--out", help="Bundle output directory")
+    repair.add_argument("--target-org", default="deafingov", help="Org to check flows against (default: deafingov)")
+    repair.add_argument("--refresh", action="store_true", help="Ignore cached org metadata listings and re-query the org")
 
     apply = subparsers.add_parser("apply", help="Apply a repair bundle")
     apply.add_argument("--root", default=".", help="Repo root")
@@ -122,6 +273,7 @@ def trim_quotes(value: str) -> str:
     return value
 
 
+@functools.lru_cache(maxsize=None)
 def resolve_package_dirs(root: Path):
     project_file = root / "sfdx-project.json"
     if project_file.exists():
@@ -135,8 +287,8 @@ def resolve_package_dirs(root: Path):
             if path:
                 paths.append(root / path)
         if paths:
-            return paths
-    return [root / "force-app"]
+            return tuple(paths)
+    return (root / "force-app",)
 
 
 def local_name(tag: str) -> str:
@@ -159,78 +311,223 @@ def extract_text(root, tag):
     return None
 
 
-def scan_objects(root: Path):
-    package_dirs = resolve_package_dirs(root)
-    missing_object_meta = []
-    lookup_errors = []
-    custom_objects = set()
-    custom_fields = set()
-    fields_by_object = {}
+def path_signature(path) -> list | None:
+    try:
+        current = os.stat(path)
+    except OSError:
+        return None
+    return [current.st_mtime_ns, current.st_size]
 
-    for package_dir in package_dirs:
-        base = package_dir / "main" / "default"
-        objects_dir = base / "objects"
-        if not objects_dir.exists():
-            continue
-        for obj_path in sorted(objects_dir.iterdir()):
-            if not obj_path.is_dir():
+
+def list_dir(path):
+    try:
+        with os.scandir(path) as entries:
+            return sorted(entries, key=lambda entry: entry.name)
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+
+def write_json_atomic(path: Path, payload):
+    """Write `payload` as JSON via a temp file and rename, so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp_path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            tmp_path.unlink()
+        raise
+
+
+class MetadataIndex:
+    """Local Apex, object, field and permission set members, built in one walk of the package dirs.
+
+    Membership checks are set lookups. One index is kept per process and root, and a snapshot is
+    written to geary/out/metadata-index.json together with the (mtime, size) of every directory
+    walked and every file parsed, so the next process only has to stat those paths to reuse it.
+    """
+
+    _loaded = {}
+
+    def __init__(self, root: Path, package_dirs):
+        self.root = root
+        self.package_dirs = list(package_dirs)
+        self.class_sources = set()
+        self.class_metas = set()
+        self.trigger_sources = set()
+        self.trigger_metas = set()
+        self.custom_objects = set()
+        self.custom_fields = set()
+        self.fields_by_object = {}
+        self.missing_object_meta = []
+        self.lookup_errors = []
+        self.permsets = []
+        self.permset_names = set()
+        self.signature = {}
+
+    @classmethod
+    def load(cls, root: Path, refresh: bool = False):
+        """The index for `root`: memoized, else the snapshot if still fresh, else a new walk."""
+        root = root.resolve()
+        index = None if refresh else cls._loaded.get(root) or cls.from_snapshot(root)
+        if index is None:
+            index = cls.build(root)
+            index.save()
+        cls._loaded[root] = index
+        return index
+
+    @staticmethod
+    def snapshot_path(root: Path) -> Path:
+        return root / "geary" / "out" / METADATA_INDEX_NAME
+
+    def watch(self, path: Path):
+        self.signature[str(path)] = path_signature(path)
+
+    @classmethod
+    def build(cls, root: Path):
+        index = cls(root, resolve_package_dirs(root))
+        index.watch(root / "sfdx-project.json")
+        for package_dir in index.package_dirs:
+            base = package_dir / "main" / "default"
+            index.watch(base)
+            index.scan_apex(base / "classes", ".cls", index.class_sources, index.class_metas)
+            index.scan_apex(base / "triggers", ".trigger", index.trigger_sources, index.trigger_metas)
+            index.scan_objects(base / "objects")
+            index.scan_permsets(base / "permissionsets")
+        return index
+
+    def scan_apex(self, directory: Path, suffix: str, sources: set, metas: set):
+        self.watch(directory)
+        meta_suffix = f"{suffix}-meta.xml"
+        for entry in list_dir(directory):
+            if entry.name.endswith(suffix):
+                sources.add(entry.name[: -len(suffix)])
+            elif entry.name.endswith(meta_suffix):
+                metas.add(entry.name[: -len(meta_suffix)])
+
+    def scan_objects(self, objects_dir: Path):
+        self.watch(objects_dir)
+        for obj_entry in list_dir(objects_dir):
+            if not obj_entry.is_dir():
                 continue
-            obj_api_name = obj_path.name
+            obj_api_name = obj_entry.name
+            obj_path = Path(obj_entry.path)
+            self.watch(obj_path)
             fields_dir = obj_path / "fields"
-            if fields_dir.exists():
-                field_files = sorted(fields_dir.glob("*.field-meta.xml"))
-            else:
-                field_files = []
+            self.watch(fields_dir)
+            field_files = [Path(entry.path) for entry in list_dir(fields_dir) if entry.name.endswith(".field-meta.xml")]
             obj_meta = obj_path / f"{obj_api_name}.object-meta.xml"
-            if obj_api_name.endswith("__c") and field_files and not obj_meta.exists():
-                missing_object_meta.append(obj_meta)
-            if obj_meta.exists() and obj_api_name.endswith("__c"):
-                custom_objects.add(obj_api_name)
+            obj_meta_exists = obj_meta.exists()
+            if obj_api_name.endswith("__c") and field_files and not obj_meta_exists:
+                self.missing_object_meta.append(obj_meta)
+            if obj_meta_exists and obj_api_name.endswith("__c"):
+                self.custom_objects.add(obj_api_name)
             for field_path in field_files:
+                self.watch(field_path)
                 field_name = field_path.name.replace(".field-meta.xml", "")
-                custom_fields.add(f"{obj_api_name}.{field_name}")
-                fields_by_object.setdefault(obj_api_name, []).append(field_name)
+                self.custom_fields.add(f"{obj_api_name}.{field_name}")
+                self.fields_by_object.setdefault(obj_api_name, []).append(field_name)
                 root_xml = parse_xml(field_path)
                 field_type = extract_text(root_xml, "type")
                 required = extract_text(root_xml, "required")
                 if field_type == "Lookup" and required == "true":
                     delete_constraint = extract_text(root_xml, "deleteConstraint")
                     if delete_constraint not in {"Restrict", "Cascade", "RestrictDelete", "CascadeDelete"}:
-                        lookup_errors.append((field_path, delete_constraint))
-
-    return {
-        "missing_object_meta": missing_object_meta,
-        "lookup_errors": lookup_errors,
-        "custom_objects": custom_objects,
-        "custom_fields": custom_fields,
-        "fields_by_object": fields_by_object,
-    }
+                        self.lookup_errors.append((field_path, delete_constraint))
 
+    def scan_permsets(self, permsets_dir: Path):
+        self.watch(permsets_dir)
+        for entry in list_dir(permsets_dir):
+            if not entry.name.endswith(".permissionset-meta.xml"):
+                continue
+            path = Path(entry.path)
+            self.watch(path)
+            classes, objects = extract_permset_refs(path)
+            self.permsets.append({"path": path, "classes": classes, "objects": objects})
+            self.permset_names.add(entry.name[: -len(".permissionset-meta.xml")])
+
+    @property
+    def apex_classes(self):
+        return self.class_sources | self.class_metas
+
+    def has_apex_class(self, name: str) -> bool:
+        """Source and -meta.xml both present (in any package dir), as a deploy requires."""
+        return name in self.class_sources and name in self.class_metas
+
+    def has_apex_trigger(self, name: str) -> bool:
+        return name in self.trigger_sources and name in self.trigger_metas
+
+    def apex_member_sets(self):
+        """Deployable Apex members by manifest type: both source and -meta.xml present."""
+        return {
+            "ApexClass": self.class_sources & self.class_metas,
+            "ApexTrigger": self.trigger_sources & self.trigger_metas,
+        }
 
-def scan_apex_classes(root: Path):
-    package_dirs = resolve_package_dirs(root)
-    classes = set()
-    for package_dir in package_dirs:
-        classes_dir = package_dir / "main" / "default" / "classes"
-        if not classes_dir.exists():
-            continue
-        for path in classes_dir.glob("*.cls"):
-            classes.add(path.stem)
-        for path in classes_dir.glob("*.cls-meta.xml"):
-            classes.add(path.name.replace(".cls-meta.xml", ""))
-    return classes
-
+    def has_object(self, name: str) -> bool:
+        return name in self.custom_objects
+
+    def has_field(self, name: str) -> bool:
+        return name in self.custom_fields
+
+    def has_permset(self, name: str) -> bool:
+        return name in self.permset_names
+
+    def save(self):
+        payload = {
+            "version": METADATA_INDEX_VERSION,
+            "root": str(self.root),
+            "packageDirs": [str(path) for path in self.package_dirs],
+            "signature": self.signature,
+            "classSources": sorted(self.class_sources),
+            "classMetas": sorted(self.class_metas),
+            "triggerSources": sorted(self.trigger_sources),
+            "triggerMetas": sorted(self.trigger_metas),
+            "customObjects": sorted(self.custom_objects),
+            "customFields": sorted(self.custom_fields),
+            "fieldsByObject": self.fields_by_object,
+            "missingObjectMeta": [str(path) for path in self.missing_object_meta],
+            "lookupErrors": [[str(path), constraint] for path, constraint in self.lookup_errors],
+            "permsets": [
+                {"path": str(entry["path"]), "classes": sorted(entry["classes"]), "objects": sorted(entry["objects"])}
+                for entry in self.permsets
+            ],
+        }
+        try:
+            write_json_atomic(self.snapshot_path(self.root), payload)
+        except OSError:
+            # The snapshot is only an accelerator; a read-only checkout still gets the in-memory index.
+            pass
 
-def scan_permsets(root: Path):
-    package_dirs = resolve_package_dirs(root)
-    permsets = []
-    for package_dir in package_dirs:
-        permsets_dir = package_dir / "main" / "default" / "permissionsets"
-        if not permsets_dir.exists():
-            continue
-        for path in sorted(permsets_dir.glob("*.permissionset-meta.xml")):
-            permsets.append(path)
-    return permsets
+    @classmethod
+    def from_snapshot(cls, root: Path):
+        try:
+            data = json.loads(cls.snapshot_path(root).read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        if not isinstance(data, dict) or data.get("version") != METADATA_INDEX_VERSION or data.get("root") != str(root):
+            return None
+        signature = data.get("signature") or {}
+        if any(path_signature(path) != recorded for path, recorded in signature.items()):
+            return None
+        index = cls(root, [Path(path) for path in data["packageDirs"]])
+        index.signature = signature
+        index.class_sources = set(data["classSources"])
+        index.class_metas = set(data["classMetas"])
+        index.trigger_sources = set(data["triggerSources"])
+        index.trigger_metas = set(data["triggerMetas"])
+        index.custom_objects = set(data["customObjects"])
+        index.custom_fields = set(data["customFields"])
+        index.fields_by_object = data["fieldsByObject"]
+        index.missing_object_meta = [Path(path) for path in data["missingObjectMeta"]]
+        index.lookup_errors = [(Path(path), constraint) for path, constraint in data["lookupErrors"]]
+        index.permsets = [
+            {"path": Path(entry["path"]), "classes": set(entry["classes"]), "objects": set(entry["objects"])}
+            for entry in data["permsets"]
+        ]
+        index.permset_names = {entry["path"].name[: -len(".permissionset-meta.xml")] for entry in index.permsets}
+        return index
 
 
 def manifest_members(path: Path):
@@ -252,29 +549,27 @@ def manifest_members(path: Path):
     return members_by_type
 
 
-def local_file_exists(package_dirs, rel_path: str):
-    for base in package_dirs:
-        candidate = base / "main" / "default" / rel_path
-        if candidate.exists():
-            return True
-    return False
+def validate_manifest_members(index: MetadataIndex, manifest_paths):
+    """Missing (type, name) members per manifest, from one set difference per manifest and type.
 
+    Each manifest is parsed once and checked against the index's member sets, so the cost is
+    linear in files plus members rather than manifests x members x package dirs.
+    """
+    local_members = index.apex_member_sets()
+    results = {}
+    for manifest_path in manifest_paths:
+        members = manifest_members(manifest_path)
+        missing = []
+        for kind, local in local_members.items():
+            missing.extend((kind, name) for name in sorted(set(members.get(kind, [])) - local))
+        results[manifest_path] = missing
+    return results
 
-def validate_manifest_apex_members(root: Path, manifest_path: Path):
-    package_dirs = resolve_package_dirs(root)
-    members = manifest_members(manifest_path)
-    missing = []
-    for name in members.get("ApexClass", []):
-        cls_path = f"classes/{name}.cls"
-        meta_path = f"classes/{name}.cls-meta.xml"
-        if not local_file_exists(package_dirs, cls_path) or not local_file_exists(package_dirs, meta_path):
-            missing.append(("ApexClass", name))
-    for name in members.get("ApexTrigger", []):
-        trg_path = f"triggers/{name}.trigger"
-        meta_path = f"triggers/{name}.trigger-meta.xml"
-        if not local_file_exists(package_dirs, trg_path) or not local_file_exists(package_dirs, meta_path):
-            missing.append(("ApexTrigger", name))
-    if missing:
+
+def validate_manifest_apex_members(index: MetadataIndex, manifest_paths):
+    """Exit before any deploy starts if a manifest names Apex that is missing locally."""
+    failed = False
+    for manifest_path, missing in validate_manifest_members(index, manifest_paths).items():
         for kind, name in missing:
             if kind == "ApexTrigger":
                 location = "dig-src/main/default/triggers/"
@@ -285,6 +580,8 @@ def validate_manifest_apex_members(root: Path, manifest_path: Path):
                 f"but is not present under {location}. Deploy would fail with "
                 "'named in package.xml but not found'."
             )
+            failed = True
+    if failed:
         sys.exit(1)
 
 
@@ -303,41 +600,447 @@ def extract_permset_refs(path: Path):
     return classes, objects
 
 
-def validate_permsets(root: Path, local_classes, local_custom_objects):
+def validate_permsets(index: MetadataIndex):
     errors = []
     warnings = []
-    permsets = scan_permsets(root)
-    for permset_path in permsets:
-        classes, objects = extract_permset_refs(permset_path)
-        missing_classes = sorted([c for c in classes if c and c not in local_classes])
+    local_classes = index.apex_classes
+    for entry in index.permsets:
+        permset_path = entry["path"]
+        missing_classes = sorted([c for c in entry["classes"] if c and c not in local_classes])
         if missing_classes:
             errors.append((permset_path, missing_classes))
-        missing_objects = sorted([o for o in objects if o.endswith("__c") and o not in local_custom_objects])
+        missing_objects = sorted([o for o in entry["objects"] if o.endswith("__c") and not index.has_object(o)])
         if missing_objects:
             warnings.append((permset_path, missing_objects))
     return errors, warnings
 
 
-def is_production_org(target_org: str):
+def schema_lint_errors(index: MetadataIndex):
+    lint_errors = []
+    for missing_meta in index.missing_object_meta:
+        lint_errors.append(f"missing object-meta.xml for custom object with fields: {missing_meta}")
+    for field_path, delete_constraint in index.lookup_errors:
+        if delete_constraint:
+            lint_errors.append(
+                f"required lookup missing delete behavior ({delete_constraint}) in {field_path}"
+            )
+        else:
+            lint_errors.append(
+                f"required lookup missing delete behavior in {field_path}"
+            )
+    return lint_errors
+
+
+def scan_apex_source(path: Path, kind: str):
+    """Identifiers (lower-cased, as Apex is case-insensitive) referenced by one .cls/.trigger file."""
+    text = path.read_text(encoding="utf-8", errors="replace")
+    code = APEX_COMMENT_OR_STRING_RE.sub(" ", text)
+    tokens = {token.lower() for token in APEX_IDENTIFIER_RE.findall(code)}
+    annotations = len(APEX_IS_TEST_RE.findall(code))
+    entry = {
+        "kind": kind,
+        "isTest": annotations > 0,
+        # A class-level @IsTest alone marks a test utility (e.g. a data factory) with nothing to run.
+        "hasTestMethods": annotations > 1 or "testmethod" in tokens,
+        "tokens": sorted(tokens),
+    }
+    if kind == "trigger":
+        match = APEX_TRIGGER_RE.search(code)
+        entry["sobject"] = match.group(2).lower() if match else None
+    return entry
+
+
+class ApexReferenceIndex:
+    """Static map from Apex classes and triggers to the @IsTest classes that reach them.
+
+    Every .cls/.trigger in the package dirs is token-scanned into a reference graph. A test covers
+    a class when it references it directly or through other classes. A test covers a trigger (and
+    so the classes the trigger calls) when it, or a test utility class it uses, names the
+    trigger's sObject. Per-file scans are cached in geary/out/apex-refs.json; only files whose
+    stat signature changed are rescanned.
+    """
+
+    def __init__(self, files):
+        self.files = files
+        self.names = {}
+        self.tests = set()
+        self.runnable_tests = set()
+        self.trigger_sobjects = {}
+        # Inverted index: token -> (kind, lower-cased name) of every class/trigger mentioning it.
+        self.referenced_by = {}
+        self.rescanned = 0
+        for entry in files.values():
+            node = (entry["kind"], entry["name"].lower())
+            self.names[node] = entry["name"]
+            if entry["kind"] == "class" and entry["isTest"]:
+                self.tests.add(node[1])
+                if entry.get("hasTestMethods"):
+                    self.runnable_tests.add(node[1])
+            if entry["kind"] == "trigger":
+                self.trigger_sobjects[node[1]] = entry.get("sobject")
+            for token in entry["tokens"]:
+                if token != node[1]:
+                    self.referenced_by.setdefault(token, set()).add(node)
+
+    @staticmethod
+    def cache_path(root: Path) -> Path:
+        return root / "geary" / "out" / APEX_REFERENCE_INDEX_NAME
+
+    @classmethod
+    def load(cls, root: Path):
+        path = cls.cache_path(root)
+        try:
+            cached = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            cached = {}
+        if not isinstance(cached, dict) or cached.get("version") != APEX_REFERENCE_INDEX_VERSION:
+            cached = {}
+        cached_files = cached.get("files", {})
+        files = {}
+        rescanned = 0
+        for package_dir in resolve_package_dirs(root):
+            base = package_dir / "main" / "default"
+            for dirname, suffix, kind in (("classes", ".cls", "class"), ("triggers", ".trigger", "trigger")):
+                for dir_entry in list_dir(base / dirname):
+                    if not dir_entry.name.endswith(suffix) or not dir_entry.is_file():
+                        continue
+                    file_path = Path(dir_entry.path)
+                    rel_path = Path(os.path.relpath(file_path, root)).as_posix()
+                    signature = path_signature(file_path)
+                    entry = cached_files.get(rel_path)
+                    if not entry or entry.get("signature") != signature:
+                        entry = {"signature": signature, "name": dir_entry.name[: -len(suffix)], **scan_apex_source(file_path, kind)}
+                        rescanned += 1
+                    files[rel_path] = entry
+        if rescanned or files.keys() != cached_files.keys():
+            try:
+                write_json_atomic(path, {"version": APEX_REFERENCE_INDEX_VERSION, "files": files})
+            except OSError:
+                pass
+        index = cls(files)
+        index.rescanned = rescanned
+        return index
+
+    def referrers(self, node):
+        kind, lname = node
+        if kind == "trigger":
+            sobject = self.trigger_sobjects.get(lname)
+            candidates = self.referenced_by.get(sobject, ()) if sobject else ()
+            # Naming an sObject in production code is no sign of DML on it; only follow tests.
+            return [other for other in candidates if other[0] == "class" and other[1] in self.tests]
+        return self.referenced_by.get(lname, ())
+
+    def covering_tests(self, kind: str, name: str):
+        """Lower-cased names of the runnable test classes that reach `name`."""
+        seen = set()
+        queue = [(kind, name.lower())]
+        while queue:
+            for referrer in self.referrers(queue.pop()):
+                if referrer not in seen:
+                    seen.add(referrer)
+                    queue.append(referrer)
+        return {lname for kind, lname in seen if kind == "class" and lname in self.runnable_tests}
+
+    def select_tests(self, classes, triggers):
+        """Smallest covering test set (greedy set cover) for the non-test classes and triggers given.
+
+        Returns (tests, uncovered) with canonical names, both sorted.
+        """
+        covers = {}
+        uncovered = []
+        for kind, names in (("class", classes), ("trigger", triggers)):
+            for name in names:
+                if kind == "class" and name.lower() in self.tests:
+                    continue
+                tests = self.covering_tests(kind, name)
+                if tests:
+                    covers[(kind, name)] = tests
+                else:
+                    uncovered.append(name)
+        remaining = set(covers)
+        chosen = []
+        while remaining:
+            candidates = {}
+            for target in remaining:
+                for test in covers[target]:
+                    candidates.setdefault(test, set()).add(target)
+            best = min(candidates, key=lambda test: (-len(candidates[test]), test))
+            chosen.append(best)
+            remaining -= candidates[best]
+        return sorted(self.names.get(("class", test), test) for test in chosen), sorted(uncovered)
+
+
+def merge_manifest_members(manifest_paths):
+    """Union of members by type across manifests; types keep first-seen order, members are sorted."""
+    merged = {}
+    for path in manifest_paths:
+        for type_name, members in manifest_members(path).items():
+            merged.setdefault(type_name, set()).update(members)
+    return {type_name: sorted(members) for type_name, members in merged.items()}
+
+
+def write_package_manifest(path: Path, api_version: str, members_by_type):
+    lines = ["<?xml version=\"1.0\" encoding=\"UTF-8\"?>", "<Package xmlns=\"http://soap.sforce.com/2006/04/metadata\">"]
+    for type_name, members in members_by_type.items():
+        lines.append("  <types>")
+        for member in members:
+            lines.append(f"    <members>{member}</members>")
+        lines.append(f"    <name>{type_name}</name>")
+        lines.append("  </types>")
+    if api_version:
+        lines.append(f"  <version>{api_version}</version>")
+    lines.append("</Package>")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def coalesce_batches(order, is_last):
+    """Split an install order into at most two deploys: everything else, then the `is_last` slices."""
+    first = [name for name in order if not is_last(name)]
+    last = [name for name in order if is_last(name)]
+    return [batch for batch in (first, last) if batch]
+
+
+def member_source_paths(package_dirs, member_type: str, name: str):
+    """Local files behind one manifest member across all package dirs, or None for unknown types."""
+    templates = MEMBER_SOURCES.get(member_type)
+    if templates is None:
+        return None
+    obj, _, field = name.partition(".")
+    paths = []
+    for package_dir in package_dirs:
+        base = package_dir / "main" / "default"
+        for template in templates:
+            candidate = base / template.format(name=name, object=obj, field=field)
+            if template.endswith("/"):
+                if candidate.is_dir():
+                    paths.extend(path for path in candidate.rglob("*") if path.is_file())
+            elif candidate.is_file():
+                paths.append(candidate)
+    return paths
+
+
+@functools.lru_cache(maxsize=None)
+def member_source_patterns():
+    """MEMBER_SOURCES templates turned around: regexes from a source path back to its member."""
+    patterns = []
+    for member_type, templates in MEMBER_SOURCES.items():
+        name_re = ".+" if member_type in NESTED_NAME_TYPES else "[^/]+"
+        for template in templates:
+            seen = set()
+            regex = ""
+            for part in re.split(r"(\{\w+\})", template):
+                if not (part.startswith("{") and part.endswith("}")):
+                    regex += re.escape(part)
+                    continue
+                group = part[1:-1]
+                if group in seen:
+                    regex += f"(?P={group})"
+                else:
+                    seen.add(group)
+                    regex += f"(?P<{group}>{name_re if group == 'name' else '[^/]+'})"
+            if template.endswith("/"):
+                regex += ".+"
+            patterns.append((member_type, re.compile(regex + "$")))
+    return patterns
+
+
+def source_member(rel_path: str):
+    """(type, member) for a path relative to <package dir>/main/default, or None."""
+    for member_type, pattern in member_source_patterns():
+        match = pattern.match(rel_path)
+        if not match:
+            continue
+        groups = match.groupdict()
+        if "object" in groups:
+            return member_type, f"{groups['object']}.{groups['field']}"
+        return member_type, groups["name"]
+    return None
+
+
+def member_counts(members_by_type):
+    counts = {}
+    for member_type, members in members_by_type.items():
+        key = MEMBER_COUNT_KEYS.get(member_type)
+        if key:
+            counts[key] = counts.get(key, 0) + len(members)
+    return counts
+
+
+def git_changed_files(root: Path, ref: str):
+    """Paths (relative to `root`) changed since `ref` in the working tree, plus untracked files."""
+    commands = [
+        ["git", "diff", "--name-only", "--relative", ref, "--"],
+        ["git", "ls-files", "--others", "--exclude-standard"],
+    ]
+    paths = set()
+    for cmd in commands:
+        try:
+            result = subprocess.run(cmd, cwd=root, check=True, capture_output=True, text=True)
+        except (OSError, subprocess.CalledProcessError) as exc:
+            detail = (getattr(exc, "stderr", None) or str(exc)).strip()
+            raise ValueError(f"Unable to list changes since {ref}: {detail}") from exc
+        paths.update(line.strip() for line in result.stdout.splitlines() if line.strip())
+    return sorted(paths)
+
+
+def changed_members(root: Path, rel_paths):
+    """Map changed paths to manifest members.
+
+    Returns (members by type, deleted paths, paths outside any known member type). Deleted
+    sources are reported but not deployed; destructive changes stay a manual step.
+    """
+    package_dirs = resolve_package_dirs(root)
+    members = {}
+    deleted = []
+    unmapped = []
+    for rel_path in rel_paths:
+        path = root / rel_path
+        member = None
+        for package_dir in package_dirs:
+            base = package_dir / "main" / "default"
+            try:
+                inner = path.relative_to(base).as_posix()
+            except ValueError:
+                continue
+            member = source_member(inner)
+            break
+        else:
+            continue
+        if member is None:
+            unmapped.append(rel_path)
+        elif not member_source_paths(package_dirs, *member):
+            deleted.append(rel_path)
+        else:
+            members.setdefault(member[0], set()).add(member[1])
+    return members, deleted, unmapped
+
+
+def slice_fingerprint(root: Path, manifest_path: Path):
+    """sha256 over the manifest and the source files of every member it names.
+
+    None when a member's sources cannot be located (unknown type or missing files); such slices
+    are always deployed.
+    """
+    package_dirs = resolve_package_dirs(root)
+    digest = hashlib.sha256()
+    digest.update(b"manifest\0" + file_sha256(manifest_path).encode("utf-8") + b"\n")
+    for member_type, names in sorted(manifest_members(manifest_path).items()):
+        for name in sorted(names):
+            paths = member_source_paths(package_dirs, member_type, name)
+            if not paths:
+                return None
+            digest.update(f"{member_type}:{name}\n".encode("utf-8"))
+            for path in sorted(paths):
+                rel = Path(os.path.relpath(path, root)).as_posix()
+                digest.update(f"{rel}\0{file_sha256(path)}\n".encode("utf-8"))
+    return "sha256:" + digest.hexdigest()
+
+
+def deploy_fingerprint_path(root: Path, target_org: str) -> Path:
+    return root / DEPLOY_FINGERPRINT_DIR / f"{safe_org_filename(target_org)}.json"
+
+
+def load_deploy_fingerprints(root: Path, target_org: str):
+    try:
+        data = json.loads(deploy_fingerprint_path(root, target_org).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    slices = data.get("slices") if isinstance(data, dict) else None
+    return slices if isinstance(slices, dict) else {}
+
+
+def save_deploy_fingerprints(root: Path, target_org: str, fingerprints):
+    payload = {"targetOrg": target_org, "slices": dict(sorted(fingerprints.items()))}
+    write_json_atomic(deploy_fingerprint_path(root, target_org), payload)
+
+
+def safe_org_filename(target_org: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.@-]", "_", target_org)
+
+
+class OrgCache:
+    """Answers from slow `sf` org queries, kept per target org in geary/out/orgs/<org>.json.
+
+    Entries expire after a per-key TTL; `refresh` ignores what is stored and re-queries. Only
+    successful answers are stored. Each lookup is recorded in `events` so callers can emit
+    cache hits and misses.
+    """
+
+    def __init__(self, root: Path, target_org: str, refresh: bool = False):
+        self.target_org = target_org
+        self.refresh = refresh
+        self.path = root / ORG_CACHE_DIR / f"{safe_org_filename(target_org)}.json"
+        self.events = []
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            data = {}
+        entries = data.get("entries") if isinstance(data, dict) else None
+        self.entries = entries if isinstance(entries, dict) else {}
+
+    def get(self, key: str, ttl: float, fetch):
+        now = time.time()
+        entry = self.entries.get(key)
+        if not self.refresh and isinstance(entry, dict):
+            age = now - entry.get("fetchedAtEpoch", 0)
+            if 0 <= age < ttl:
+                self.events.append({"key": key, "hit": True, "age_seconds": round(age, 1)})
+                return entry.get("value")
+        value = fetch()
+        self.events.append({"key": key, "hit": False})
+        if value is not None:
+            self.entries[key] = {
+                "fetchedAt": isoformat_utc(utc_now()),
+                "fetchedAtEpoch": round(now, 3),
+                "value": value,
+            }
+            try:
+                write_json_atomic(self.path, {"targetOrg": self.target_org, "entries": self.entries})
+            except OSError:
+                # The cache only saves `sf` spawns; a read-only checkout still gets live answers.
+                pass
+        return value
+
+    def hits(self):
+        return [event for event in self.events if event["hit"]]
+
+
+def fetch_org_flags(target_org: str):
+    """isSandbox/isScratchOrg from `sf org display`; other fields (tokens included) are dropped."""
     cmd = ["sf", "org", "display", "--target-org", target_org, "--json"]
     try:
         result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-    except subprocess.CalledProcessError:
+    except (OSError, subprocess.CalledProcessError):
         return None
     try:
         payload = json.loads(result.stdout)
     except json.JSONDecodeError:
         return None
     org = payload.get("result", {})
-    is_sandbox = org.get("isSandbox")
-    is_scratch = org.get("isScratchOrg")
-    if is_sandbox is None and is_scratch is None:
+    flags = {"isSandbox": org.get("isSandbox"), "isScratchOrg": org.get("isScratchOrg")}
+    if flags["isSandbox"] is None and flags["isScratchOrg"] is None:
         return None
-    return (is_sandbox is False) and (is_scratch is False)
+    return flags
 
 
-def apply_test_level_policy(target_org: str, requested_level: str, requested_tests: str):
-    prod = is_production_org(target_org)
+def is_production_org(target_org: str, cache: OrgCache | None = None):
+    if cache is None:
+        flags = fetch_org_flags(target_org)
+    else:
+        flags = cache.get("display", ORG_INFO_TTL_SECONDS, lambda: fetch_org_flags(target_org))
+    if flags is None:
+        return None
+    return (flags.get("isSandbox") is False) and (flags.get("isScratchOrg") is False)
+
+
+def apply_test_level_policy(
+    target_org: str,
+    requested_level: str,
+    requested_tests: str,
+    cache: OrgCache | None = None,
+):
+    prod = is_production_org(target_org, cache)
     if prod is None:
         return requested_level, requested_tests
     if prod:
@@ -350,6 +1053,35 @@ def apply_test_level_policy(target_org: str, requested_level: str, requested_tes
     return requested_level, requested_tests
 
 
+def deploys_apex(counts) -> bool:
+    return bool(counts.get("apexClasses") or counts.get("apexTriggers") or counts.get("apexTestSuites"))
+
+
+def slice_test_level(counts, level, tests):
+    """The (--test-level, --tests) a slice deploys with; test levels only apply to Apex-bearing slices."""
+    if not level or not deploys_apex(counts):
+        return None, None
+    return level, tests if tests and level == "RunSpecifiedTests" else None
+
+
+def select_auto_tests(apex_index, members):
+    """(level, tests, uncovered) for `--test-level auto` on a manifest's members.
+
+    RunSpecifiedTests with the smallest covering test set, or RunLocalTests when some class or
+    trigger is uncovered (listed in `uncovered`) or there is nothing to cover (`uncovered` empty).
+    """
+    classes = members.get("ApexClass", [])
+    tests, uncovered = apex_index.select_tests(classes, members.get("ApexTrigger", []))
+    if uncovered:
+        return "RunLocalTests", [], uncovered
+    if not tests:
+        # Only test classes (or nothing testable) in this slice: run the tests it deploys.
+        tests = sorted(name for name in classes if name.lower() in apex_index.runnable_tests)
+        if not tests:
+            return "RunLocalTests", [], []
+    return "RunSpecifiedTests", tests, []
+
+
 def load_recipes_module(root: Path):
     module_path = root / "tools" / "geary" / "recipes.py"
     if not module_path.exists():
@@ -430,7 +1162,227 @@ def parse_aliases(path: Path):
     return aliases
 
 
+def query_watch_daemon(root: Path, op: str = "registry"):
+    """Ask a running `geary update --watch` for `op`; None when no daemon answers."""
+    try:
+        info = json.loads((root / "geary" / "out" / "watch.json").read_text(encoding="utf-8"))
+        with socket.create_connection(("127.0.0.1", int(info["port"])), timeout=WATCH_QUERY_TIMEOUT) as conn:
+            conn.sendall(json.dumps({"op": op}).encode("utf-8") + b"\n")
+            with conn.makefile("rb") as reader:
+                reply = json.loads(reader.readline())
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if not isinstance(reply, dict) or not reply.get("ok") or reply.get("root", str(root)) != str(root):
+        return None
+    return reply
+
+
+def registry_store_key(root: Path) -> str:
+    """Identity of the inputs a store was built from: (mtime, size) of slices.json and slices.yml."""
+    sources = [root / "geary" / "out" / "slices.json", root / "geary" / "slices.yml"]
+    return json.dumps([path_signature(path) for path in sources])
+
+
+def build_registry_store(root: Path):
+    """Write geary/out/slices.db from slices.json and slices.yml; None when there is no registry yet."""
+    registry_path = root / "geary" / "out" / "slices.json"
+    if not registry_path.exists():
+        return None
+    # Keyed before reading, so an edit racing the build leaves the store stale rather than wrong.
+    key = registry_store_key(root)
+    registry = json.loads(registry_path.read_text(encoding="utf-8"))
+    aliases = parse_aliases(root / "geary" / "slices.yml")
+    path = registry_path.with_name(REGISTRY_STORE_NAME)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with contextlib.suppress(FileNotFoundError):
+        tmp_path.unlink()
+    conn = sqlite3.connect(tmp_path)
+    try:
+        with conn:
+            conn.executescript(REGISTRY_STORE_SCHEMA)
+            meta = {
+                "version": str(REGISTRY_STORE_VERSION),
+                "key": key,
+                "apiVersion": registry.get("apiVersion", ""),
+                "generatedFrom": registry.get("generatedFrom", ""),
+            }
+            conn.executemany("INSERT INTO meta VALUES (?, ?)", meta.items())
+            slices = registry.get("slices", [])
+            conn.executemany(
+                "INSERT INTO slices VALUES (?, ?, ?)",
+                ((entry["name"], position, json.dumps(entry)) for position, entry in enumerate(slices)),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO depends_on VALUES (?, ?, ?)",
+                (
+                    (entry["name"], dep, position)
+                    for entry in slices
+                    for position, dep in enumerate(entry.get("dependsOn", []))
+                ),
+            )
+            conn.executemany(
+                "INSERT INTO aliases VALUES (?, ?, ?)",
+                ((alias, position, json.dumps(data)) for position, (alias, data) in enumerate(aliases.items())),
+            )
+    finally:
+        conn.close()
+    os.replace(tmp_path, path)
+    return path
+
+
+class StoreView(Mapping):
+    """Read-only mapping over one store table; a point lookup is one indexed query.
+
+    Iterating loads every row in a single query and decodes them in one batch, so a full listing
+    costs about what parsing slices.json did, while single-slice callers never pay for it.
+    """
+
+    def __init__(self, store, fetch_all, fetch_one, decode_many=None):
+        self.store = store
+        self.fetch_all = fetch_all
+        self.fetch_one = fetch_one
+        self.decode_many = decode_many or (lambda raws: json.loads("[" + ",".join(raws) + "]"))
+        self.rows = {}
+        self.complete = False
+
+    def __getitem__(self, name):
+        if name not in self.rows:
+            raw = None if self.complete else self.fetch_one(name)
+            if raw is None:
+                raise KeyError(name)
+            self.rows[name] = self.decode_many([raw])[0]
+        return self.rows[name]
+
+    def __contains__(self, name):
+        try:
+            self[name]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        if not self.complete:
+            names, raws = [], []
+            for name, raw in self.fetch_all():
+                names.append(name)
+                raws.append(raw)
+            self.rows = dict(zip(names, self.decode_many(raws)))
+            self.complete = True
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(list(iter(self)))
+
+
+class RegistryStore:
+    """Lazy lookups into geary/out/slices.db: one slice, its dependency edges or one alias at a time."""
+
+    _opened = {}
+
+    def __init__(self, path: Path):
+        self.conn = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+        rows = dict(self.conn.execute("SELECT key, value FROM meta"))
+        self.key = rows.get("key") if rows.get("version") == str(REGISTRY_STORE_VERSION) else None
+        self.meta = rows
+
+    @classmethod
+    def connect(cls, path: Path):
+        try:
+            return cls(path)
+        except sqlite3.Error:
+            return None
+
+    @classmethod
+    def open(cls, root: Path):
+        """The store for `root` if it matches slices.json and slices.yml, rebuilding it when stale.
+
+        Returns None (callers fall back to the JSON/YAML sources) when there is no registry, the
+        store cannot be written, or `GEARY_REGISTRY_STORE=0` is set.
+        """
+        if os.environ.get("GEARY_REGISTRY_STORE", "1") == "0":
+            return None
+        key = registry_store_key(root)
+        store = cls._opened.get(root)
+        if store is not None and store.key == key:
+            return store
+        path = root / "geary" / "out" / REGISTRY_STORE_NAME
+        store = cls.connect(path) if path.exists() else None
+        if store is None or store.key != key:
+            try:
+                if build_registry_store(root) is None:
+                    return None
+            except (OSError, sqlite3.Error):
+                return None
+            store = cls.connect(path)
+        if store is None or store.key != key:
+            return None
+        cls._opened[root] = store
+        return store
+
+    def one(self, sql: str, name: str):
+        row = self.conn.execute(sql, (name,)).fetchone()
+        return row[0] if row else None
+
+    def slice(self, name: str):
+        raw = self.one("SELECT entry FROM slices WHERE name = ?", name)
+        return json.loads(raw) if raw else None
+
+    def dependencies(self, name: str):
+        rows = self.conn.execute("SELECT dep FROM depends_on WHERE name = ? ORDER BY position", (name,))
+        return [dep for (dep,) in rows]
+
+    def alias(self, name: str):
+        raw = self.one("SELECT entry FROM aliases WHERE alias = ?", name)
+        return json.loads(raw) if raw else None
+
+    def slices(self):
+        return StoreView(
+            self,
+            lambda: self.conn.execute("SELECT name, entry FROM slices ORDER BY position"),
+            lambda name: self.one("SELECT entry FROM slices WHERE name = ?", name),
+        )
+
+    def aliases(self):
+        return StoreView(
+            self,
+            lambda: self.conn.execute("SELECT alias, entry FROM aliases ORDER BY position"),
+            lambda name: self.one("SELECT entry FROM aliases WHERE alias = ?", name),
+        )
+
+    def dependency_map(self):
+        names = lambda: self.conn.execute("SELECT name FROM slices ORDER BY position")
+        return StoreView(
+            self,
+            lambda: ((name, self.dependencies(name)) for (name,) in names()),
+            self.dependencies,
+            decode_many=lambda values: values,
+        )
+
+
+def dependency_map(slices):
+    store = getattr(slices, "store", None)
+    if store is not None:
+        return store.dependency_map()
+    return {name: entry.get("dependsOn", []) for name, entry in slices.items()}
+
+
+def load_aliases(root: Path):
+    store = RegistryStore.open(root)
+    if store is not None:
+        return store.aliases()
+    return parse_aliases(root / "geary" / "slices.yml")
+
+
 def load_registry(root: Path):
+    reply = query_watch_daemon(root)
+    if reply is not None:
+        registry = reply["registry"]
+        slices = {slice_entry["name"]: slice_entry for slice_entry in registry.get("slices", [])}
+        return registry, slices
+    store = RegistryStore.open(root)
+    if store is not None:
+        registry = {"apiVersion": store.meta.get("apiVersion"), "generatedFrom": store.meta.get("generatedFrom")}
+        return registry, store.slices()
     registry_path = root / "geary" / "out" / "slices.json"
     if not registry_path.exists():
         raise FileNotFoundError("Missing geary/out/slices.json. Run geary update first.")
@@ -498,6 +1450,198 @@ def expand_with_deps(targets, dep_map, slices):
     return expanded
 
 
+def is_permset_slice(slices, name) -> bool:
+    return slices.get(name, {}).get("kind") == "permissionsets"
+
+
+def permsets_last(order, slices):
+    """Move permission set slices to the end so the classes and objects they grant exist first."""
+    perms = [name for name in order if is_permset_slice(slices, name)]
+    if not perms:
+        return order
+    return [name for name in order if name not in perms] + perms
+
+
+def resolve_install_order(name, aliases, slices, dep_map, with_deps=False, all_slices=False):
+    """The slices `geary install` deploys for `name` (or --all), in deploy order."""
+    if all_slices:
+        targets, alias_with_deps = sorted(slices.keys()), False
+    else:
+        targets, _, alias_with_deps = resolve_targets(name, aliases, slices)
+    if with_deps or alias_with_deps:
+        order = topo_sort(expand_with_deps(targets, dep_map, slices), dep_map)
+    else:
+        order = sorted(set(targets))
+    return permsets_last(order, slices)
+
+
+def schedule_dependencies(order, dep_map, is_last=None):
+    """Each node's dependencies within `order`; `is_last` nodes depend on every other node."""
+    node_set = set(order)
+    deps = {name: {dep for dep in dep_map.get(name, []) if dep in node_set and dep != name} for name in order}
+    last = {name for name in order if is_last and is_last(name)}
+    for name in last:
+        deps[name] |= node_set - last
+    return deps
+
+
+def run_dag_schedule(order, dep_map, jobs: int, start, is_last=None):
+    """Run `start(name)` for each node of `order` as soon as its dependencies within `order` succeed.
+
+    Up to `jobs` nodes run at once, picked in `order` when several are ready. Nodes for which
+    `is_last(name)` holds wait for every other node. `start` returns None on success or an error
+    (raising counts too). After the first failure nothing new starts and in-flight nodes drain.
+    Returns (succeeded, failures as (name, error), not started) with `succeeded` in completion order.
+    """
+    deps = schedule_dependencies(order, dep_map, is_last)
+    pending = list(order)
+    running = {}
+    succeeded = []
+    done = set()
+    failures = []
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        while pending or running:
+            if not failures:
+                for name in list(pending):
+                    if len(running) >= max(1, jobs):
+                        break
+                    if deps[name] <= done:
+                        pending.remove(name)
+                        running[pool.submit(start, name)] = name
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    error = future.result()
+                except Exception as exc:
+                    error = exc
+                if error is None:
+                    succeeded.append(name)
+                    done.add(name)
+                else:
+                    failures.append((name, error))
+    return succeeded, failures, pending
+
+
+class DeployOutputParser:
+    """Turns `sf project deploy start` output lines into progress events.
+
+    Events are dicts: {"kind": "components"|"tests", "done", "total"}, {"kind": "coverage",
+    "percent"} and {"kind": "status", "status"}; repeats of the last value are dropped. Only the
+    last `tail_lines` lines are kept, for the failure summary.
+    """
+
+    def __init__(self, tail_lines: int = DEPLOY_TAIL_LINES):
+        self.tail = deque(maxlen=tail_lines)
+        self.state = {}
+        self.lines = 0
+        self.transient = None
+
+    def feed(self, line: str):
+        line = ANSI_ESCAPE_RE.sub("", line).rstrip()
+        if not line.strip():
+            return []
+        self.lines += 1
+        self.tail.append(line)
+        if self.transient is None:
+            match = TRANSIENT_DEPLOY_ERROR_RE.search(line)
+            if match:
+                self.transient = match.group(0)
+        found = []
+        for kind, pattern in DEPLOY_PROGRESS_RES:
+            match = pattern.search(line)
+            if match:
+                found.append({"kind": kind, "done": int(match.group(1)), "total": int(match.group(2))})
+        match = DEPLOY_COVERAGE_RE.search(line)
+        if match:
+            found.append({"kind": "coverage", "percent": float(match.group(1))})
+        match = DEPLOY_STATUS_RE.match(line.strip())
+        if match:
+            found.append({"kind": "status", "status": match.group(1)})
+        events = []
+        for event in found:
+            if self.state.get(event["kind"]) != event:
+                self.state[event["kind"]] = event
+                events.append(event)
+        return events
+
+    def tail_text(self) -> str:
+        return "\n".join(self.tail)
+
+    def transient_error(self):
+        """The transient sf error behind a failed deploy, or None when the org reached a final status."""
+        status = self.state.get("status", {}).get("status", "")
+        if status.replace(" ", "").lower() in DEPLOY_FINAL_STATUSES:
+            return None
+        return self.transient
+
+
+def deploy_retry_delay(attempt: int, backoff: float) -> float:
+    """Seconds to wait before retry `attempt` (1-based): `backoff` doubled per attempt, capped."""
+    return min(DEPLOY_RETRY_BACKOFF_MAX_SECONDS, backoff * 2 ** (attempt - 1))
+
+
+def format_deploy_event(event) -> str:
+    kind = event["kind"]
+    if kind in {"components", "tests"}:
+        return f"{kind} {event['done']}/{event['total']}"
+    if kind == "coverage":
+        return f"coverage {event['percent']:g}%"
+    return f"status {event['status']}"
+
+
+def stream_deploy(cmd, on_line=None, on_event=None, tail_lines: int = DEPLOY_TAIL_LINES):
+    """Run a deploy command, feeding merged stdout/stderr through a DeployOutputParser as it arrives.
+
+    Returns (returncode, parser). Memory use is bounded by the parser's tail buffer.
+    """
+    parser = DeployOutputParser(tail_lines)
+    with subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        bufsize=1,
+    ) as proc:
+        for raw in proc.stdout:
+            line = raw.rstrip("\n")
+            events = parser.feed(line)
+            if on_line and line.strip():
+                on_line(ANSI_ESCAPE_RE.sub("", line).rstrip())
+            if on_event:
+                for event in events:
+                    on_event(event)
+        returncode = proc.wait()
+    return returncode, parser
+
+
+def stream_deploy_with_retries(cmd, retries: int, backoff: float, on_retry=None, on_line=None, on_event=None):
+    """stream_deploy, re-run up to `retries` times while it fails with a transient sf error.
+
+    Before each retry calls `on_retry(attempt, reason, delay)` and then waits deploy_retry_delay().
+    Returns (returncode, parser, attempts, transient, duration_ms): `transient` is the last
+    attempt's transient error or None, and only the last attempt is timed so retries and
+    backoff do not skew `stats install`.
+    """
+    attempt = 1
+    while True:
+        started = time.monotonic()
+        returncode, parser = stream_deploy(cmd, on_line=on_line, on_event=on_event)
+        transient = parser.transient_error() if returncode != 0 else None
+        if transient is None or attempt > retries:
+            break
+        delay = deploy_retry_delay(attempt, backoff)
+        if on_retry:
+            on_retry(attempt, transient, delay)
+        time.sleep(delay)
+        attempt += 1
+    return returncode, parser, attempt, transient, int((time.monotonic() - started) * 1000)
+
+
 def format_alias(name, alias_map):
     aliases = alias_map.get(name)
     if not aliases:
@@ -505,13 +1649,25 @@ def format_alias(name, alias_map):
     return f" (alias: {', '.join(aliases)})"
 
 
-def run_update(root: Path):
+def run_update(root: Path, full: bool = False, watch: bool = False, interval: float = 0.5):
     script = root / "tools" / "geary" / "slices.py"
     if not script.exists():
         raise FileNotFoundError("Missing tools/geary/slices.py")
     cmd = [sys.executable, str(script), "--root", str(root), "--out", "geary/out", "--manifest-dir", "manifest"]
+    if full:
+        cmd.append("--full")
+    if watch:
+        cmd.extend(["--watch", "--interval", str(interval)])
     print("Running: " + " ".join(cmd))
-    subprocess.run(cmd, check=True)
+    try:
+        subprocess.run(cmd, check=True)
+    except KeyboardInterrupt:
+        # Ctrl-C reaches the daemon too; it removes watch.json and exits on its own.
+        if not watch:
+            raise
+        return
+    if os.environ.get("GEARY_REGISTRY_STORE", "1") != "0":
+        build_registry_store(root)
 
 
 def run_recipe_compile(root: Path):
@@ -660,6 +1816,68 @@ def write_receipt(path: Path, receipt: dict):
     path.write_text(payload + "\n", encoding="utf-8")
 
 
+def install_run_options(args, jobs: int, coalesce: bool, force: bool, resume) -> dict:
+    """The invocation fields an install's run.started event and receipt both carry."""
+    return {
+        "command": "install",
+        "target": "--all" if args.all else args.name,
+        "target_org": args.target_org,
+        "test_level": args.test_level,
+        "jobs": jobs,
+        "coalesce": coalesce,
+        "force": force,
+        "since": getattr(args, "since", None),
+        "resumed_from": resume,
+    }
+
+
+def deploy_event_data(name: str, cmd, counts: dict, slice_names=None) -> dict:
+    """slice.deploy.started data for one deploy call; slice.deploy.finished adds its outcome."""
+    data = {
+        "slice": name,
+        "members": sum(counts.values()),
+        "counts": counts,
+        "test_level": cmd[cmd.index("--test-level") + 1] if "--test-level" in cmd else None,
+    }
+    if slice_names:
+        data["slices"] = list(slice_names)
+    return data
+
+
+def deploy_result(returncode: int, duration_ms: int, attempts: int) -> dict:
+    """A deployed or failed slice as the install receipt and checkpoint record it."""
+    return {
+        "status": "deployed" if returncode == 0 else "failed",
+        "exit_code": returncode,
+        "duration_ms": duration_ms,
+        "attempts": attempts,
+    }
+
+
+def install_receipt(run_id: str, options: dict, started_at, finished_at, exit_code: int, planned, deploy_results) -> dict:
+    """receipt.json for an install: the run options, timing and one entry per planned slice."""
+    return {
+        "run_id": run_id,
+        **options,
+        "started_at": isoformat_utc(started_at),
+        "finished_at": isoformat_utc(finished_at),
+        "duration_ms": int((finished_at - started_at).total_seconds() * 1000),
+        "status": "ok" if exit_code == 0 else "fail",
+        "exit_code": exit_code,
+        "slices": [{"name": name, **deploy_results.get(name, {"status": "not_started"})} for name in planned],
+    }
+
+
+def install_finished_emissions(receipt_path: Path, receipt: dict):
+    """The (type, data) events that close an install run: receipt.written, run.failed, run.completed."""
+    events = [("receipt.written", {"path": str(receipt_path)})]
+    if receipt["status"] != "ok":
+        failed = any(entry["status"] == "failed" for entry in receipt["slices"])
+        events.append(("run.failed", {"error_code": "DEPLOY_FAILED" if failed else "INSTALL_FAILED"}))
+    events.append(("run.completed", {"status": receipt["status"]}))
+    return events
+
+
 def resolve_target_path(root: Path, target: str, kind: str) -> Path:
     package_dirs = resolve_package_dirs(root)
     if kind == "flow":
@@ -742,21 +1960,32 @@ def parse_validate_log(log_path: Path, root: Path) -> tuple[list[dict], list[str
     return targets, notes
 
 
-def list_org_flows(target_org: str) -> tuple[set[str], str]:
-    cmd = ["sf", "org", "list", "metadata", "--metadata-type", "Flow", "--target-org", target_org]
-    try:
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-    except subprocess.CalledProcessError as exc:
-        return set(), f"org list metadata failed: {exc.returncode}"
-    flows = set()
-    for line in (result.stdout or "").splitlines():
-        name = line.strip()
-        if not name or name.lower().startswith("fullname"):
-            continue
-        if " " in name:
-            name = name.split()[0]
-        flows.add(name)
-    return flows, ""
+def list_org_flows(target_org: str, cache: OrgCache | None = None) -> tuple[set[str], str]:
+    error = ""
+
+    def fetch():
+        nonlocal error
+        cmd = ["sf", "org", "list", "metadata", "--metadata-type", "Flow", "--target-org", target_org]
+        try:
+            result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+        except subprocess.CalledProcessError as exc:
+            error = f"org list metadata failed: {exc.returncode}"
+            return None
+        flows = set()
+        for line in (result.stdout or "").splitlines():
+            name = line.strip()
+            if not name or name.lower().startswith("fullname"):
+                continue
+            if " " in name:
+                name = name.split()[0]
+            flows.add(name)
+        return sorted(flows)
+
+    if cache is None:
+        flows = fetch()
+    else:
+        flows = cache.get("metadata:Flow", ORG_METADATA_TTL_SECONDS, fetch)
+    return set(flows or []), error
 
 
 def validate_repair_blueprint(blueprint: dict) -> list[str]:
@@ -1048,9 +2277,15 @@ def run_repair(root: Path, args):
     org_flows = set()
     org_error = ""
     if resave_targets:
-        org_flows, org_error = list_org_flows("deafingov")
+        target_org = getattr(args, "target_org", "deafingov")
+        org_cache = OrgCache(root, target_org, getattr(args, "refresh", False))
+        org_flows, org_error = list_org_flows(target_org, org_cache)
         if org_error:
             notes.append(org_error)
+        for event in org_cache.events:
+            event_type = "org_cache.hit" if event["hit"] else "org_cache.miss"
+            payload = {key: value for key, value in event.items() if key != "hit"}
+            append_emission(emissions_path, run_id, event_type, {"target_org": target_org, **payload})
     orphaned = [name for name in resave_targets if org_flows and name not in org_flows]
     if orphaned:
         for item in targets:
@@ -1475,6 +2710,22 @@ def read_mermaid_input(root: Path, args) -> str:
     return sys.stdin.read()
 
 
+@functools.lru_cache(maxsize=None)
+def load_mermaid_client_module():
+    """tools/geary/mermaid_client.py beside this file; it owns the shared worker connection pool."""
+    module_path = Path(__file__).resolve().parent / "mermaid_client.py"
+    spec = importlib.util.spec_from_file_location("geary_mermaid_client", module_path)
+    if spec is None or spec.loader is None:
+        raise ImportError("Unable to load mermaid_client module")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def worker_pool():
+    return load_mermaid_client_module().default_pool()
+
+
 def build_render_url(base_url: str) -> str:
     if base_url.endswith("/render"):
         return base_url
@@ -1488,29 +2739,20 @@ def perform_worker_request(
     key: str,
     request_id: str | None,
     timeout: int,
+    phases: dict | None = None,
 ):
     url = build_render_url(worker_url)
     payload = {"mermaid": mermaid_text, "format": fmt}
     if request_id:
         payload["id"] = request_id
     data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-    request = urllib.request.Request(
-        url,
-        data=data,
-        method="POST",
-        headers={
-            "Content-Type": "application/json",
-            "X-Geary-Key": key,
-        },
-    )
+    headers = {
+        "Content-Type": "application/json",
+        "X-Geary-Key": key,
+    }
     started = time.perf_counter()
     try:
-        with urllib.request.urlopen(request, timeout=timeout) as response:
-            status = response.status
-            body = response.read()
-    except urllib.error.HTTPError as err:
-        status = err.code
-        body = err.read() if err.fp else b""
+        status, body, _ = worker_pool().request("POST", url, data, headers, timeout, phases=phases)
     except urllib.error.URLError as err:
         latency_ms = int((time.perf_counter() - started) * 1000)
         return None, None, latency_ms, f"request_failed: {err.reason}"
@@ -1518,6 +2760,184 @@ def perform_worker_request(
     return status, body, latency_ms, None
 
 
+def connection_stats(pool=None) -> dict:
+    """Keep-alive reuse so far, for `request.sent` emissions."""
+    pool = pool or worker_pool()
+    return {"connection_requests": pool.requests, "connection_reuse_ratio": pool.reuse_ratio()}
+
+
+class AdaptiveConcurrency:
+    """Caps in-flight worker requests for `run --batch`, backing off when the worker returns 429.
+
+    A 429 halves the cap (once per back-off window, never below 1) and pauses every sender for
+    `backoff` seconds, doubled per retry of the same request. The cap grows back by one after as
+    many consecutive successes as the current cap, up to `maximum`.
+    """
+
+    def __init__(self, maximum: int, retries: int = BATCH_RATE_LIMIT_RETRIES, backoff: float = BATCH_RATE_LIMIT_BACKOFF_SECONDS):
+        self.maximum = max(1, maximum)
+        self.limit = self.maximum
+        self.lowest = self.limit
+        self.retries = retries
+        self.backoff = backoff
+        self.in_flight = 0
+        self.peak = 0
+        self.successes = 0
+        self.rate_limited = 0
+        self.paused_until = 0.0
+        self._cond = threading.Condition()
+
+    @contextlib.contextmanager
+    def slot(self):
+        with self._cond:
+            while True:
+                pause = self.paused_until - time.monotonic()
+                if pause > 0:
+                    self._cond.wait(pause)
+                elif self.in_flight >= self.limit:
+                    self._cond.wait()
+                else:
+                    break
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.in_flight -= 1
+                self._cond.notify_all()
+
+    def on_success(self):
+        with self._cond:
+            self.successes += 1
+            if self.limit < self.maximum and self.successes >= self.limit:
+                self.limit += 1
+                self.successes = 0
+                self._cond.notify_all()
+
+    def on_rate_limited(self, attempt: int):
+        """Record a 429 on try `attempt` (1-based); returns the back-off delay, or None when out of retries."""
+        with self._cond:
+            self.rate_limited += 1
+            self.successes = 0
+            now = time.monotonic()
+            if now >= self.paused_until:
+                self.limit = max(1, self.limit // 2)
+                self.lowest = min(self.lowest, self.limit)
+            if attempt > self.retries:
+                return None
+            delay = self.backoff * 2 ** (attempt - 1)
+            self.paused_until = max(self.paused_until, now + delay)
+            return delay
+
+
+@functools.lru_cache(maxsize=None)
+def render_cache_max_bytes() -> int:
+    """GEARY_RENDER_CACHE_MAX_MB in bytes; an unusable value is reported once and the default kept."""
+    value = os.environ.get("GEARY_RENDER_CACHE_MAX_MB", "").strip()
+    if not value:
+        return RENDER_CACHE_MAX_BYTES
+    try:
+        megabytes = float(value)
+    except ValueError:
+        megabytes = -1.0
+    if not math.isfinite(megabytes) or megabytes <= 0:
+        print(
+            f"Ignoring GEARY_RENDER_CACHE_MAX_MB={value!r} (expected a positive number); "
+            f"using {RENDER_CACHE_MAX_BYTES // (1024 * 1024)} MB.",
+            file=sys.stderr,
+        )
+        return RENDER_CACHE_MAX_BYTES
+    return int(megabytes * 1024 * 1024)
+
+
+class RenderCache:
+    """Worker outputs under runs/.cache/, one file per (input hash, format, worker URL).
+
+    Hits bump the file's mtime, and a store evicts least recently used files until the cache
+    fits in `max_bytes` (GEARY_RENDER_CACHE_MAX_MB overrides the 64 MB default). The cache is
+    best effort: a filesystem error reads as a miss and skips the store, never failing the run.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int | None = None):
+        self.directory = directory
+        self.max_bytes = render_cache_max_bytes() if max_bytes is None else max_bytes
+
+    @staticmethod
+    def key(input_hash: str, fmt: str, worker_url: str) -> str:
+        return hashlib.sha256(f"{input_hash}\n{fmt}\n{build_render_url(worker_url)}".encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str, fmt: str) -> Path:
+        return self.directory / f"{key}.{fmt}"
+
+    def get(self, key: str, fmt: str):
+        path = self.path_for(key, fmt)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return data
+
+    def put(self, key: str, fmt: str, data: bytes) -> bool:
+        """Store `data`; returns False when it is too large or the cache cannot be written."""
+        if len(data) > self.max_bytes:
+            return False
+        path = self.path_for(key, fmt)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            with contextlib.suppress(OSError):
+                tmp_path.unlink()
+            return False
+        self.evict()
+        return True
+
+    def evict(self):
+        entries = []
+        try:
+            with os.scandir(self.directory) as scan:
+                for entry in scan:
+                    if entry.is_file() and not entry.name.startswith("."):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            with contextlib.suppress(OSError):
+                os.remove(path)
+            total -= size
+
+
+def send_render_request(mermaid_text: str, fmt: str, worker_url: str, key: str, limiter=None, on_rate_limited=None, phases=None):
+    """perform_worker_request, paced by an AdaptiveConcurrency and retried on 429 while it allows.
+
+    `phases` ends up holding the timings of the last attempt.
+    """
+    if limiter is None:
+        return perform_worker_request(mermaid_text, fmt, worker_url, key, None, 20, phases)
+    attempt = 0
+    while True:
+        with limiter.slot():
+            result = perform_worker_request(mermaid_text, fmt, worker_url, key, None, 20, phases)
+        if result[0] != 429:
+            limiter.on_success()
+            return result
+        attempt += 1
+        delay = limiter.on_rate_limited(attempt)
+        if delay is None:
+            return result
+        if on_rate_limited:
+            on_rate_limited(attempt, delay)
+
+
 def parse_worker_payload(fmt: str, status: int, body: bytes):
     try:
         payload = json.loads(body.decode("utf-8"))
@@ -1540,6 +2960,15 @@ def parse_worker_payload(fmt: str, status: int, body: bytes):
     return payload
 
 
+def timed_parse_worker_payload(fmt: str, status: int, body: bytes, phases: dict):
+    """parse_worker_payload, recording its time as the `decode_ms` phase even when it raises."""
+    started = time.perf_counter()
+    try:
+        return parse_worker_payload(fmt, status, body)
+    finally:
+        phases["decode_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+
 def map_error_code(http_status: int | None, error_message: str, parse_error: bool = False):
     if http_status is None:
         return "UPSTREAM_DOWN"
@@ -1571,24 +3000,15 @@ def call_mermaid_worker(
     if request_id:
         payload["id"] = request_id
     data = json.dumps(payload).encode("utf-8")
-    request = urllib.request.Request(
-        url,
-        data=data,
-        method="POST",
-        headers={
-            "Content-Type": "application/json",
-            "X-Geary-Key": key,
-        },
-    )
+    headers = {
+        "Content-Type": "application/json",
+        "X-Geary-Key": key,
+    }
     try:
-        with urllib.request.urlopen(request, timeout=timeout) as response:
-            status = response.status
-            body = response.read().decode("utf-8")
-    except urllib.error.HTTPError as err:
-        status = err.code
-        body = err.read().decode("utf-8") if err.fp else ""
+        status, raw, _ = worker_pool().request("POST", url, data, headers, timeout)
     except urllib.error.URLError as err:
         raise RuntimeError(f"request_failed: {err.reason}") from err
+    body = raw.decode("utf-8")
 
     if status != 200:
         detail = body.strip().replace("\n", " ")
@@ -1819,6 +3239,7 @@ def run_health_doctor(root: Path, args):
     worker_present = bool(worker_url)
     http_status = None
     latency_ms = None
+    phases = {}
     error_code = ""
     error_message = ""
     status = "ok"
@@ -1883,6 +3304,7 @@ def run_health_doctor(root: Path, args):
                 geary_key,
                 None,
                 20,
+                phases,
             )
             request_payload = {"mermaid": normalized, "format": "svg"}
             append_emission(
@@ -1893,6 +3315,7 @@ def run_health_doctor(root: Path, args):
                     "method": "POST",
                     "path": urllib.parse.urlparse(build_render_url(worker_url)).path,
                     "body_bytes": len(json.dumps(request_payload, ensure_ascii=False).encode("utf-8")),
+                    **connection_stats(),
                 },
             )
             if request_error:
@@ -1901,14 +3324,20 @@ def run_health_doctor(root: Path, args):
                 error_message = request_error
             else:
                 response_bytes = len(body or b"")
+                try:
+                    payload = timed_parse_worker_payload("svg", http_status, body or b"", phases)
+                except RuntimeError as err:
+                    payload = None
+                    status = "fail"
+                    error_message = str(err)
+                    error_code = map_error_code(http_status, error_message, parse_error=True)
                 append_emission(
                     emissions_path,
                     run_id,
                     "response.received",
-                    {"status": http_status, "bytes": response_bytes},
+                    {"status": http_status, "bytes": response_bytes, "phases": phases},
                 )
-                try:
-                    payload = parse_worker_payload("svg", http_status, body or b"")
+                if payload is not None:
                     svg_bytes = (payload.get("svg") or "").encode("utf-8")
                     output_hash = sha256_digest(svg_bytes)
                     output_path = artifacts_dir / "output.svg"
@@ -1919,10 +3348,6 @@ def run_health_doctor(root: Path, args):
                         "artifact.written",
                         {"path": str(output_path), "bytes": len(svg_bytes), "hash": output_hash},
                     )
-                except RuntimeError as err:
-                    status = "fail"
-                    error_message = str(err)
-                    error_code = map_error_code(http_status, error_message, parse_error=True)
 
         finished_at = utc_now()
         receipt = {
@@ -1937,6 +3362,7 @@ def run_health_doctor(root: Path, args):
             "status": status,
             "http_status": http_status,
             "latency_ms": latency_ms,
+            "latency_phases": phases or None,
             "error_code": error_code,
             "error_message": error_message,
         }
@@ -1959,6 +3385,8 @@ def run_health_doctor(root: Path, args):
         print(f"latency ms: {latency_ms}")
     else:
         print("latency ms: -")
+    if phases:
+        print("latency phases: " + ", ".join(f"{name[:-3]} {phases[name]}ms" for name in LATENCY_PHASES if name in phases))
 
     if status == "ok":
         print(f"PASS: geary doctor healthy ({mode_label} mode)")
@@ -1977,8 +3405,24 @@ def run_health_doctor(root: Path, args):
     return 1
 
 
-def run_mermaid_render(root: Path, args, command_name: str, run_id: str, runs_dir_override: str | None = None):
-    load_env_files(root, args)
+def render_mermaid_run(
+    root: Path,
+    args,
+    command_name: str,
+    run_id: str,
+    runs_dir_override: str | None = None,
+    source: str | None = None,
+    limiter=None,
+    write_stdout: bool = True,
+    load_env: bool = True,
+):
+    """Render one input as a run with its own receipt and emissions; returns the receipt.
+
+    `source` replaces reading --in/--stdin. Batch renders pass a shared AdaptiveConcurrency as
+    `limiter`, turn off `write_stdout`, and skip `load_env` because run_batch loaded the env once.
+    """
+    if load_env:
+        load_env_files(root, args)
     _runs_dir, run_dir, artifacts_dir = ensure_run_dirs(root, run_id, runs_dir_override)
     emissions_path = run_dir / "emissions.ndjson"
     receipt_path = run_dir / "receipt.json"
@@ -2006,6 +3450,10 @@ def run_mermaid_render(root: Path, args, command_name: str, run_id: str, runs_di
     error_message = ""
     status = "ok"
     offline = getattr(args, "offline", False)
+    use_cache = not (getattr(args, "no_cache", False) or getattr(args, "offline", False))
+    cache = RenderCache(_runs_dir / RENDER_CACHE_DIR_NAME) if use_cache else None
+    cache_hit = False
+    phases = {}
 
     if not offline and (not key_present or not worker_present):
         status = "fail"
@@ -2017,7 +3465,7 @@ def run_mermaid_render(root: Path, args, command_name: str, run_id: str, runs_di
             error_message = "WORKER_URL is missing"
     else:
         try:
-            raw = read_mermaid_input(root, args)
+            raw = read_mermaid_input(root, args) if source is None else source
         except SystemExit:
             status = "fail"
             error_code = "BAD_INPUT"
@@ -2048,6 +3496,8 @@ def run_mermaid_render(root: Path, args, command_name: str, run_id: str, runs_di
 
                     output_bytes = b""
                     output_name = ""
+                    cache_key = RenderCache.key(input_hash, args.format, worker_url) if cache and not offline else None
+                    cached = cache.get(cache_key, args.format) if cache_key else None
                     if offline:
                         http_status = None
                         latency_ms = None
@@ -2061,14 +3511,34 @@ def run_mermaid_render(root: Path, args, command_name: str, run_id: str, runs_di
                             "artifact.written",
                             {"path": str(output_path), "bytes": len(output_bytes), "hash": output_hash, "offline": True},
                         )
+                    elif cached is not None:
+                        cache_hit = True
+                        output_bytes = cached
+                        output_name = f"output.{args.format}"
+                        output_hash = sha256_digest(output_bytes)
+                        append_emission(emissions_path, run_id, "cache.hit", {"key": cache_key, "bytes": len(output_bytes)})
+                        output_path = artifacts_dir / output_name
+                        write_artifact(output_path, output_bytes)
+                        append_emission(
+                            emissions_path,
+                            run_id,
+                            "artifact.written",
+                            {"path": str(output_path), "bytes": len(output_bytes), "hash": output_hash, "cached": True},
+                        )
                     else:
-                        http_status, body, latency_ms, request_error = perform_worker_request(
+                        http_status, body, latency_ms, request_error = send_render_request(
                             normalized,
                             args.format,
                             worker_url,
                             geary_key,
-                            None,
-                            20,
+                            limiter,
+                            lambda attempt, delay: append_emission(
+                                emissions_path,
+                                run_id,
+                                "request.rate_limited",
+                                {"attempt": attempt, "delay_ms": int(delay * 1000), "limit": limiter.limit},
+                            ),
+                            phases,
                         )
                         request_payload = {"mermaid": normalized, "format": args.format}
                         append_emission(
@@ -2079,6 +3549,7 @@ def run_mermaid_render(root: Path, args, command_name: str, run_id: str, runs_di
                                 "method": "POST",
                                 "path": urllib.parse.urlparse(build_render_url(worker_url)).path,
                                 "body_bytes": len(json.dumps(request_payload, ensure_ascii=False).encode("utf-8")),
+                                **connection_stats(),
                             },
                         )
                         if request_error:
@@ -2086,14 +3557,20 @@ def run_mermaid_render(root: Path, args, command_name: str, run_id: str, runs_di
                             error_code = "UPSTREAM_DOWN"
                             error_message = request_error
                         else:
+                            try:
+                                payload = timed_parse_worker_payload(args.format, http_status, body or b"", phases)
+                            except RuntimeError as err:
+                                payload = None
+                                status = "fail"
+                                error_message = str(err)
+                                error_code = map_error_code(http_status, error_message, parse_error=True)
                             append_emission(
                                 emissions_path,
                                 run_id,
                                 "response.received",
-                                {"status": http_status, "bytes": len(body or b"")},
+                                {"status": http_status, "bytes": len(body or b""), "phases": phases},
                             )
-                            try:
-                                payload = parse_worker_payload(args.format, http_status, body or b"")
+                            if payload is not None:
                                 if args.format == "svg":
                                     output_bytes = (payload.get("svg") or "").encode("utf-8")
                                     output_name = "output.svg"
@@ -2109,10 +3586,8 @@ def run_mermaid_render(root: Path, args, command_name: str, run_id: str, runs_di
                                     "artifact.written",
                                     {"path": str(output_path), "bytes": len(output_bytes), "hash": output_hash},
                                 )
-                            except RuntimeError as err:
-                                status = "fail"
-                                error_message = str(err)
-                                error_code = map_error_code(http_status, error_message, parse_error=True)
+                                if cache_key and not cache.put(cache_key, args.format, output_bytes):
+                                    append_emission(emissions_path, run_id, "cache.store_skipped", {"key": cache_key})
 
                     if args.out and status == "ok":
                         target = Path(args.out)
@@ -2120,7 +3595,7 @@ def run_mermaid_render(root: Path, args, command_name: str, run_id: str, runs_di
                             target = root / target
                         target.parent.mkdir(parents=True, exist_ok=True)
                         target.write_bytes(output_bytes)
-                    elif status == "ok":
+                    elif status == "ok" and write_stdout:
                         sys.stdout.buffer.write(output_bytes)
                         if not output_bytes.endswith(b"\n"):
                             sys.stdout.buffer.write(b"\n")
@@ -2138,6 +3613,8 @@ def run_mermaid_render(root: Path, args, command_name: str, run_id: str, runs_di
         "status": status,
         "http_status": http_status,
         "latency_ms": latency_ms,
+        "latency_phases": phases or None,
+        "cache_hit": cache_hit,
         "error_code": error_code,
         "error_message": error_message,
     }
@@ -2148,17 +3625,194 @@ def run_mermaid_render(root: Path, args, command_name: str, run_id: str, runs_di
     else:
         append_emission(emissions_path, run_id, "run.failed", {"error_code": error_code})
         append_emission(emissions_path, run_id, "run.completed", {"status": status})
+    return receipt
+
 
+def run_mermaid_render(root: Path, args, command_name: str, run_id: str, runs_dir_override: str | None = None):
+    receipt = render_mermaid_run(root, args, command_name, run_id, runs_dir_override)
     print(f"run id: {run_id}", file=sys.stderr)
-    if status != "ok" and error_message:
-        print(f"{command_name} failed: {error_message}", file=sys.stderr)
+    if receipt["status"] != "ok" and receipt["error_message"]:
+        print(f"{command_name} failed: {receipt['error_message']}", file=sys.stderr)
+    return 0 if receipt["status"] == "ok" else 1
+
+
+def batch_inputs(root: Path, spec: str):
+    """(label, path, inline source) for each `run --batch` input, in a stable order.
+
+    `spec` is a directory (its *.mmd files, recursively), a glob, or an .ndjson file with one
+    {"id"?, "mermaid" | "path"} object per line. Labels name the outputs under --out.
+    """
+    path = Path(spec)
+    if not path.is_absolute():
+        path = root / path
+    if path.is_dir():
+        return [(item.relative_to(path).with_suffix("").as_posix(), item, None) for item in sorted(path.rglob("*.mmd"))]
+    if path.suffix == ".ndjson" and path.is_file():
+        items = []
+        for line_no, line in enumerate(path.read_text(encoding="utf-8").splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"{path.name}:{line_no}: {exc}") from None
+            if not isinstance(entry, dict) or not (isinstance(entry.get("mermaid"), str) or entry.get("path")):
+                raise ValueError(f"{path.name}:{line_no}: expected an object with \"mermaid\" or \"path\"")
+            label = re.sub(r"[^A-Za-z0-9_.-]+", "_", str(entry.get("id") or line_no))
+            if isinstance(entry.get("mermaid"), str):
+                items.append((label, None, entry["mermaid"]))
+            else:
+                item_path = Path(entry["path"])
+                items.append((label, item_path if item_path.is_absolute() else path.parent / item_path, None))
+        return items
+    items = []
+    for match in sorted(Path(found) for found in glob.glob(str(path), recursive=True)):
+        if match.is_file():
+            label = match.relative_to(root).with_suffix("").as_posix() if match.is_relative_to(root) else match.stem
+            items.append((label, match, None))
+    return items
+
+
+def run_batch(root: Path, args):
+    load_env_files(root, args)
+    try:
+        items = batch_inputs(root, args.batch)
+    except (OSError, ValueError) as err:
+        print(f"Batch input error: {err}", file=sys.stderr)
+        return 2
+    if not items:
+        print(f"No Mermaid inputs found for {args.batch}.", file=sys.stderr)
+        return 2
+    labels = [label for label, _, _ in items]
+    if len(set(labels)) != len(labels):
+        duplicate = next(label for label in labels if labels.count(label) > 1)
+        print(f"Batch inputs share the output name {duplicate!r}; give them distinct ids.", file=sys.stderr)
+        return 2
+
+    concurrency = max(1, args.concurrency)
+    limiter = AdaptiveConcurrency(concurrency)
+    pool = worker_pool()
+    if pool.max_idle_per_host:
+        # Keep a connection per concurrent sender instead of reopening above the default.
+        pool.max_idle_per_host = max(pool.max_idle_per_host, concurrency)
+        pool.max_idle_total = max(pool.max_idle_total, concurrency)
+    out_dir = None
+    if args.out:
+        out_dir = Path(args.out)
+        if not out_dir.is_absolute():
+            out_dir = root / out_dir
+    batch_id = generate_run_id()
+    batch_dir = get_runs_dir(root) / batch_id
+    emissions_path = batch_dir / "emissions.ndjson"
+    append_emission(
+        emissions_path,
+        batch_id,
+        "run.started",
+        {"command": "run.batch", "source": args.batch, "inputs": len(items), "concurrency": concurrency},
+    )
+    lock = threading.Lock()
+    results = [None] * len(items)
+    finished = 0
+
+    def render(idx):
+        nonlocal finished
+        label, path, source = items[idx]
+        item_args = argparse.Namespace(
+            input_path=str(path) if path else None,
+            stdin=False,
+            format=args.format,
+            out=str(out_dir / f"{label}.{args.format}") if out_dir else None,
+            env_file=args.env_file,
+            offline=args.offline,
+            no_cache=args.no_cache,
+        )
+        run_id = generate_run_id()
+        try:
+            receipt = render_mermaid_run(
+                root, item_args, "run", run_id, source=source, limiter=limiter, write_stdout=False, load_env=False
+            )
+        except Exception as err:  # one broken input must not lose the rest of the batch
+            receipt = {
+                "status": "fail",
+                "error_code": "UNKNOWN",
+                "error_message": f"{type(err).__name__}: {err}",
+                "http_status": None,
+                "latency_ms": None,
+                "cache_hit": False,
+            }
+        entry = {
+            "input": label,
+            "run_id": run_id,
+            "status": receipt["status"],
+            "error_code": receipt["error_code"],
+            "error_message": receipt["error_message"],
+            "http_status": receipt["http_status"],
+            "latency_ms": receipt["latency_ms"],
+            "cache_hit": receipt["cache_hit"],
+        }
+        with lock:
+            results[idx] = entry
+            finished += 1
+            append_emission(emissions_path, batch_id, "batch.item.completed", entry)
+            detail = f" {receipt['error_code']}: {receipt['error_message']}" if receipt["status"] != "ok" else ""
+            print(f"[{finished}/{len(items)}] {label}: {receipt['status']}{detail} (run {run_id})", file=sys.stderr)
+
+    started_at = utc_now()
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(render, range(len(items))))
+    elapsed = time.monotonic() - started
+    finished_at = utc_now()
+
+    ok = sum(1 for entry in results if entry["status"] == "ok")
+    status = "ok" if ok == len(items) else "fail"
+    receipt = {
+        "run_id": batch_id,
+        "command": "run.batch",
+        "source": args.batch,
+        "format": args.format,
+        "worker_url": os.environ.get("WORKER_URL", ""),
+        "started_at": isoformat_utc(started_at),
+        "finished_at": isoformat_utc(finished_at),
+        "duration_ms": int(elapsed * 1000),
+        "status": status,
+        "inputs": len(items),
+        "ok": ok,
+        "failed": len(items) - ok,
+        "concurrency": concurrency,
+        "peak_in_flight": limiter.peak,
+        "lowest_concurrency": limiter.lowest,
+        "rate_limited": limiter.rate_limited,
+        "cache_hits": sum(1 for entry in results if entry["cache_hit"]),
+        "renders_per_second": round(len(items) / elapsed, 2) if elapsed else None,
+        **connection_stats(pool),
+        "items": results,
+    }
+    receipt_path = batch_dir / "receipt.json"
+    write_receipt(receipt_path, receipt)
+    append_emission(emissions_path, batch_id, "receipt.written", {"path": str(receipt_path)})
+    if status != "ok":
+        append_emission(emissions_path, batch_id, "run.failed", {"error_code": "BATCH_PARTIAL"})
+    append_emission(emissions_path, batch_id, "run.completed", {"status": status})
+
+    throttled = ""
+    if limiter.rate_limited:
+        throttled = f"; {limiter.rate_limited} rate-limited response(s), concurrency lowered to {limiter.lowest}"
+    print(
+        f"Batch: {ok}/{len(items)} rendered in {elapsed:.1f}s "
+        f"({receipt['renders_per_second'] or 0:.1f}/s at concurrency {concurrency}{throttled})",
+        file=sys.stderr,
+    )
+    print(f"run id: {batch_id}", file=sys.stderr)
     return 0 if status == "ok" else 1
 
 
 def run_run(root: Path, args):
-    if args.input_path and args.stdin:
-        print("Choose either --in <file> or --stdin.", file=sys.stderr)
+    if sum(bool(value) for value in (args.input_path, args.stdin, args.batch)) > 1:
+        print("Choose one of --in <file>, --stdin or --batch.", file=sys.stderr)
         return 2
+    if args.batch:
+        return run_batch(root, args)
     run_id = generate_run_id()
     return run_mermaid_render(root, args, "run", run_id)
 
@@ -2270,14 +3924,16 @@ def run_replay(root: Path, args):
 
 def run_list(root: Path):
     registry, slices = load_registry(root)
-    aliases = parse_aliases(root / "geary" / "slices.yml")
+    aliases = load_aliases(root)
     alias_map = canonical_aliases(aliases)
 
+    slice_names = set(slices)
+
     print("Aliases:")
     for alias in sorted(aliases):
         data = aliases[alias]
         includes = ", ".join(data.get("includes", []))
-        missing = [item for item in data.get("includes", []) if item not in slices]
+        missing = [item for item in data.get("includes", []) if item not in slice_names]
         with_deps = data.get("withDeps", False)
         suffix = " withDeps" if with_deps else ""
         if missing:
@@ -2316,7 +3972,7 @@ def run_list(root: Path):
 
 def run_graph(root: Path):
     _, slices = load_registry(root)
-    aliases = parse_aliases(root / "geary" / "slices.yml")
+    aliases = load_aliases(root)
     alias_map = canonical_aliases(aliases)
 
     for name in sorted(slices):
@@ -2330,7 +3986,7 @@ def run_graph(root: Path):
 
 def run_repo_doctor(root: Path):
     _, slices = load_registry(root)
-    aliases = parse_aliases(root / "geary" / "slices.yml")
+    aliases = load_aliases(root)
     errors = []
     warnings = []
     notes = []
@@ -2365,21 +4021,10 @@ def run_repo_doctor(root: Path):
             notes.append("LWC present: ensure CSP Trusted Sites / CORS endpoints exist for external calls (if used).")
             lwc_note_added = True
 
-    object_scan = scan_objects(root)
-    for missing_meta in object_scan["missing_object_meta"]:
-        errors.append(f"missing object-meta.xml for custom object with fields: {missing_meta}")
-    for field_path, delete_constraint in object_scan["lookup_errors"]:
-        if delete_constraint:
-            errors.append(
-                f"required lookup missing delete behavior ({delete_constraint}) in {field_path}"
-            )
-        else:
-            errors.append(
-                f"required lookup missing delete behavior in {field_path}"
-            )
+    index = MetadataIndex.load(root)
+    errors.extend(schema_lint_errors(index))
 
-    local_classes = scan_apex_classes(root)
-    perm_errors, perm_warnings = validate_permsets(root, local_classes, object_scan["custom_objects"])
+    perm_errors, perm_warnings = validate_permsets(index)
     for permset_path, missing in perm_errors:
         errors.append(
             f"permset {permset_path.name} references missing Apex classes: {', '.join(missing)}"
@@ -2396,24 +4041,11 @@ def run_repo_doctor(root: Path):
 
     manifest_dir = root / "manifest"
     if manifest_dir.exists():
-        for manifest_path in sorted(manifest_dir.glob("slice-*.xml")):
-            members = manifest_members(manifest_path)
-            missing = []
-            package_dirs = resolve_package_dirs(root)
-            for name in members.get("ApexClass", []):
-                cls_path = f"classes/{name}.cls"
-                meta_path = f"classes/{name}.cls-meta.xml"
-                if not local_file_exists(package_dirs, cls_path) or not local_file_exists(package_dirs, meta_path):
-                    missing.append(f"ApexClass:{name}")
-            for name in members.get("ApexTrigger", []):
-                trg_path = f"triggers/{name}.trigger"
-                meta_path = f"triggers/{name}.trigger-meta.xml"
-                if not local_file_exists(package_dirs, trg_path) or not local_file_exists(package_dirs, meta_path):
-                    missing.append(f"ApexTrigger:{name}")
+        results = validate_manifest_members(index, sorted(manifest_dir.glob("slice-*.xml")))
+        for manifest_path, missing in results.items():
             if missing:
-                warnings.append(
-                    f"manifest {manifest_path} references missing Apex members: {', '.join(missing)}"
-                )
+                members = ", ".join(f"{kind}:{name}" for kind, name in missing)
+                warnings.append(f"manifest {manifest_path} references missing Apex members: {members}")
 
     if errors:
         print("ERRORS:")
@@ -2434,39 +4066,55 @@ def run_repo_doctor(root: Path):
 
 def run_install(root: Path, args):
     registry, slices = load_registry(root)
-    aliases = parse_aliases(root / "geary" / "slices.yml")
-    dep_map = {name: entry.get("dependsOn", []) for name, entry in slices.items()}
+    aliases = load_aliases(root)
+    dep_map = dependency_map(slices)
+    runs_dir = get_runs_dir(root, getattr(args, "runs_dir", None))
+    resume = getattr(args, "resume", None)
+    resumed = set()
+    if resume:
+        resumed = resume_install_args(args, runs_dir, resume)
+        if resumed is None:
+            return
     warned_coverage = False
+    jobs = getattr(args, "jobs", 1) or 1
+    force = getattr(args, "force", False)
+    coalesce = getattr(args, "coalesce", False)
+    since = getattr(args, "since", None)
+    delta = {}
+    delta_claimed = set()
+    since_changes = None
+    output_lock = threading.Lock()
+    fingerprints = load_deploy_fingerprints(root, args.target_org)
+    skipped = []
+    retries = max(0, getattr(args, "retries", DEPLOY_RETRIES_DEFAULT))
+    retry_backoff = getattr(args, "retry_backoff", DEPLOY_RETRY_BACKOFF_SECONDS)
+    org_cache = OrgCache(root, args.target_org, getattr(args, "refresh", False))
+    run_id = generate_run_id()
+    run_dir = runs_dir / run_id
+    emissions_path = run_dir / "emissions.ndjson"
+    emission_lock = threading.Lock()
+    state_lock = threading.Lock()
+    apex_index = None
+    planned = []
+    deploy_results = {}
 
     if args.tests and args.test_level != "RunSpecifiedTests":
         raise ValueError("--tests requires --test-level RunSpecifiedTests")
     if args.test_level == "RunSpecifiedTests" and not args.tests:
         raise ValueError("--test-level RunSpecifiedTests requires --tests")
 
+    index = MetadataIndex.load(root)
+
     def schema_lint_or_exit():
-        scan = scan_objects(root)
-        lint_errors = []
-        for missing_meta in scan["missing_object_meta"]:
-            lint_errors.append(f"missing object-meta.xml for custom object with fields: {missing_meta}")
-        for field_path, delete_constraint in scan["lookup_errors"]:
-            if delete_constraint:
-                lint_errors.append(
-                    f"required lookup missing delete behavior ({delete_constraint}) in {field_path}"
-                )
-            else:
-                lint_errors.append(
-                    f"required lookup missing delete behavior in {field_path}"
-                )
+        lint_errors = schema_lint_errors(index)
         if lint_errors:
             print("SCHEMA LINT FAILED:")
             for item in lint_errors:
                 print(f"- {item}")
             sys.exit(1)
-        return scan
 
-    def permset_check_or_exit(local_objects):
-        local_classes = scan_apex_classes(root)
-        perm_errors, perm_warnings = validate_permsets(root, local_classes, local_objects)
+    def permset_check_or_exit():
+        perm_errors, perm_warnings = validate_permsets(index)
         if perm_warnings:
             print("PERMSET WARNINGS:")
             for permset_path, missing in perm_warnings:
@@ -2478,139 +4126,764 @@ def run_install(root: Path, args):
             print("Guidance: deploy apex-comms-core first or check manifest/slice contents.")
             sys.exit(1)
 
-    def reorder_for_perm_deps(order):
-        perms = [name for name in order if slices.get(name, {}).get("kind") == "permissionsets"]
-        if not perms:
-            return order
-        return [name for name in order if name not in perms] + perms
-
-    def deploy_order(order, effective_level, effective_tests):
+    def is_last(name):
+        return is_permset_slice(slices, name)
+
+    def slice_manifest(name):
+        """The manifest to deploy for a slice: its --since delta if there is one, else the registry's."""
+        if name in delta:
+            return delta[name][0]
+        return (root / slices[name]["manifest"]).resolve()
+
+    def slice_counts(name):
+        if name in delta:
+            return delta[name][1]
+        return slices.get(name, {}).get("counts", {})
+
+    def checked_entry(name):
+        entry = slices.get(name)
+        if not entry:
+            raise ValueError(f"Missing slice {name}")
+        if sum(slice_counts(name).values()) == 0 and not args.allow_empty:
+            raise ValueError(f"Refusing to install empty slice {name}. Use --allow-empty to override.")
+        return entry
+
+    def deploy_command(name, effective_level, effective_tests):
+        checked_entry(name)
+        return manifest_command(slice_manifest(name), slice_counts(name), effective_level, effective_tests)
+
+    def manifest_command(manifest_path, counts, effective_level, effective_tests):
         nonlocal warned_coverage
-        for name in order:
-            entry = slices.get(name)
-            if not entry:
-                raise ValueError(f"Missing slice {name}")
-            counts = entry.get("counts", {})
-            if sum(counts.values()) == 0 and not args.allow_empty:
-                raise ValueError(f"Refusing to install empty slice {name}. Use --allow-empty to override.")
-            manifest_path = (root / entry["manifest"]).resolve()
-            if counts.get("apexClasses") or counts.get("apexTriggers"):
-                validate_manifest_apex_members(root, manifest_path)
-            cmd = [
-                "sf",
-                "project",
-                "deploy",
-                "start",
-                "--target-org",
-                args.target_org,
-                "--manifest",
-                str(manifest_path),
-            ]
-            use_test_level = None
-            use_tests = None
-            if effective_level and (
-                counts.get("apexClasses") or counts.get("apexTriggers") or counts.get("apexTestSuites")
-            ):
-                use_test_level = effective_level
-                if effective_tests and use_test_level == "RunSpecifiedTests":
-                    use_tests = effective_tests
-            if use_test_level:
-                cmd.extend(["--test-level", use_test_level])
-            if use_tests:
-                cmd.extend(["--tests", use_tests])
-            if use_test_level == "RunLocalTests" and not warned_coverage:
-                print("WARNING: Salesforce requires org-wide coverage >= 75% when tests run. "
-                      "If you see 'Average test coverage ... 74%' then you must add tests or "
-                      "raise coverage before deploy will succeed.")
-                print(
-                    f"Suggested: sf apex test run --target-org {args.target_org} "
-                    "--test-level RunLocalTests --code-coverage --result-format human --wait 60"
-                )
-                warned_coverage = True
-            print("Running: " + " ".join(cmd))
-            try:
-                result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-                if result.stdout:
-                    print(result.stdout.rstrip())
-                if result.stderr:
-                    print(result.stderr.rstrip(), file=sys.stderr)
-            except subprocess.CalledProcessError as e:
-                if e.stdout:
-                    print(e.stdout.rstrip())
-                if e.stderr:
-                    print(e.stderr.rstrip(), file=sys.stderr)
+        cmd = [
+            "sf",
+            "project",
+            "deploy",
+            "start",
+            "--target-org",
+            args.target_org,
+            "--manifest",
+            str(manifest_path),
+        ]
+        use_test_level, use_tests = slice_test_level(counts, effective_level, effective_tests)
+        if use_test_level == "auto":
+            use_test_level, use_tests = auto_test_level(manifest_path)
+        if use_test_level:
+            cmd.extend(["--test-level", use_test_level])
+        if use_tests:
+            cmd.extend(["--tests", use_tests])
+        if use_test_level == "RunLocalTests" and not warned_coverage:
+            print("WARNING: Salesforce requires org-wide coverage >= 75% when tests run. "
+                  "If you see 'Average test coverage ... 74%' then you must add tests or "
+                  "raise coverage before deploy will succeed.")
+            print(
+                f"Suggested: sf apex test run --target-org {args.target_org} "
+                "--test-level RunLocalTests --code-coverage --result-format human --wait 60"
+            )
+            warned_coverage = True
+        return cmd
+
+    def emit(event_type, data):
+        with emission_lock:
+            append_emission(emissions_path, run_id, event_type, data)
+
+    def save_install_state(status="running"):
+        """Checkpoint finished slices so `--resume <run_id>` continues from the first unfinished one."""
+        with state_lock:
+            state = install_state(run_id, args, resume, resumed, dict(deploy_results), status)
+            write_json_atomic(run_dir / INSTALL_STATE_NAME, state)
+
+    def auto_test_level(manifest_path):
+        """RunSpecifiedTests with the smallest covering test set, or RunLocalTests if anything is uncovered."""
+        nonlocal apex_index
+        if apex_index is None:
+            apex_index = ApexReferenceIndex.load(root)
+        level, tests, uncovered = select_auto_tests(apex_index, manifest_members(manifest_path))
+        label = manifest_path.name
+        if uncovered:
+            print(f"Auto tests for {label}: no test reaches {', '.join(uncovered)}; using RunLocalTests.")
+        elif not tests:
+            print(f"Auto tests for {label}: nothing to cover; using RunLocalTests.")
+        else:
+            print(f"Auto tests for {label}: RunSpecifiedTests with {len(tests)} test class(es): {', '.join(tests)}")
+        return level, ",".join(tests) if tests else None
+
+    def run_deploy(name, cmd, counts=None, slice_names=None):
+        """Deploy one slice, streaming its output; returns None or the CalledProcessError.
+
+        One deploy at a time echoes sf output live. Parallel deploys print only `[slice]` progress
+        lines so they stay readable, and show the output tail if the deploy fails. A coalesced
+        deploy passes its merged `counts` and the `slice_names` it covers.
+        """
+        parallel = jobs > 1 and not coalesce
+        if counts is None:
+            counts = slice_counts(name)
+        event_data = deploy_event_data(name, cmd, counts, slice_names)
+        with output_lock:
+            print("Running: " + " ".join(cmd), flush=True)
+        emit("slice.deploy.started", event_data)
+
+        def echo(line):
+            with output_lock:
+                print(line, flush=True)
+
+        def progress(event):
+            with output_lock:
+                print(f"[{name}] {format_deploy_event(event)}", flush=True)
+
+        def retry(attempt, reason, delay):
+            with output_lock:
+                print(f"[{name}] transient sf error ({reason}); retry {attempt}/{retries} in {delay:g}s", flush=True)
+            emit("slice.deploy.retry", {"slice": name, "attempt": attempt, "reason": reason, "delay_ms": int(delay * 1000)})
+
+        returncode, parser, attempt, transient, duration_ms = stream_deploy_with_retries(
+            cmd,
+            retries,
+            retry_backoff,
+            on_retry=retry,
+            on_line=None if parallel else echo,
+            on_event=progress if parallel else None,
+        )
+        status = "ok" if returncode == 0 else "fail"
+        emit(
+            "slice.deploy.finished",
+            {**event_data, "status": status, "exit_code": returncode, "duration_ms": duration_ms, "attempts": attempt},
+        )
+        for slice_name in slice_names or [name]:
+            deploy_results[slice_name] = deploy_result(returncode, duration_ms, attempt)
+        save_install_state()
+        if returncode != 0:
+            tail = parser.tail_text()
+            e = subprocess.CalledProcessError(returncode, cmd, output=tail)
+            with output_lock:
+                if parallel and tail:
+                    if parser.lines > len(parser.tail):
+                        print(f"[{name}] ... last {len(parser.tail)} of {parser.lines} output lines:")
+                    print(tail)
                 print(f"\nDeploy FAILED for slice '{name}': exit code {e.returncode}")
+                if transient:
+                    print(f"Still failing after {attempt} attempts with a transient sf error ({transient}).")
                 print(f"Command: {' '.join(cmd)}")
-                combined = (e.stdout or "") + "\n" + (e.stderr or "")
-                if "test coverage" in combined.lower() or "coverage" in combined.lower():
+                if "coverage" in parser.state or "coverage" in tail.lower():
                     print(
                         "Coverage gate failed. Hint: run "
                         "`sf apex test run --target-org deafingov --tests CoverageBumpTests "
                         "--code-coverage --result-format human --wait 60` and ensure "
                         "org-wide coverage >= 75%."
                     )
-                if getattr(args, 'debug', False):
-                    raise
-                sys.exit(e.returncode)
+            return e
+        if parallel:
+            with output_lock:
+                print(f"[{name}] deployed", flush=True)
+        return None
 
-    def install_by_name(name, override_level=None, override_tests=None):
-        targets, _, alias_with_deps = resolve_targets(name, aliases, slices)
-        with_deps = args.with_deps or alias_with_deps
-        if with_deps:
-            nodes = expand_with_deps(targets, dep_map, slices)
-            order = topo_sort(nodes, dep_map)
+    def skip_completed(name):
+        if name not in resumed:
+            return False
+        with output_lock:
+            print(f"Skipping {name}: completed in run {resume}.")
+        deploy_results[name] = {"status": "skipped"}
+        emit("slice.deploy.skipped", {"slice": name, "reason": "resumed", "run_id": resume})
+        return True
+
+    def skip_unchanged(name, fingerprint):
+        previous = fingerprints.get(name) or {}
+        if not fingerprint or force or previous.get("fingerprint") != fingerprint:
+            return False
+        with output_lock:
+            print(
+                f"Skipping {name}: unchanged since its last deploy to {args.target_org} "
+                f"({previous.get('deployedAt', 'unknown time')}). Use --force to redeploy."
+            )
+            skipped.append(name)
+        deploy_results[name] = {"status": "skipped"}
+        emit("slice.deploy.skipped", {"slice": name, "reason": "unchanged", "deployed_at": previous.get("deployedAt")})
+        save_install_state()
+        return True
+
+    def record_deployed(deployed, duration=None):
+        """Store fingerprints for slices that just deployed; `duration` only for single-slice deploys."""
+        with output_lock:
+            deployed_at = isoformat_utc(utc_now())
+            for name, fingerprint in deployed.items():
+                if not fingerprint:
+                    continue
+                record = {"fingerprint": fingerprint, "deployedAt": deployed_at}
+                previous_duration = (fingerprints.get(name) or {}).get("durationSeconds")
+                if duration is not None:
+                    record["durationSeconds"] = round(duration, 1)
+                elif previous_duration is not None:
+                    record["durationSeconds"] = previous_duration
+                fingerprints[name] = record
+            save_deploy_fingerprints(root, args.target_org, fingerprints)
+
+    def deploy_slice(name, cmd):
+        """Deploy unless the slice matches its last successful deploy to this org; record successes."""
+        if skip_completed(name):
+            return None
+        # A --since delta covers only part of the slice, so it neither matches nor replaces the
+        # fingerprint of a full deploy.
+        fingerprint = None if name in delta else slice_fingerprint(root, slice_manifest(name))
+        if skip_unchanged(name, fingerprint):
+            return None
+        started = time.monotonic()
+        error = run_deploy(name, cmd)
+        if error is None and fingerprint:
+            record_deployed({name: fingerprint}, time.monotonic() - started)
+        return error
+
+    def deploy_coalesced(order, effective_level, effective_tests):
+        """Deploy the order as one merged package.xml, split only at the permission set boundary."""
+        deployed_count = 0
+        calls = 0
+        elapsed = 0.0
+        per_slice_estimate = 0.0
+        untimed = []
+        for batch_index, batch in enumerate(coalesce_batches(order, is_last), start=1):
+            pending = {}
+            for name in batch:
+                if skip_completed(name):
+                    continue
+                checked_entry(name)
+                fingerprint = None if name in delta else slice_fingerprint(root, slice_manifest(name))
+                if not skip_unchanged(name, fingerprint):
+                    pending[name] = fingerprint
+            if not pending:
+                continue
+            manifest_paths = [slice_manifest(name) for name in pending]
+            members_by_type = merge_manifest_members(manifest_paths)
+            counts = {}
+            for name in pending:
+                for key, value in slice_counts(name).items():
+                    counts[key] = counts.get(key, 0) + value
+            package_path = root / COALESCED_MANIFEST_DIR / f"package-{batch_index}.xml"
+            write_package_manifest(package_path, registry.get("apiVersion", ""), members_by_type)
+            total = sum(len(members) for members in members_by_type.values())
+            print(f"Coalesced {len(pending)} slice(s) into {package_path.relative_to(root).as_posix()} ({total} members):")
+            for type_name, members in members_by_type.items():
+                print(f"  {type_name}: {len(members)}")
+            cmd = manifest_command(package_path, counts, effective_level, effective_tests)
+            started = time.monotonic()
+            error = run_deploy(f"coalesced:{package_path.stem}", cmd, counts, pending)
+            if error is not None:
+                print(f"Slices in this deploy: {', '.join(pending)}")
+                fail(error)
+            elapsed += time.monotonic() - started
+            calls += 1
+            deployed_count += len(pending)
+            record_deployed(pending)
+            for name in pending:
+                duration = (fingerprints.get(name) or {}).get("durationSeconds")
+                if duration is None:
+                    untimed.append(name)
+                else:
+                    per_slice_estimate += duration
+        if not calls:
+            return
+        print(f"Coalesced deploy: {calls} call(s) for {deployed_count} slice(s) in {elapsed:.1f}s.")
+        if untimed:
+            print(f"No per-slice deploy time recorded for {', '.join(untimed)}; time saved not estimated.")
+        elif per_slice_estimate >= elapsed:
+            print(f"Per-slice deploys last took {per_slice_estimate:.1f}s; saved ~{per_slice_estimate - elapsed:.1f}s.")
         else:
-            order = sorted(set(targets))
-        order = reorder_for_perm_deps(order)
+            print(f"Per-slice deploys last took {per_slice_estimate:.1f}s; no time saved.")
+
+    def fail(error):
+        if getattr(args, 'debug', False):
+            raise error
+        sys.exit(error.returncode)
+
+    def report_org_cache():
+        for event in org_cache.hits():
+            print(
+                f"Org info for {args.target_org} from cache ({event['age_seconds']:.0f}s old). "
+                "Use --refresh to re-query."
+            )
+        for event in org_cache.events:
+            event_type = "org_cache.hit" if event["hit"] else "org_cache.miss"
+            payload = {key: value for key, value in event.items() if key != "hit"}
+            emit(event_type, {"target_org": args.target_org, **payload})
+        org_cache.events.clear()
+
+    def report_skipped(order):
+        unchanged = [name for name in order if name in skipped]
+        if unchanged:
+            print(f"Skipped {len(unchanged)} unchanged slice(s) of {len(order)}: {', '.join(unchanged)}")
+
+    def narrow_to_changes(order):
+        """--since: keep the slices holding changed members, each with a package.xml of just those.
+
+        A member listed by several slices in the order goes with the first one, so it deploys once.
+        """
+        nonlocal since_changes
+        if since_changes is None:
+            since_changes, deleted, unmapped = changed_members(root, git_changed_files(root, since))
+            total = sum(len(names) for names in since_changes.values())
+            print(f"Changes since {since}: {total} deployable member(s).")
+            if deleted:
+                print(f"Ignoring {len(deleted)} deleted source(s); destructive changes are not deployed: {', '.join(deleted)}")
+            if unmapped:
+                print(f"Ignoring {len(unmapped)} changed file(s) of types geary does not slice: {', '.join(unmapped)}")
+        narrowed = []
+        for name in order:
+            full = manifest_members((root / slices[name]["manifest"]).resolve())
+            picked = {}
+            for member_type, names in full.items():
+                hits = [
+                    member
+                    for member in names
+                    if member in since_changes.get(member_type, ()) and (member_type, member) not in delta_claimed
+                ]
+                if hits:
+                    picked[member_type] = sorted(hits)
+                    delta_claimed.update((member_type, member) for member in hits)
+            if not picked:
+                continue
+            path = root / DELTA_MANIFEST_DIR / f"slice-{name}.xml"
+            write_package_manifest(path, registry.get("apiVersion", ""), picked)
+            delta[name] = (path, member_counts(picked))
+            picked_total = sum(len(members) for members in picked.values())
+            full_total = sum(len(members) for members in full.values())
+            print(f"  {name}: {picked_total} of {full_total} member(s) -> {path.relative_to(root).as_posix()}")
+            narrowed.append(name)
+        if len(narrowed) < len(order):
+            print(f"Nothing changed since {since} in {len(order) - len(narrowed)} of {len(order)} slice(s).")
+        return narrowed
+
+    def deploy_order(order, effective_level, effective_tests):
+        if since:
+            order = narrow_to_changes(order)
+            if not order:
+                return
+        # Check every Apex-bearing manifest up front so a missing member stops the run before
+        # the first deploy rather than halfway through the order.
+        apex_manifests = []
+        for name in order:
+            counts = slice_counts(name)
+            if counts.get("apexClasses") or counts.get("apexTriggers"):
+                apex_manifests.append(slice_manifest(name))
+        validate_manifest_apex_members(index, apex_manifests)
+        planned.extend(name for name in order if name not in planned)
+        if coalesce:
+            deploy_coalesced(order, effective_level, effective_tests)
+            report_skipped(order)
+            return
+        if jobs <= 1:
+            for name in order:
+                error = deploy_slice(name, deploy_command(name, effective_level, effective_tests))
+                if error is not None:
+                    fail(error)
+            report_skipped(order)
+            return
+        commands = {name: deploy_command(name, effective_level, effective_tests) for name in order}
+        succeeded, failures, not_started = run_dag_schedule(
+            order,
+            dep_map,
+            jobs,
+            lambda name: deploy_slice(name, commands[name]),
+            is_last=is_last,
+        )
+        if not failures:
+            report_skipped(order)
+            return
+        print(f"\nInstall stopped: {len(failures)} failed, {len(succeeded)} deployed, {len(not_started)} not started.")
+        if not_started:
+            print(f"Not started: {', '.join(not_started)}")
+        error = failures[0][1]
+        if not isinstance(error, subprocess.CalledProcessError):
+            raise error
+        fail(error)
+
+    def install_by_name(name, override_level=None, override_tests=None):
+        order = resolve_install_order(name, aliases, slices, dep_map, with_deps=args.with_deps)
         effective_level = override_level
         effective_tests = override_tests
         deploy_order(order, effective_level, effective_tests)
 
-    # Special-case deterministic installer:
-    # `comms-web` enforces a safe deploy sequence with schema/permset linting and prod test-level policy.
-    # `comms-web-full` is a normal alias expansion (no special behavior).
-    if args.name in {"comms-web", "comms-web-full"}:
-        schema_scan = schema_lint_or_exit()
-        steps = [
-            ("objects-case", None, None),
-            ("objects-comms", None, None),
-            ("apex-comms-core", None, None),
-            ("comms-perms", None, None),
-            ("lwc-web", None, None),
-        ]
-        apex_level, apex_tests = apply_test_level_policy(args.target_org, args.test_level, args.tests)
-        steps[2] = ("apex-comms-core", apex_level, apex_tests)
-        for idx, (step_name, level, tests) in enumerate(steps, start=1):
-            print(f"==> Step {idx}/{len(steps)}: {step_name}")
-            if step_name == "comms-perms":
-                permset_check_or_exit(schema_scan["custom_objects"])
-            install_by_name(step_name, level, tests)
-        return
+    def report_unclaimed_changes():
+        unclaimed = sorted(
+            f"{member_type}:{member}"
+            for member_type, members in (since_changes or {}).items()
+            for member in members
+            if (member_type, member) not in delta_claimed
+        )
+        if unclaimed:
+            shown = ", ".join(unclaimed[:10]) + (", ..." if len(unclaimed) > 10 else "")
+            hint = " Run `geary update` if they are new." if args.all else ""
+            print(f"{len(unclaimed)} changed member(s) are in none of the installed slices: {shown}.{hint}")
+
+    def finish_run(started_at, exit_code):
+        if since and exit_code == 0:
+            report_unclaimed_changes()
+        receipt_path = run_dir / "receipt.json"
+        receipt = install_receipt(run_id, options, started_at, utc_now(), exit_code, planned, deploy_results)
+        write_receipt(receipt_path, receipt)
+        save_install_state(receipt["status"])
+        for event_type, data in install_finished_emissions(receipt_path, receipt):
+            emit(event_type, data)
+        print(f"run id: {run_id}", file=sys.stderr)
+        if exit_code != 0 and planned:
+            print(f"Resume with: geary install --resume {run_id} --target-org {args.target_org}", file=sys.stderr)
+
+    def install_targets():
+        # Special-case deterministic installer:
+        # `comms-web` enforces a safe deploy sequence with schema/permset linting and prod test-level policy.
+        # `comms-web-full` is a normal alias expansion (no special behavior).
+        if args.name in {"comms-web", "comms-web-full"}:
+            schema_lint_or_exit()
+            apex_level, apex_tests = apply_test_level_policy(args.target_org, args.test_level, args.tests, org_cache)
+            report_org_cache()
+            for idx, step_name in enumerate(COMMS_WEB_STEPS, start=1):
+                print(f"==> Step {idx}/{len(COMMS_WEB_STEPS)}: {step_name}")
+                if step_name == "comms-perms":
+                    permset_check_or_exit()
+                if step_name == COMMS_WEB_TEST_STEP:
+                    install_by_name(step_name, apex_level, apex_tests)
+                else:
+                    install_by_name(step_name)
+            return
 
-    if args.all:
-        targets = sorted(slices.keys())
-        with_deps = args.with_deps
-    else:
-        if not args.name:
+        if not args.all and not args.name:
             raise ValueError("Provide a slice/alias name or use --all")
-        targets, alias_name, alias_with_deps = resolve_targets(args.name, aliases, slices)
-        with_deps = args.with_deps or alias_with_deps
+        order = resolve_install_order(args.name, aliases, slices, dep_map, with_deps=args.with_deps, all_slices=args.all)
+        if any(slices.get(name, {}).get("kind") == "objects" for name in order):
+            schema_lint_or_exit()
+        if any(slices.get(name, {}).get("kind") == "permissionsets" for name in order):
+            permset_check_or_exit()
+        effective_level, effective_tests = apply_test_level_policy(args.target_org, args.test_level, args.tests, org_cache)
+        report_org_cache()
+        deploy_order(order, effective_level, effective_tests)
 
-    if with_deps:
-        nodes = expand_with_deps(targets, dep_map, slices)
-        order = topo_sort(nodes, dep_map)
+    started_at = utc_now()
+    options = install_run_options(args, jobs, coalesce, force, resume)
+    emit("run.started", options)
+    save_install_state()
+    exit_code = 1
+    try:
+        install_targets()
+        exit_code = 0
+    except SystemExit as exc:
+        exit_code = exc.code if isinstance(exc.code, int) else 1
+        raise
+    except subprocess.CalledProcessError as exc:
+        exit_code = exc.returncode
+        raise
+    finally:
+        finish_run(started_at, exit_code)
+
+
+def load_install_state(runs_dir: Path, run_id: str):
+    """The checkpoint an install run keeps in runs/<run_id>/install-state.json."""
+    path = runs_dir / run_id / INSTALL_STATE_NAME
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        raise ValueError(f"No install state for run {run_id} under {runs_dir}") from None
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"Unreadable install state {path}: {exc}") from None
+
+
+def resume_install_args(args, runs_dir: Path, resume: str):
+    """Restore the options of install run `resume` onto `args`; returns the slices it completed.
+
+    Returns None, after saying so, when that run already finished ok.
+    """
+    state = load_install_state(runs_dir, resume)
+    invocation = state.get("invocation", {})
+    if state.get("target_org") != args.target_org:
+        raise ValueError(f"Run {resume} installed to {state.get('target_org')}, not {args.target_org}")
+    if args.name and args.name != invocation.get("name"):
+        raise ValueError(f"Run {resume} installed {invocation.get('name') or '--all'}, not {args.name}")
+    if state.get("status") == "ok":
+        print(f"Run {resume} already completed; nothing to resume.")
+        return None
+    for key in INSTALL_RESUME_OPTIONS:
+        setattr(args, key, invocation.get(key))
+    completed = set(state.get("completed", []))
+    print(f"Resuming run {resume}: {len(completed)} slice(s) already done.")
+    return completed
+
+
+def install_state(run_id: str, args, resume, resumed: set, deploy_results: dict, status: str = "running") -> dict:
+    """The install-state.json checkpoint: the invocation to resume and which slices are done."""
+    done = {name for name, result in deploy_results.items() if result["status"] in ("deployed", "skipped")}
+    return {
+        "run_id": run_id,
+        "target_org": args.target_org,
+        "invocation": {key: getattr(args, key, None) for key in INSTALL_RESUME_OPTIONS},
+        "resumed_from": resume,
+        "status": status,
+        "completed": sorted(resumed | done),
+        "failed": sorted(name for name, result in deploy_results.items() if result["status"] == "failed"),
+    }
+
+
+def percentile(values, pct: float):
+    """Nearest-rank percentile of `values`; None when empty."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def iter_run_emissions(runs_dir: Path):
+    """Yield (run_id, events) for every run under `runs_dir`, skipping unreadable lines."""
+    for emissions_path in sorted(runs_dir.glob("*/emissions.ndjson")):
+        try:
+            lines = emissions_path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            continue
+        events = []
+        for line in lines:
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+        yield emissions_path.parent.name, events
+
+
+def install_deploy_durations(runs_dir: Path, target_org: str | None = None):
+    """Per-slice `slice.deploy.finished` data from past install runs; coalesced deploys are left out."""
+    runs = 0
+    by_slice = {}
+    for _run_id, events in iter_run_emissions(runs_dir):
+        started = next((event for event in events if event.get("type") == "run.started"), None)
+        started_data = (started or {}).get("data", {})
+        if started_data.get("command") != "install":
+            continue
+        if target_org and started_data.get("target_org") != target_org:
+            continue
+        runs += 1
+        for event in events:
+            data = event.get("data", {})
+            if event.get("type") != "slice.deploy.finished" or data.get("slices"):
+                continue
+            by_slice.setdefault(data.get("slice"), []).append(data)
+    return runs, by_slice
+
+
+def run_stats_install(root: Path, args):
+    runs_dir = get_runs_dir(root, args.runs_dir)
+    runs, by_slice = install_deploy_durations(runs_dir, args.target_org)
+    if not by_slice:
+        print(f"No install deploy timings under {runs_dir}.")
+        return 0
+    rows = []
+    for name, records in by_slice.items():
+        durations = [record.get("duration_ms", 0) for record in records]
+        failures = sum(1 for record in records if record.get("exit_code"))
+        rows.append((sum(durations), name, len(durations), percentile(durations, 50), percentile(durations, 95), failures))
+    rows.sort(key=lambda row: (-row[0], row[1]))
+    grand_total = sum(row[0] for row in rows) or 1
+    width = max(len("slice"), *(len(row[1]) for row in rows))
+    print(f"{runs} install run(s) under {runs_dir}")
+    print(f"{'slice':<{width}}  {'deploys':>7}  {'p50':>8}  {'p95':>8}  {'total':>9}  {'share':>6}  {'failed':>6}")
+    for total, name, count, p50, p95, failures in rows:
+        print(
+            f"{name:<{width}}  {count:>7}  {p50 / 1000:>7.1f}s  {p95 / 1000:>7.1f}s  "
+            f"{total / 1000:>8.1f}s  {total / grand_total:>6.1%}  {failures:>6}"
+        )
+    return 0
+
+
+def worker_latency_phases(runs_dir: Path, command: str | None = None):
+    """Phase timings from `response.received` emissions of past worker calls, one dict per response."""
+    samples = []
+    for _run_id, events in iter_run_emissions(runs_dir):
+        started = next((event for event in events if event.get("type") == "run.started"), None)
+        if command and (started or {}).get("data", {}).get("command") != command:
+            continue
+        for event in events:
+            phases = event.get("data", {}).get("phases")
+            if event.get("type") == "response.received" and phases:
+                samples.append(phases)
+    return samples
+
+
+def run_stats_latency(root: Path, args):
+    runs_dir = get_runs_dir(root, args.runs_dir)
+    samples = worker_latency_phases(runs_dir, args.source_command)
+    if not samples:
+        print(f"No worker latency phases under {runs_dir}.")
+        return 0
+    means = {}
+    rows = []
+    for name in LATENCY_PHASES:
+        values = [sample[name] for sample in samples if isinstance(sample.get(name), (int, float))]
+        if not values:
+            continue
+        means[name] = sum(values) / len(values)
+        rows.append((name[:-3], len(values), percentile(values, 50), percentile(values, 95), max(values), means[name]))
+    total = sum(means.values()) or 1
+    print(f"{len(samples)} worker response(s) under {runs_dir}")
+    print(f"{'phase':<8}  {'samples':>7}  {'p50':>9}  {'p95':>9}  {'max':>9}  {'share':>6}")
+    for phase, count, p50, p95, highest, mean in rows:
+        print(f"{phase:<8}  {count:>7}  {p50:>7.1f}ms  {p95:>7.1f}ms  {highest:>7.1f}ms  {mean / total:>6.1%}")
+    network = sum(means.get(name, 0) for name in LATENCY_NETWORK_PHASES)
+    print(
+        f"Network (dns, connect, tls, send, transfer): {network / total:.1%} of mean request time; "
+        f"worker (ttfb): {means.get('ttfb_ms', 0) / total:.1%}; decode: {means.get('decode_ms', 0) / total:.1%}"
+    )
+    return 0
+
+
+def plan_levels(order, deps):
+    """Group `order` into DAG levels: every slice in a level only depends on earlier levels."""
+    level_of = {}
+
+    def level(name):
+        if name not in level_of:
+            level_of[name] = 1 + max((level(dep) for dep in deps[name]), default=-1)
+        return level_of[name]
+
+    levels = []
+    for name in order:
+        idx = level(name)
+        while len(levels) <= idx:
+            levels.append([])
+        levels[idx].append(name)
+    return levels
+
+
+def critical_path(order, deps, durations):
+    """The dependency chain with the largest summed duration, as (names, total)."""
+    best = {}
+
+    def finish(name):
+        if name not in best:
+            prev = max(deps[name], key=lambda dep: (finish(dep)[1], dep), default=None)
+            before, elapsed = finish(prev) if prev else ([], 0)
+            best[name] = (before + [name], elapsed + durations.get(name, 0))
+        return best[name]
+
+    paths = [finish(name) for name in order]
+    return max(paths, key=lambda path: path[1], default=([], 0))
+
+
+def estimate_makespan(order, deps, jobs: int, durations):
+    """Wall time of `run_dag_schedule` over `order` if every slice took its `durations` entry."""
+    pending = list(order)
+    running = []
+    done = set()
+    clock = 0
+    while pending or running:
+        for name in list(pending):
+            if len(running) >= max(1, jobs):
+                break
+            if deps[name] <= done:
+                pending.remove(name)
+                heapq.heappush(running, (clock + durations.get(name, 0), name))
+        if not running:
+            break
+        clock, name = heapq.heappop(running)
+        done.add(name)
+    return clock
+
+
+def run_plan(root: Path, args):
+    _, slices = load_registry(root)
+    aliases = load_aliases(root)
+    dep_map = dependency_map(slices)
+    if args.tests and args.test_level != "RunSpecifiedTests":
+        raise ValueError("--tests requires --test-level RunSpecifiedTests")
+    if args.test_level == "RunSpecifiedTests" and not args.tests:
+        raise ValueError("--test-level RunSpecifiedTests requires --tests")
+    if not args.all and not args.name:
+        raise ValueError("Provide a slice/alias name or use --all")
+
+    # Mirror run_install: comms-web is a fixed sequence of steps, each resolved on its own.
+    steps = []
+    if not args.all and args.name in {"comms-web", "comms-web-full"}:
+        for step_name in COMMS_WEB_STEPS:
+            step = resolve_install_order(step_name, aliases, slices, dep_map, with_deps=args.with_deps)
+            steps.append([name for name in step if not any(name in earlier for earlier in steps)])
     else:
-        order = sorted(set(targets))
-    order = reorder_for_perm_deps(order)
-    schema_scan = None
-    if any(slices.get(name, {}).get("kind") == "objects" for name in order):
-        schema_scan = schema_lint_or_exit()
-    if any(slices.get(name, {}).get("kind") == "permissionsets" for name in order):
-        if schema_scan is None:
-            schema_scan = scan_objects(root)
-        permset_check_or_exit(schema_scan["custom_objects"])
-    effective_level, effective_tests = apply_test_level_policy(args.target_org, args.test_level, args.tests)
-    deploy_order(order, effective_level, effective_tests)
+        steps.append(resolve_install_order(args.name, aliases, slices, dep_map, with_deps=args.with_deps, all_slices=args.all))
+    order = [name for step in steps for name in step]
+    # Steps run one after another, so each slice also waits for every earlier step.
+    deps = {}
+    for idx, step in enumerate(steps):
+        earlier = set(order[: sum(len(previous) for previous in steps[:idx])])
+        for name, step_deps in schedule_dependencies(step, dep_map, lambda name: is_permset_slice(slices, name)).items():
+            deps[name] = step_deps | earlier
+
+    level, tests = args.test_level, args.tests
+    if args.target_org:
+        cache = OrgCache(root, args.target_org, args.refresh)
+        level, tests = apply_test_level_policy(args.target_org, level, tests, cache)
+        for event in cache.hits():
+            print(
+                f"Org info for {args.target_org} from cache ({event['age_seconds']:.0f}s old). "
+                "Use --refresh to re-query."
+            )
+    apex_index = None
+
+    def test_column(name):
+        nonlocal apex_index
+        counts = slices[name].get("counts", {})
+        step_level, step_tests = level, tests
+        if len(steps) > 1 and name not in steps[COMMS_WEB_STEPS.index(COMMS_WEB_TEST_STEP)]:
+            step_level, step_tests = None, None
+        use_level, use_tests = slice_test_level(counts, step_level, step_tests)
+        if use_level == "auto":
+            if apex_index is None:
+                apex_index = ApexReferenceIndex.load(root)
+            members = manifest_members((root / slices[name]["manifest"]).resolve())
+            use_level, selected, uncovered = select_auto_tests(apex_index, members)
+            if uncovered:
+                return f"{use_level} (auto: {len(uncovered)} uncovered)"
+            if not selected:
+                return f"{use_level} (auto: nothing to cover)"
+            return f"{use_level} ({len(selected)} tests)"
+        if use_tests:
+            return f"{use_level} ({len(use_tests.split(','))} tests)"
+        if use_level:
+            return use_level
+        return "org default" if deploys_apex(counts) else "-"
+
+    runs_dir = get_runs_dir(root, args.runs_dir)
+    _, by_slice = install_deploy_durations(runs_dir, args.target_org)
+    durations = {}
+    history = {}
+    for name in order:
+        records = [record.get("duration_ms", 0) for record in by_slice.get(name, []) if not record.get("exit_code")]
+        if records:
+            durations[name] = percentile(records, 50)
+            history[name] = len(records)
+    path, path_ms = critical_path(order, deps, durations)
+    on_path = set(path) if path_ms else set()
+
+    target = "--all" if args.all else args.name
+    org_note = f" on {args.target_org}" if args.target_org else ""
+    print(f"Plan for {target}{org_note}: {len(order)} slice(s) in {len(plan_levels(order, deps))} level(s); nothing is deployed.")
+    width = max(len("slice"), *(len(name) for name in order)) if order else len("slice")
+    tests_width = max(len("tests"), *(len(test_column(name)) for name in order)) if order else len("tests")
+    print(f"{'level':>5}    {'slice':<{width}}  {'members':>7}  {'p50':>8}  {'runs':>4}  {'tests':<{tests_width}}  counts")
+    for idx, names in enumerate(plan_levels(order, deps), start=1):
+        for name in names:
+            counts = slices[name].get("counts", {})
+            members = sum(counts.get(key, 0) for key in set(MEMBER_COUNT_KEYS.values()))
+            breakdown = ", ".join(f"{key} {value}" for key, value in sorted(counts.items()) if value)
+            p50 = f"{durations[name] / 1000:>7.1f}s" if name in durations else f"{'-':>8}"
+            mark = "*" if name in on_path else " "
+            print(
+                f"{idx:>5}  {mark} {name:<{width}}  {members:>7}  {p50}  {history.get(name, 0):>4}  "
+                f"{test_column(name):<{tests_width}}  {breakdown}"
+            )
+    if path_ms:
+        print(f"* Critical path: {' -> '.join(path)} (est. {path_ms / 1000:.1f}s)")
+    else:
+        print("Critical path: unknown until these slices have deploy history")
+    sequential_ms = sum(durations.values())
+    estimate = f"Estimated wall time: {sequential_ms / 1000:.1f}s sequential"
+    if args.jobs > 1:
+        estimate += f", {estimate_makespan(order, deps, args.jobs, durations) / 1000:.1f}s with --jobs {args.jobs}"
+    print(estimate)
+    missing = [name for name in order if name not in durations]
+    if missing:
+        shown = ", ".join(missing[:10]) + (", ..." if len(missing) > 10 else "")
+        print(f"No deploy history under {runs_dir} for {len(missing)} slice(s), counted as 0s: {shown}")
+    return 0
 
 
 def main():
@@ -2618,7 +4891,7 @@ def main():
     root = Path(args.root).resolve()
 
     if args.command == "update":
-        run_update(root)
+        run_update(root, args.full, args.watch, args.interval)
         return 0
     if args.command == "list":
         run_list(root)
@@ -2635,6 +4908,8 @@ def main():
     if args.command == "install":
         run_install(root, args)
         return 0
+    if args.command == "plan":
+        return run_plan(root, args)
     if args.command == "mermaid":
         run_mermaid(root, args)
         return 0
@@ -2642,6 +4917,11 @@ def main():
         return run_run(root, args)
     if args.command == "replay":
         return run_replay(root, args)
+    if args.command == "stats":
+        if args.stats_command == "install":
+            return run_stats_install(root, args)
+        if args.stats_command == "latency":
+            return run_stats_latency(root, args)
     if args.command == "recipe":
         if args.recipe_command == "compile":
             run_recipe_compile(root)
@@ -1,12 +1,250 @@
+import base64
+import http.client
 import json
+import os
+import socket
+import ssl
+import threading
+import time
 import urllib.error
+import urllib.parse
 import urllib.request
 
 
 DEFAULT_TIMEOUT = 15
+# Idle keep-alive connections kept per worker host and in total; busy ones are not capped.
+POOL_MAX_IDLE_PER_HOST = 4
+POOL_MAX_IDLE_TOTAL = 16
+# Idle connections older than this are closed instead of reused (servers drop them anyway).
+POOL_IDLE_SECONDS = 30.0
+# Phases filled in by WorkerConnectionPool.request(phases=...), in request order.
+REQUEST_PHASES = ("dns_ms", "connect_ms", "tls_ms", "send_ms", "ttfb_ms", "transfer_ms")
 
 
-def render_mermaid(mermaid: str, *, worker_url: str, geary_key: str, id: str | None = None, timeout=DEFAULT_TIMEOUT) -> dict:
+def _elapsed_ms(start: float, end: float) -> float:
+    return round((end - start) * 1000, 2)
+
+
+def _proxy_for(scheme: str, host: str):
+    """The (host, port, Proxy-Authorization value or None) urlopen would use for `host`, or None.
+
+    Reads HTTP_PROXY/HTTPS_PROXY/NO_PROXY (and the platform settings) via urllib.request.
+    """
+    proxy = urllib.request.getproxies().get(scheme)
+    if not proxy or urllib.request.proxy_bypass(host):
+        return None
+    if "://" not in proxy:
+        proxy = f"http://{proxy}"
+    parts = urllib.parse.urlsplit(proxy)
+    if not parts.hostname:
+        return None
+    auth = None
+    if parts.username is not None:
+        userinfo = f"{urllib.parse.unquote(parts.username)}:{urllib.parse.unquote(parts.password or '')}"
+        auth = "Basic " + base64.b64encode(userinfo.encode("utf-8")).decode("ascii")
+    return parts.hostname, parts.port or 80, auth
+
+
+class _TimedHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection whose connect() records DNS and TCP connect time in `self.phases`.
+
+    With set_tunnel() the proxy CONNECT is part of the connect phase, as in HTTPConnection.connect.
+    """
+
+    phases = None
+
+    def connect(self):
+        self.phases = {}
+        started = time.perf_counter()
+        infos = socket.getaddrinfo(self.host, self.port, 0, socket.SOCK_STREAM)
+        resolved = time.perf_counter()
+        self.phases["dns_ms"] = _elapsed_ms(started, resolved)
+        error = None
+        for _family, _type, _proto, _name, address in infos:
+            try:
+                self.sock = socket.create_connection(address[:2], self.timeout, self.source_address)
+                break
+            except OSError as err:
+                error = err
+        else:
+            raise error or OSError(f"no addresses for {self.host}")
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self._tunnel_host:
+            self._tunnel()
+        self.phases["connect_ms"] = _elapsed_ms(resolved, time.perf_counter())
+
+
+class _TimedHTTPSConnection(http.client.HTTPSConnection, _TimedHTTPConnection):
+    """HTTPSConnection that also records the TLS handshake time."""
+
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        total = _elapsed_ms(started, time.perf_counter())
+        self.phases["tls_ms"] = round(max(0.0, total - self.phases["dns_ms"] - self.phases["connect_ms"]), 2)
+
+
+class WorkerConnectionPool:
+    """Keep-alive HTTP/1.1 connections to Mermaid workers, reused across renders.
+
+    Connections are keyed by (scheme, host, port, proxy). Proxies come from the environment as
+    for urlopen: plain HTTP goes through the proxy with absolute URLs, HTTPS is tunnelled with
+    CONNECT, and NO_PROXY hosts are reached directly. After a response that leaves the connection
+    open it goes back to the idle list for that host, within the idle limits, so the next render
+    skips DNS, TCP and TLS setup. A reused connection the server has already closed is replaced
+    once with a fresh one. Network errors are raised as urllib.error.URLError, as urlopen does.
+    Set GEARY_WORKER_KEEPALIVE=0 to close every connection after its response.
+    """
+
+    def __init__(self, max_idle_per_host: int = POOL_MAX_IDLE_PER_HOST, max_idle_total: int = POOL_MAX_IDLE_TOTAL):
+        if os.environ.get("GEARY_WORKER_KEEPALIVE", "1") == "0":
+            max_idle_per_host = max_idle_total = 0
+        self.max_idle_per_host = max_idle_per_host
+        self.max_idle_total = max_idle_total
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._ssl_context = None
+        self.requests = 0
+        self.reused = 0
+
+    def _connect(self, key, timeout):
+        scheme, host, port, proxy = key
+        connect_host, connect_port = (proxy[0], proxy[1]) if proxy else (host, port)
+        if scheme == "https":
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            conn = _TimedHTTPSConnection(connect_host, connect_port, timeout=timeout, context=self._ssl_context)
+            if proxy:
+                conn.set_tunnel(host, port, headers={"Proxy-Authorization": proxy[2]} if proxy[2] else None)
+            return conn
+        return _TimedHTTPConnection(connect_host, connect_port, timeout=timeout)
+
+    def _acquire(self, key, timeout):
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                conn, idle_since = idle.pop()
+                if now - idle_since <= POOL_IDLE_SECONDS:
+                    conn.timeout = timeout
+                    if conn.sock is not None:
+                        conn.sock.settimeout(timeout)
+                    return conn, True
+                conn.close()
+        return self._connect(key, timeout), False
+
+    def _release(self, key, conn):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            total = sum(len(conns) for conns in self._idle.values())
+            if len(idle) < self.max_idle_per_host and total < self.max_idle_total:
+                idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        body: bytes | None = None,
+        headers: dict | None = None,
+        timeout=DEFAULT_TIMEOUT,
+        phases: dict | None = None,
+    ):
+        """Send one request; returns (status, response body bytes, whether the connection was reused).
+
+        When `phases` is given it is filled with REQUEST_PHASES timings in milliseconds: DNS, TCP
+        connect and TLS (all 0 on a reused connection), sending the request, waiting for the
+        response headers (time to first byte, which includes the worker's own processing) and
+        reading the body. After a failure it holds the phases that completed.
+        """
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in {"http", "https"} or not parts.hostname:
+            raise urllib.error.URLError(f"unsupported worker url: {url}")
+        proxy = _proxy_for(parts.scheme, parts.hostname)
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80), proxy)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        headers = dict(headers or {})
+        if proxy and parts.scheme == "http":
+            # A forward proxy takes the absolute URL; HTTPS instead tunnels through it.
+            path = urllib.parse.urlunsplit((parts.scheme, parts.netloc, path, "", ""))
+            if proxy[2]:
+                headers["Proxy-Authorization"] = proxy[2]
+        conn, reused = self._acquire(key, timeout)
+        timings = {} if phases is None else phases
+        while True:
+            timings.clear()
+            try:
+                if conn.sock is None:
+                    try:
+                        conn.connect()
+                    finally:
+                        timings.update(conn.phases or {})
+                for phase in ("dns_ms", "connect_ms", "tls_ms"):
+                    timings.setdefault(phase, 0.0)
+                started = time.perf_counter()
+                conn.request(method, path, body=body, headers=headers)
+                sent = time.perf_counter()
+                timings["send_ms"] = _elapsed_ms(started, sent)
+                response = conn.getresponse()
+                first_byte = time.perf_counter()
+                timings["ttfb_ms"] = _elapsed_ms(sent, first_byte)
+                data = response.read()
+                timings["transfer_ms"] = _elapsed_ms(first_byte, time.perf_counter())
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as err:
+                conn.close()
+                if not reused:
+                    raise urllib.error.URLError(err) from err
+                # The server closed the idle connection before our request reached it.
+                conn, reused = self._connect(key, timeout), False
+            except (OSError, http.client.HTTPException) as err:
+                conn.close()
+                raise urllib.error.URLError(err) from err
+        if response.will_close:
+            conn.close()
+        else:
+            self._release(key, conn)
+        with self._lock:
+            self.requests += 1
+            self.reused += int(reused)
+        return response.status, data, reused
+
+    def reuse_ratio(self) -> float:
+        """Share of requests so far that went over an already open connection."""
+        with self._lock:
+            return round(self.reused / self.requests, 3) if self.requests else 0.0
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn, _ in conns:
+                conn.close()
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def default_pool() -> WorkerConnectionPool:
+    """The process-wide pool shared by every worker call that does not pass its own."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = WorkerConnectionPool()
+        return _default_pool
+
+
+def render_mermaid(
+    mermaid: str,
+    *,
+    worker_url: str,
+    geary_key: str,
+    id: str | None = None,
+    timeout=DEFAULT_TIMEOUT,
+    pool: WorkerConnectionPool | None = None,
+) -> dict:
     if mermaid is None or not mermaid.strip():
         raise ValueError("mermaid must be non-empty")
     if not worker_url:
@@ -19,25 +257,16 @@ def render_mermaid(mermaid: str, *, worker_url: str, geary_key: str, id: str | N
         payload["id"] = id
 
     data = json.dumps(payload).encode("utf-8")
-    request = urllib.request.Request(
-        worker_url,
-        data=data,
-        method="POST",
-        headers={
-            "Content-Type": "application/json",
-            "X-Geary-Key": geary_key,
-        },
-    )
+    headers = {
+        "Content-Type": "application/json",
+        "X-Geary-Key": geary_key,
+    }
 
     try:
-        with urllib.request.urlopen(request, timeout=timeout) as response:
-            status = response.status
-            body = response.read().decode("utf-8")
-    except urllib.error.HTTPError as err:
-        status = err.code
-        body = err.read().decode("utf-8") if err.fp else ""
+        status, raw, _ = (pool or default_pool()).request("POST", worker_url, data, headers, timeout)
     except urllib.error.URLError as err:
         raise RuntimeError(f"request_failed: {err}") from err
+    body = raw.decode("utf-8")
 
     if status == 401:
         raise RuntimeError("unauthorized: check GEARY_KEY")
@@ -1,8 +1,20 @@
 #!/usr/bin/env python3
 import argparse
+import contextlib
+import fnmatch
+import hashlib
 import json
+import os
+import pickle
 import re
+import signal
+import socket
+import stat
 import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 import xml.etree.ElementTree as ET
 from xml.sax.saxutils import escape
@@ -12,6 +24,15 @@ REPORT_SUFFIX = ".report-meta.xml"
 DASHBOARD_SUFFIX = ".dashboard-meta.xml"
 REPORT_FOLDER_SUFFIX = ".reportFolder-meta.xml"
 DASHBOARD_FOLDER_SUFFIX = ".dashboardFolder-meta.xml"
+SCAN_CACHE_NAME = "scan-cache.json"
+SCAN_CACHE_VERSION = 2
+REPORT_REF_TAGS = {"report"}
+DASHBOARD_POOL_MIN = 16
+API_VERSION_CACHE_NAME = "api-version.json"
+CHANGED_FILES_NAME = "changed.json"
+WATCH_INFO_NAME = "watch.json"
+IGNORE_FILES = (".forceignore", ".gitignore")
+ALWAYS_PRUNED_DIRS = {".git", ".sf", ".sfdx", "node_modules"}
 
 TYPE_ORDER = [
     "CustomObject",
@@ -39,6 +60,10 @@ def parse_args():
     parser.add_argument("--manifest-dir", default="manifest", help="Manifest output directory")
     parser.add_argument("--package-dir", action="append", help="Override package directory path (repeatable)")
     parser.add_argument("--include-empty", action="store_true", help="Include empty slices in output")
+    parser.add_argument("--full", action="store_true", help="Ignore the scan cache and re-parse every file")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Workers for package-dir scanning and dashboard parsing")
+    parser.add_argument("--watch", action="store_true", help="Stay resident, regenerate on changes and answer registry queries")
+    parser.add_argument("--interval", type=float, default=0.5, help="Watch poll interval in seconds (default: 0.5)")
     return parser.parse_args()
 
 
@@ -52,15 +77,151 @@ def version_key(version_str):
     return tuple(parts)
 
 
-def detect_api_version(root: Path) -> str:
-    candidates = set()
+def current_umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+def write_if_changed(path: Path, content: str) -> bool:
+    """Atomically replace `path` with `content` unless it already holds exactly those bytes.
+
+    Identical files are left untouched (mtime included) so watchers and mtime-keyed caches
+    downstream see no churn. Changed files are written to a temp file in the same directory
+    and renamed over the target, so readers never observe a half-written manifest.
+    """
+    data = content.encode("utf-8")
+    try:
+        current = path.stat()
+    except FileNotFoundError:
+        mode = 0o666 & ~current_umask()
+    else:
+        if current.st_size == len(data) and path.read_bytes() == data:
+            return False
+        mode = stat.S_IMODE(current.st_mode)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.chmod(tmp_name, mode)
+        os.replace(tmp_name, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_name)
+        raise
+    return True
+
+
+def load_prune_rules(root: Path):
+    rules = []
+    for name in IGNORE_FILES:
+        try:
+            text = (root / name).read_text(encoding="utf-8")
+        except OSError:
+            continue
+        for raw_line in text.splitlines():
+            line = raw_line.strip()
+            # Negations cannot un-prune a directory we never descend into, so they are skipped.
+            if not line or line.startswith("#") or line.startswith("!"):
+                continue
+            pattern = line.strip("/")
+            if pattern.endswith("/**"):
+                pattern = pattern[:-3]
+            if pattern:
+                rules.append((pattern, line.startswith("/") or "/" in pattern))
+    return rules
+
+
+def is_pruned(rel_path: str, name: str, rules) -> bool:
+    if name in ALWAYS_PRUNED_DIRS:
+        return True
+    for pattern, anchored in rules:
+        if not anchored:
+            if fnmatch.fnmatchcase(name, pattern):
+                return True
+            continue
+        if fnmatch.fnmatchcase(rel_path, pattern):
+            return True
+        if pattern.startswith("**/") and fnmatch.fnmatchcase(rel_path, pattern[3:]):
+            return True
+    return False
+
+
+def iter_pruned_files(root: Path, start: Path, rules):
+    pending = [str(start)]
+    while pending:
+        for entry in list_dir(pending.pop()):
+            if entry.is_dir():
+                rel_path = Path(os.path.relpath(entry.path, root)).as_posix()
+                if not is_pruned(rel_path, entry.name, rules):
+                    pending.append(entry.path)
+            else:
+                yield Path(entry.path)
+
+
+def path_mtimes(root: Path, paths):
+    mtimes = {}
+    for path in paths:
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        try:
+            key = path.relative_to(root).as_posix()
+        except ValueError:
+            key = path.as_posix()
+        mtimes[key] = mtime
+    return mtimes
+
+
+def detect_api_version(root: Path, package_dirs=None, cache_path: Path | None = None, refresh: bool = False) -> str:
+    """Highest <version> across manifest/*.xml and package.xml files inside the package dirs.
+
+    Only the manifest dir and package dirs are walked, with .forceignore/.gitignore rules used to
+    prune directories (not files: .forceignore lists package.xml itself). Generated
+    manifest/slice-*.xml files only echo a previously detected version and are skipped. The
+    result is cached against sfdx-project.json, the ignore files, every manifest file and
+    previously found package.xml files; `refresh` forces a rediscovery.
+    """
+    if package_dirs is None:
+        package_dirs = resolve_package_dirs(root, None)
+    rules = load_prune_rules(root)
     manifest_dir = root / "manifest"
-    xml_paths = []
-    if manifest_dir.exists():
-        xml_paths.extend(sorted(manifest_dir.rglob("*.xml")))
-    xml_paths.extend(sorted(root.rglob("package.xml")))
+    manifest_paths = []
+    if manifest_dir.is_dir():
+        manifest_paths = sorted(
+            path
+            for path in iter_pruned_files(root, manifest_dir, rules)
+            if path.suffix == ".xml" and not (path.parent == manifest_dir and path.name.startswith("slice-"))
+        )
+    key_paths = [root / "sfdx-project.json"] + [root / name for name in IGNORE_FILES] + manifest_paths
+    cache_key = path_mtimes(root, key_paths)
+
+    if cache_path is not None and not refresh:
+        try:
+            cached = json.loads(cache_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            cached = None
+        if (
+            isinstance(cached, dict)
+            and cached.get("key") == cache_key
+            and cached.get("packageXml") == path_mtimes(root, [root / rel for rel in cached.get("packageXml", {})])
+            and cached.get("version")
+        ):
+            return cached["version"]
+
+    package_xml_paths = []
+    for package_dir in package_dirs:
+        if package_dir.is_dir():
+            package_xml_paths.extend(
+                path for path in iter_pruned_files(root, package_dir, rules) if path.name == "package.xml"
+            )
+    package_xml_paths = sorted(package_xml_paths)
+
+    candidates = set()
     version_re = re.compile(r"<version>([^<]+)</version>")
-    for path in xml_paths:
+    for path in manifest_paths + package_xml_paths:
         try:
             text = path.read_text(encoding="utf-8")
         except OSError:
@@ -68,9 +229,12 @@ def detect_api_version(root: Path) -> str:
         match = version_re.search(text)
         if match:
             candidates.add(match.group(1).strip())
-    if not candidates:
-        return "60.0"
-    return sorted(candidates, key=version_key)[-1]
+    version = sorted(candidates, key=version_key)[-1] if candidates else "60.0"
+
+    if cache_path is not None:
+        payload = {"key": cache_key, "packageXml": path_mtimes(root, package_xml_paths), "version": version}
+        write_if_changed(cache_path, json.dumps(payload, indent=2, sort_keys=True) + "\n")
+    return version
 
 
 def strip_suffix(name: str, suffix: str) -> str:
@@ -79,32 +243,145 @@ def strip_suffix(name: str, suffix: str) -> str:
     return name
 
 
-def collect_text_nodes(elem):
-    if elem.text:
-        yield elem.text
-    for child in elem:
-        yield from collect_text_nodes(child)
-        if child.tail:
-            yield child.tail
-
-
-def extract_report_refs(texts, known_reports):
-    found = set()
-    missing = set()
+def report_ref_candidates(texts):
+    candidates = set()
     pattern = re.compile(r"[A-Za-z0-9_ \-]+/[A-Za-z0-9_ \-]+")
     for text in texts:
         for match in pattern.findall(text):
             candidate = match.strip()
             if not candidate or "/" not in candidate:
                 continue
-            if candidate in known_reports:
-                found.add(candidate)
-            else:
-                missing.add(candidate)
-    return found, missing
+            candidates.add(candidate)
+    return candidates
+
+
+def local_name(tag: str) -> str:
+    return tag.split("}", 1)[-1] if "}" in tag else tag
 
 
-def write_manifest(path: Path, api_version: str, members_by_type):
+def parse_dashboard_refs(path):
+    """Stream a dashboard with iterparse, reading only report-bearing tags.
+
+    Each top-level child of the root is cleared once closed, so memory stays flat no matter
+    how many components the dashboard carries.
+    """
+    texts = []
+    root = None
+    depth = 0
+    try:
+        for event, elem in ET.iterparse(str(path), events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = elem
+                depth += 1
+                continue
+            depth -= 1
+            if local_name(elem.tag) in REPORT_REF_TAGS and elem.text:
+                texts.append(elem.text)
+            if depth == 1:
+                root.clear()
+    except ET.ParseError:
+        return {"parseError": True, "refs": []}
+    return {"parseError": False, "refs": sorted(report_ref_candidates(texts))}
+
+
+def parse_dashboards(paths, jobs: int):
+    """Parse dashboards in a process pool; results come back in the order of `paths`."""
+    if jobs <= 1 or len(paths) < DASHBOARD_POOL_MIN:
+        return [parse_dashboard_refs(path) for path in paths]
+    chunksize = max(1, len(paths) // (jobs * 4))
+    try:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            return list(pool.map(parse_dashboard_refs, [str(path) for path in paths], chunksize=chunksize))
+    except (OSError, BrokenProcessPool, pickle.PicklingError):
+        # No usable pool (sandboxed /dev/shm, module loaded without an importable name): parse inline.
+        return [parse_dashboard_refs(path) for path in paths]
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ScanCache:
+    """Per-file parse results keyed by path, mtime, size and content hash."""
+
+    def __init__(self, path: Path, root: Path):
+        self.path = path
+        self.root = root
+        self.entries = {}
+        self.seen = set()
+        self.pending = {}
+        self.hits = 0
+        self.misses = 0
+
+    def load(self):
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return
+        if not isinstance(data, dict) or data.get("version") != SCAN_CACHE_VERSION:
+            return
+        files = data.get("files")
+        if isinstance(files, dict):
+            self.entries = files
+
+    def key(self, path: Path) -> str:
+        try:
+            return path.relative_to(self.root).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def cached(self, path: Path):
+        """Return cached data for `path`, or None on a miss (to be followed by `store`)."""
+        # A matching (mtime, size) pair is trusted without reading the file; otherwise the
+        # content hash decides, so a touch or checkout that leaves bytes unchanged is still a hit.
+        key = self.key(path)
+        self.seen.add(key)
+        stat = path.stat()
+        entry = self.entries.get(key)
+        if entry and entry.get("mtime_ns") == stat.st_mtime_ns and entry.get("size") == stat.st_size:
+            self.hits += 1
+            return entry["data"]
+        digest = file_sha256(path)
+        if entry and entry.get("sha256") == digest:
+            self.hits += 1
+            entry.update({"mtime_ns": stat.st_mtime_ns, "size": stat.st_size})
+            return entry["data"]
+        self.misses += 1
+        self.pending[key] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": digest}
+        return None
+
+    def store(self, path: Path, data):
+        key = self.key(path)
+        entry = self.pending.pop(key)
+        entry["data"] = data
+        self.entries[key] = entry
+
+    def reset(self):
+        """Start a new pass: clear the hit/miss counters and the set of paths seen."""
+        self.seen = set()
+        self.pending = {}
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, path: Path, compute):
+        data = self.cached(path)
+        if data is None:
+            data = compute(path)
+            self.store(path, data)
+        return data
+
+    def save(self):
+        files = {key: self.entries[key] for key in sorted(self.seen) if key in self.entries}
+        payload = {"version": SCAN_CACHE_VERSION, "files": files}
+        write_if_changed(self.path, json.dumps(payload, indent=2, sort_keys=True) + "\n")
+
+
+def write_manifest(path: Path, api_version: str, members_by_type) -> bool:
     lines = ["<?xml version=\"1.0\" encoding=\"UTF-8\"?>", "<Package xmlns=\"http://soap.sforce.com/2006/04/metadata\">"]
     for type_name in TYPE_ORDER:
         members = members_by_type.get(type_name, [])
@@ -117,7 +394,7 @@ def write_manifest(path: Path, api_version: str, members_by_type):
         lines.append("  </types>")
     lines.append(f"  <version>{api_version}</version>")
     lines.append("</Package>")
-    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return write_if_changed(path, "\n".join(lines) + "\n")
 
 
 def _slice_registry_model(elem: ET.Element):
@@ -174,11 +451,7 @@ def round_trip_slice_registry_xml(path: Path) -> bool:
     lines = ['<?xml version="1.0" encoding="UTF-8"?>']
     _render_slice_registry_elem(model, 0, lines)
     rendered = "\n".join(lines) + "\n"
-    current = path.read_text(encoding="utf-8")
-    if current == rendered:
-        return False
-    path.write_text(rendered, encoding="utf-8")
-    return True
+    return write_if_changed(path, rendered)
 
 
 def ensure_alias_file(alias_path: Path, slice_names):
@@ -224,10 +497,9 @@ def ensure_alias_file(alias_path: Path, slice_names):
         for alias in sorted(valid):
             lines.extend(alias_lines(alias, valid[alias]))
             added += 1
-        alias_path.parent.mkdir(parents=True, exist_ok=True)
-        alias_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        changed = write_if_changed(alias_path, "\n".join(lines) + "\n")
         print(f"aliases: added {added}, skipped {skipped_exists} (already exists), skipped {skipped_missing} (missing target slice)")
-        return
+        return changed
 
     content = alias_path.read_text(encoding="utf-8")
     lines = content.splitlines()
@@ -262,8 +534,9 @@ def ensure_alias_file(alias_path: Path, slice_names):
     if to_add:
         lines[insert_at:insert_at] = to_add
 
-    alias_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    changed = write_if_changed(alias_path, "\n".join(lines) + "\n")
     print(f"aliases: added {added}, skipped {skipped_exists} (already exists), skipped {skipped_missing} (missing target slice)")
+    return changed
 
 
 def resolve_package_dirs(root: Path, override_paths):
@@ -286,6 +559,196 @@ def resolve_package_dirs(root: Path, override_paths):
     return [root / "force-app"]
 
 
+# Member-bearing directories directly under main/default whose entries are classified by
+# suffix alone: directory name -> (scan key, suffixes).
+SUFFIX_DIRS = {
+    "flows": ("flows", (FLOW_SUFFIX,)),
+    "classes": ("apex_classes", (".cls", ".cls-meta.xml")),
+    "triggers": ("apex_triggers", (".trigger", ".trigger-meta.xml")),
+    "testSuites": ("apex_test_suites", (".testSuite-meta.xml",)),
+    "cspTrustedSites": ("csp_sites", (".cspTrustedSite-meta.xml",)),
+    "CSPTrustedSites": ("csp_sites", (".cspTrustedSite-meta.xml",)),
+    "csptrustedsites": ("csp_sites", (".cspTrustedSite-meta.xml",)),
+    "permissionsets": ("permission_sets", (".permissionset-meta.xml",)),
+    "profiles": ("profiles", (".profile-meta.xml",)),
+}
+BUNDLE_DIRS = {"lwc": "lwc_bundles", "aura": "aura_bundles"}
+
+
+def empty_scan():
+    return {
+        "flows": [],
+        "apex_classes": [],
+        "apex_triggers": [],
+        "apex_test_suites": [],
+        "lwc_bundles": [],
+        "aura_bundles": [],
+        "csp_sites": [],
+        "permission_sets": [],
+        "profiles": [],
+        "custom_objects": [],
+        "custom_fields": [],
+        "fields_by_object": {},
+        "reports": [],
+        "reports_by_folder": {},
+        "report_folders": set(),
+        "report_folder_meta": set(),
+        "dashboards": [],
+        "dashboards_by_folder": {},
+        "dashboard_folders": set(),
+        "dashboard_folder_meta": set(),
+        "dashboard_paths": [],
+    }
+
+
+def list_dir(path):
+    try:
+        with os.scandir(path) as entries:
+            return list(entries)
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+
+def tree_has_files(path) -> bool:
+    pending = [path]
+    while pending:
+        for entry in list_dir(pending.pop()):
+            if entry.is_file():
+                return True
+            if entry.is_dir():
+                pending.append(entry.path)
+    return False
+
+
+def scan_folder_tree(entries, member_suffix, folder_suffix, by_folder, members, folders, folder_meta, paths=None):
+    for entry in entries:
+        if entry.name.endswith(folder_suffix):
+            folder_meta.add(strip_suffix(entry.name, folder_suffix))
+        if not entry.is_dir():
+            continue
+        folder = entry.name
+        for child in list_dir(entry.path):
+            if not child.name.endswith(member_suffix):
+                continue
+            name = strip_suffix(child.name, member_suffix)
+            members.append(f"{folder}/{name}")
+            by_folder.setdefault(folder, []).append(name)
+            folders.add(folder)
+            if paths is not None:
+                paths.append(Path(child.path))
+
+
+def scan_objects_dir(entries, scan):
+    for obj_entry in sorted(entries, key=lambda item: item.name):
+        if not obj_entry.is_dir():
+            continue
+        obj_api_name = obj_entry.name
+        fields_dir = None
+        for child in list_dir(obj_entry.path):
+            # Custom objects only: standard objects carry fields but no CustomObject member.
+            if child.name == f"{obj_api_name}.object-meta.xml" and obj_api_name.endswith("__c"):
+                scan["custom_objects"].append(obj_api_name)
+            elif child.name == "fields" and child.is_dir():
+                fields_dir = child.path
+        if fields_dir is None:
+            continue
+        for field_entry in sorted(list_dir(fields_dir), key=lambda item: item.name):
+            if not field_entry.name.endswith(".field-meta.xml"):
+                continue
+            field_name = strip_suffix(field_entry.name, ".field-meta.xml")
+            scan["custom_fields"].append(f"{obj_api_name}.{field_name}")
+            scan["fields_by_object"].setdefault(obj_api_name, []).append(field_name)
+
+
+def scan_top_dir(name: str, path, scan):
+    """Classify the members of one `main/default/<name>` directory into `scan`."""
+    if name in SUFFIX_DIRS:
+        key, suffixes = SUFFIX_DIRS[name]
+        for entry in list_dir(path):
+            for suffix in suffixes:
+                if entry.name.endswith(suffix):
+                    scan[key].append(strip_suffix(entry.name, suffix))
+                    break
+    elif name in BUNDLE_DIRS:
+        scan[BUNDLE_DIRS[name]].extend(
+            sorted(entry.name for entry in list_dir(path) if entry.is_dir() and tree_has_files(entry.path))
+        )
+    elif name == "objects":
+        scan_objects_dir(list_dir(path), scan)
+    elif name == "reports":
+        # Sanity: dig-src/main/default/reports/Summit.reportFolder-meta.xml should be detected.
+        scan_folder_tree(
+            list_dir(path),
+            REPORT_SUFFIX,
+            REPORT_FOLDER_SUFFIX,
+            scan["reports_by_folder"],
+            scan["reports"],
+            scan["report_folders"],
+            scan["report_folder_meta"],
+        )
+    elif name == "dashboards":
+        # Sanity: dig-src/main/default/dashboards/Summit.dashboardFolder-meta.xml should be detected.
+        scan_folder_tree(
+            list_dir(path),
+            DASHBOARD_SUFFIX,
+            DASHBOARD_FOLDER_SUFFIX,
+            scan["dashboards_by_folder"],
+            scan["dashboards"],
+            scan["dashboard_folders"],
+            scan["dashboard_folder_meta"],
+            scan["dashboard_paths"],
+        )
+    elif name == "reportFolders":
+        scan["report_folder_meta"].update(
+            strip_suffix(entry.name, REPORT_FOLDER_SUFFIX)
+            for entry in list_dir(path)
+            if entry.name.endswith(REPORT_FOLDER_SUFFIX)
+        )
+    elif name == "dashboardFolders":
+        scan["dashboard_folder_meta"].update(
+            strip_suffix(entry.name, DASHBOARD_FOLDER_SUFFIX)
+            for entry in list_dir(path)
+            if entry.name.endswith(DASHBOARD_FOLDER_SUFFIX)
+        )
+
+
+def scan_package_dir(package_dir: Path):
+    """Classify every member under <package_dir>/main/default, listing each directory once."""
+    scan = empty_scan()
+    for top in list_dir(package_dir / "main" / "default"):
+        if top.is_dir():
+            scan_top_dir(top.name, top.path, scan)
+    return scan
+
+
+def merge_scans(scans):
+    """Fold per-package-dir scans together in the order given."""
+    merged = empty_scan()
+    for scan in scans:
+        for key, value in scan.items():
+            if isinstance(value, set):
+                merged[key].update(value)
+            elif isinstance(value, dict):
+                for name, items in value.items():
+                    merged[key].setdefault(name, []).extend(items)
+            else:
+                merged[key].extend(value)
+    return merged
+
+
+def scan_package_dirs(package_dirs, jobs: int):
+    """Scan each package dir in its own thread and merge in package-dir order.
+
+    The walk is syscall-bound and scandir releases the GIL, so threads overlap the I/O without
+    pickling results across processes. Merging in input order keeps outputs identical to a
+    serial scan.
+    """
+    if jobs <= 1 or len(package_dirs) <= 1:
+        return merge_scans(scan_package_dir(package_dir) for package_dir in package_dirs)
+    with ThreadPoolExecutor(max_workers=min(jobs, len(package_dirs))) as pool:
+        return merge_scans(pool.map(scan_package_dir, package_dirs))
+
+
 def compute_counts(members_by_type):
     return {
         "customObjects": len(members_by_type.get("CustomObject", [])),
@@ -305,9 +768,7 @@ def compute_counts(members_by_type):
     }
 
 
-def main():
-    args = parse_args()
-    root = Path(args.root).resolve()
+def resolve_output_dirs(root: Path, args):
     out_dir_arg = Path(args.out)
     manifest_dir_arg = Path(args.manifest_dir)
     if out_dir_arg.is_absolute():
@@ -325,179 +786,42 @@ def main():
     else:
         manifest_dir_rel = manifest_dir_arg
         manifest_dir = (root / manifest_dir_rel).resolve()
-    api_version = detect_api_version(root)
+    return out_dir, manifest_dir, manifest_dir_rel
 
-    package_dirs = resolve_package_dirs(root, args.package_dir)
 
-    flows = []
-    reports = []
-    dashboards = []
-    apex_classes = []
-    apex_triggers = []
-    apex_test_suites = []
-    lwc_bundles = []
-    aura_bundles = []
-    csp_sites = []
-    permission_sets = []
-    profiles = []
-    custom_objects = []
-    custom_fields = []
-    fields_by_object = {}
-    reports_by_folder = {}
-    dashboards_by_folder = {}
-    report_folders = set()
-    dashboard_folders = set()
-    report_folder_meta = set()
-    dashboard_folder_meta = set()
+def generate(root: Path, args, out_dir: Path, manifest_dir: Path, manifest_dir_rel: Path, package_dirs, scan, scan_cache, refresh: bool = False):
+    """Classify `scan` into slices, rewrite whichever outputs changed and return the registry."""
+    api_version = detect_api_version(
+        root,
+        package_dirs,
+        cache_path=out_dir / API_VERSION_CACHE_NAME,
+        refresh=refresh,
+    )
+
+    flows = scan["flows"]
+    reports = scan["reports"]
+    dashboards = scan["dashboards"]
+    apex_classes = scan["apex_classes"]
+    apex_triggers = scan["apex_triggers"]
+    apex_test_suites = scan["apex_test_suites"]
+    lwc_bundles = scan["lwc_bundles"]
+    aura_bundles = scan["aura_bundles"]
+    csp_sites = scan["csp_sites"]
+    permission_sets = scan["permission_sets"]
+    profiles = scan["profiles"]
+    custom_objects = scan["custom_objects"]
+    custom_fields = scan["custom_fields"]
+    fields_by_object = scan["fields_by_object"]
+    reports_by_folder = scan["reports_by_folder"]
+    dashboards_by_folder = scan["dashboards_by_folder"]
+    report_folders = scan["report_folders"]
+    dashboard_folders = scan["dashboard_folders"]
+    report_folder_meta = scan["report_folder_meta"]
+    dashboard_folder_meta = scan["dashboard_folder_meta"]
     dashboard_refs_by_folder = {}
     dashboard_missing_by_folder = {}
     dashboard_parse_errors = {}
 
-    def bundle_has_files(bundle_path: Path) -> bool:
-        return any(child.is_file() for child in bundle_path.rglob("*"))
-
-    for package_dir in package_dirs:
-        base = package_dir / "main" / "default"
-        flows_dir = base / "flows"
-        classes_dir = base / "classes"
-        triggers_dir = base / "triggers"
-        test_suites_dir = base / "testSuites"
-        lwc_dir = base / "lwc"
-        aura_dir = base / "aura"
-        csp_dirs = [
-            base / "cspTrustedSites",
-            base / "CSPTrustedSites",
-            base / "csptrustedsites",
-        ]
-        permissionsets_dir = base / "permissionsets"
-        profiles_dir = base / "profiles"
-        reports_dir = base / "reports"
-        dashboards_dir = base / "dashboards"
-        report_folders_dir = base / "reportFolders"
-        dashboard_folders_dir = base / "dashboardFolders"
-
-        if flows_dir.exists():
-            flows.extend(
-                strip_suffix(path.name, FLOW_SUFFIX)
-                for path in flows_dir.glob(f"*{FLOW_SUFFIX}")
-            )
-
-        if classes_dir.exists():
-            apex_classes.extend(
-                strip_suffix(path.name, ".cls")
-                for path in classes_dir.glob("*.cls")
-            )
-            apex_classes.extend(
-                strip_suffix(strip_suffix(path.name, ".xml"), ".cls-meta")
-                for path in classes_dir.glob("*.cls-meta.xml")
-            )
-
-        if triggers_dir.exists():
-            apex_triggers.extend(
-                strip_suffix(path.name, ".trigger")
-                for path in triggers_dir.glob("*.trigger")
-            )
-            apex_triggers.extend(
-                strip_suffix(strip_suffix(path.name, ".xml"), ".trigger-meta")
-                for path in triggers_dir.glob("*.trigger-meta.xml")
-            )
-
-        if test_suites_dir.exists():
-            apex_test_suites.extend(
-                strip_suffix(strip_suffix(path.name, ".xml"), ".testSuite-meta")
-                for path in test_suites_dir.glob("*.testSuite-meta.xml")
-            )
-
-        if lwc_dir.exists():
-            lwc_bundles.extend(
-                sorted([p.name for p in lwc_dir.iterdir() if p.is_dir() and bundle_has_files(p)])
-            )
-
-        if aura_dir.exists():
-            aura_bundles.extend(
-                sorted([p.name for p in aura_dir.iterdir() if p.is_dir() and bundle_has_files(p)])
-            )
-
-        for csp_dir in csp_dirs:
-            if not csp_dir.exists():
-                continue
-            csp_sites.extend(
-                strip_suffix(strip_suffix(path.name, ".xml"), ".cspTrustedSite-meta")
-                for path in csp_dir.glob("*.cspTrustedSite-meta.xml")
-            )
-
-        if permissionsets_dir.exists():
-            permission_sets.extend(
-                strip_suffix(strip_suffix(path.name, ".xml"), ".permissionset-meta")
-                for path in permissionsets_dir.glob("*.permissionset-meta.xml")
-            )
-
-        if profiles_dir.exists():
-            profiles.extend(
-                strip_suffix(strip_suffix(path.name, ".xml"), ".profile-meta")
-                for path in profiles_dir.glob("*.profile-meta.xml")
-            )
-
-        # Scan objects directory for CustomObject and CustomField
-        objects_dir = base / "objects"
-        if objects_dir.exists():
-            for obj_path in sorted(objects_dir.iterdir()):
-                if not obj_path.is_dir():
-                    continue
-                obj_api_name = obj_path.name
-                # Check for object-meta.xml (custom objects only)
-                obj_meta = obj_path / f"{obj_api_name}.object-meta.xml"
-                if obj_meta.exists() and obj_api_name.endswith("__c"):
-                    custom_objects.append(obj_api_name)
-                # Scan fields
-                fields_dir = obj_path / "fields"
-                if fields_dir.exists():
-                    for field_path in sorted(fields_dir.glob("*.field-meta.xml")):
-                        field_name = strip_suffix(strip_suffix(field_path.name, ".xml"), ".field-meta")
-                        full_field = f"{obj_api_name}.{field_name}"
-                        custom_fields.append(full_field)
-                        fields_by_object.setdefault(obj_api_name, []).append(field_name)
-
-        if reports_dir.exists():
-            for path in reports_dir.glob(f"*/*{REPORT_SUFFIX}"):
-                folder = path.parent.name
-                name = strip_suffix(path.name, REPORT_SUFFIX)
-                reports.append(f"{folder}/{name}")
-                reports_by_folder.setdefault(folder, []).append(name)
-                report_folders.add(folder)
-
-        if report_folders_dir.exists():
-            report_folder_meta.update(
-                strip_suffix(path.name, REPORT_FOLDER_SUFFIX)
-                for path in report_folders_dir.glob(f"*{REPORT_FOLDER_SUFFIX}")
-            )
-        if reports_dir.exists():
-            # Sanity: dig-src/main/default/reports/Summit.reportFolder-meta.xml should be detected.
-            report_folder_meta.update(
-                strip_suffix(path.name, REPORT_FOLDER_SUFFIX)
-                for path in reports_dir.glob(f"*{REPORT_FOLDER_SUFFIX}")
-            )
-
-        if dashboards_dir.exists():
-            for path in dashboards_dir.glob(f"*/*{DASHBOARD_SUFFIX}"):
-                folder = path.parent.name
-                name = strip_suffix(path.name, DASHBOARD_SUFFIX)
-                dashboards.append(f"{folder}/{name}")
-                dashboards_by_folder.setdefault(folder, []).append(name)
-                dashboard_folders.add(folder)
-
-        if dashboard_folders_dir.exists():
-            dashboard_folder_meta.update(
-                strip_suffix(path.name, DASHBOARD_FOLDER_SUFFIX)
-                for path in dashboard_folders_dir.glob(f"*{DASHBOARD_FOLDER_SUFFIX}")
-            )
-        if dashboards_dir.exists():
-            # Sanity: dig-src/main/default/dashboards/Summit.dashboardFolder-meta.xml should be detected.
-            dashboard_folder_meta.update(
-                strip_suffix(path.name, DASHBOARD_FOLDER_SUFFIX)
-                for path in dashboards_dir.glob(f"*{DASHBOARD_FOLDER_SUFFIX}")
-            )
-
     for folder, names in reports_by_folder.items():
         reports_by_folder[folder] = sorted(names)
     for folder, names in dashboards_by_folder.items():
@@ -522,24 +846,25 @@ def main():
     dashboard_folder_meta = sorted(dashboard_folder_meta)
 
     known_reports = set(reports)
-    for package_dir in package_dirs:
-        dashboards_dir = package_dir / "main" / "default" / "dashboards"
-        if dashboards_dir.exists():
-            for path in dashboards_dir.glob(f"*/*{DASHBOARD_SUFFIX}"):
-                folder = path.parent.name
-                name = strip_suffix(path.name, DASHBOARD_SUFFIX)
-                try:
-                    tree = ET.parse(path)
-                    texts = list(collect_text_nodes(tree.getroot()))
-                    found, missing = extract_report_refs(texts, known_reports)
-                except ET.ParseError:
-                    found, missing = set(), set()
-                    dashboard_parse_errors.setdefault(folder, set()).add(name)
-
-                if found:
-                    dashboard_refs_by_folder.setdefault(folder, set()).update(found)
-                if missing:
-                    dashboard_missing_by_folder.setdefault(folder, set()).update(missing)
+    dashboard_paths = sorted(scan["dashboard_paths"])
+    parsed_by_path = {path: scan_cache.cached(path) for path in dashboard_paths}
+    stale_paths = [path for path in dashboard_paths if parsed_by_path[path] is None]
+    for path, parsed in zip(stale_paths, parse_dashboards(stale_paths, args.jobs)):
+        scan_cache.store(path, parsed)
+        parsed_by_path[path] = parsed
+    for path in dashboard_paths:
+        folder = path.parent.name
+        name = strip_suffix(path.name, DASHBOARD_SUFFIX)
+        parsed = parsed_by_path[path]
+        found = {ref for ref in parsed["refs"] if ref in known_reports}
+        missing = {ref for ref in parsed["refs"] if ref not in known_reports}
+        if parsed["parseError"]:
+            dashboard_parse_errors.setdefault(folder, set()).add(name)
+
+        if found:
+            dashboard_refs_by_folder.setdefault(folder, set()).update(found)
+        if missing:
+            dashboard_missing_by_folder.setdefault(folder, set()).update(missing)
 
     all_report_folders = sorted(set(report_folders) | set(report_folder_meta))
     all_dashboard_folders = sorted(set(dashboard_folders) | set(dashboard_folder_meta))
@@ -837,9 +1162,11 @@ def main():
         if entry.get("dependsOn"):
             entry["dependsOn"] = [dep for dep in entry["dependsOn"] if dep in slice_names]
 
+    changed_files = []
     for name, _, members_by_type in slices:
         manifest_path = manifest_dir / f"slice-{name}.xml"
-        write_manifest(manifest_path, api_version, members_by_type)
+        if write_manifest(manifest_path, api_version, members_by_type):
+            changed_files.append(manifest_path)
 
     registry = {
         "apiVersion": api_version,
@@ -848,10 +1175,9 @@ def main():
     }
 
     out_dir.mkdir(parents=True, exist_ok=True)
-    (out_dir / "slices.json").write_text(
-        json.dumps(registry, indent=2, sort_keys=False) + "\n",
-        encoding="utf-8",
-    )
+    scan_cache.save()
+    if write_if_changed(out_dir / "slices.json", json.dumps(registry, indent=2, sort_keys=False) + "\n"):
+        changed_files.append(out_dir / "slices.json")
 
     md_lines = [
         "# Geary Slices",
@@ -893,13 +1219,27 @@ def main():
         notes = entry.get("notes")
         if notes:
             md_lines.append(f"  notes: {', '.join(notes)}")
-    (out_dir / "slices.md").write_text("\n".join(md_lines) + "\n", encoding="utf-8")
+    if write_if_changed(out_dir / "slices.md", "\n".join(md_lines) + "\n"):
+        changed_files.append(out_dir / "slices.md")
 
-    ensure_alias_file(root / "geary" / "slices.yml", slice_names)
+    alias_path = root / "geary" / "slices.yml"
+    if ensure_alias_file(alias_path, slice_names):
+        changed_files.append(alias_path)
 
     slice_registry_path = root / "docs" / "slices" / "dig.xml"
-    if slice_registry_path.exists():
-        round_trip_slice_registry_xml(slice_registry_path)
+    if slice_registry_path.exists() and round_trip_slice_registry_xml(slice_registry_path):
+        changed_files.append(slice_registry_path)
+
+    changed_rel = []
+    for path in changed_files:
+        try:
+            changed_rel.append(path.relative_to(root).as_posix())
+        except ValueError:
+            changed_rel.append(path.as_posix())
+    # Consumed by later tooling (e.g. deploy skipping) to know which outputs this run touched.
+    write_if_changed(out_dir / CHANGED_FILES_NAME, json.dumps({"changed": changed_rel}, indent=2) + "\n")
+    for rel in changed_rel:
+        print(f"changed: {rel}")
 
     summary = {
         "customObjects": len(custom_objects),
@@ -918,8 +1258,235 @@ def main():
         "reportFolders": len(all_report_folders),
         "dashboardFolders": len(all_dashboard_folders),
         "slices": len(slices),
+        "cacheHits": scan_cache.hits,
+        "cacheMisses": scan_cache.misses,
+        "filesChanged": len(changed_rel),
     }
     print("geary slices: " + json.dumps(summary, sort_keys=True))
+    return registry
+
+
+def path_signature(path):
+    """(mtime_ns, size) of `path`, or None while it does not exist."""
+    try:
+        current = os.stat(path)
+    except OSError:
+        return None
+    return (current.st_mtime_ns, current.st_size)
+
+
+def tree_signature(path, watch_suffixes=()):
+    """Map `path`, each directory below it and files ending in `watch_suffixes` to (mtime_ns, size).
+
+    Membership comes from file names alone, so directory mtimes catch every add, delete and
+    rename; only files whose content is parsed (dashboards) need their own entry. Each directory
+    is stat'ed before it is listed, so a change racing the walk shows up on the next check.
+    """
+    signature = {str(path): path_signature(path)}
+    pending = [str(path)] if signature[str(path)] else []
+    while pending:
+        current = pending.pop()
+        for entry in list_dir(current):
+            if entry.is_dir():
+                signature[entry.path] = path_signature(entry.path)
+                pending.append(entry.path)
+            elif watch_suffixes and entry.name.endswith(watch_suffixes):
+                signature[entry.path] = path_signature(entry.path)
+    return signature
+
+
+def signature_changed(signature) -> bool:
+    return any(path_signature(path) != recorded for path, recorded in signature.items())
+
+
+class RegistryWatcher:
+    """Resident registry for `--watch`: per-directory scans held in memory, patched on change.
+
+    Each `main/default/<type>` directory is scanned and signed separately. A poll only stats the
+    recorded paths; directories whose signature moved are rescanned, the in-memory scans are merged
+    and `generate` rewrites just the manifests and registry files whose content changed.
+    """
+
+    def __init__(self, root: Path, args):
+        self.root = root
+        self.args = args
+        self.out_dir, self.manifest_dir, self.manifest_dir_rel = resolve_output_dirs(root, args)
+        self.scan_cache = ScanCache(self.out_dir / SCAN_CACHE_NAME, root)
+        if not args.full:
+            self.scan_cache.load()
+        self.inputs = None
+        self.package_dirs = []
+        self.bases = {}
+        self.parts = {}
+        self.dirty = True
+        self.registry = None
+        self.generation = 0
+        self.last_update_ms = None
+
+    def input_signature(self):
+        """Repo-level inputs: package dir declarations, ignore rules and hand-written manifests."""
+        signature = tree_signature(self.root / "manifest", (".xml",))
+        for name in ("sfdx-project.json",) + IGNORE_FILES:
+            signature.update(tree_signature(self.root / name))
+        return signature
+
+    def refresh_parts(self) -> bool:
+        changed = False
+        live = set()
+        for package_dir in self.package_dirs:
+            base = package_dir / "main" / "default"
+            known = self.bases.get(package_dir)
+            if known is None or signature_changed(known[0]):
+                # The base directory's own mtime covers type directories coming and going.
+                base_signature = {str(base): path_signature(base)}
+                tops = sorted(entry.name for entry in list_dir(base) if entry.is_dir())
+                self.bases[package_dir] = (base_signature, tops)
+                changed = True
+            for name in self.bases[package_dir][1]:
+                key = (package_dir, name)
+                live.add(key)
+                part = self.parts.get(key)
+                if part is not None and not signature_changed(part[0]):
+                    continue
+                top_path = base / name
+                watch_suffixes = (DASHBOARD_SUFFIX,) if name == "dashboards" else ()
+                signature = tree_signature(top_path, watch_suffixes)
+                scan = empty_scan()
+                scan_top_dir(name, str(top_path), scan)
+                self.parts[key] = (signature, scan)
+                changed = True
+        for key in set(self.parts) - live:
+            del self.parts[key]
+            changed = True
+        for package_dir in set(self.bases) - set(self.package_dirs):
+            del self.bases[package_dir]
+        return changed
+
+    def poll(self) -> bool:
+        """Rescan whatever moved since the last poll; regenerate outputs if anything did."""
+        started = time.perf_counter()
+        inputs = self.input_signature()
+        if inputs != self.inputs:
+            self.inputs = inputs
+            self.package_dirs = resolve_package_dirs(self.root, self.args.package_dir)
+            self.dirty = True
+        if self.refresh_parts():
+            self.dirty = True
+        if not self.dirty:
+            return False
+        scan = merge_scans(
+            self.parts[(package_dir, name)][1]
+            for package_dir in self.package_dirs
+            for name in self.bases[package_dir][1]
+        )
+        self.scan_cache.reset()
+        self.registry = generate(
+            self.root,
+            self.args,
+            self.out_dir,
+            self.manifest_dir,
+            self.manifest_dir_rel,
+            self.package_dirs,
+            scan,
+            self.scan_cache,
+            refresh=self.args.full and self.generation == 0,
+        )
+        # Absorb our own manifest writes so they do not trigger another pass.
+        self.inputs = self.input_signature()
+        self.dirty = False
+        self.generation += 1
+        self.last_update_ms = round((time.perf_counter() - started) * 1000, 1)
+        print(f"watch: generation {self.generation} in {self.last_update_ms} ms")
+        return True
+
+    def status(self):
+        return {
+            "generation": self.generation,
+            "lastUpdateMs": self.last_update_ms,
+            "packageDirs": [str(path) for path in self.package_dirs],
+            "root": str(self.root),
+            "slices": len(self.registry.get("slices", [])) if self.registry else 0,
+            "watchedPaths": sum(len(signature) for signature, _ in self.parts.values()),
+        }
+
+
+def handle_watch_query(conn, watcher: RegistryWatcher):
+    """Answer one newline-delimited JSON request: {"op": "registry"} or {"op": "status"}."""
+    conn.settimeout(5)
+    with conn.makefile("rwb") as stream:
+        try:
+            request = json.loads(stream.readline() or b"{}")
+        except json.JSONDecodeError:
+            request = {}
+        op = request.get("op") if isinstance(request, dict) else None
+        # Poll first so a query issued right after a save sees that save.
+        try:
+            watcher.poll()
+        except OSError as exc:
+            watcher.dirty = True
+            reply = {"ok": False, "error": f"update failed: {exc}"}
+        else:
+            if op == "registry":
+                reply = {"ok": True, "root": str(watcher.root), "generation": watcher.generation, "registry": watcher.registry}
+            elif op == "status":
+                reply = {"ok": True, **watcher.status()}
+            else:
+                reply = {"ok": False, "error": f"unknown op: {op}"}
+        stream.write(json.dumps(reply).encode("utf-8") + b"\n")
+
+
+def run_watch(root: Path, args) -> int:
+    """Poll for changes every `--interval` seconds and serve registry queries on a loopback port.
+
+    The port is published in `<out>/watch.json`, which is removed again on shutdown.
+    """
+    watcher = RegistryWatcher(root, args)
+    watcher.poll()
+    server = socket.create_server(("127.0.0.1", 0))
+    server.settimeout(max(args.interval, 0.05))
+    info_path = watcher.out_dir / WATCH_INFO_NAME
+    port = server.getsockname()[1]
+    info = {"pid": os.getpid(), "port": port, "root": str(root)}
+    write_if_changed(info_path, json.dumps(info, indent=2, sort_keys=True) + "\n")
+    print(f"watch: serving registry queries on 127.0.0.1:{port} (Ctrl-C to stop)", flush=True)
+    # Treat `kill` like Ctrl-C so watch.json is cleaned up either way.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                try:
+                    watcher.poll()
+                except OSError as exc:
+                    # A file vanished mid-scan (branch switch, editor swap file): retry next tick.
+                    watcher.dirty = True
+                    print(f"watch: update failed, retrying: {exc}", file=sys.stderr)
+                sys.stdout.flush()
+                continue
+            with conn:
+                handle_watch_query(conn, watcher)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        with contextlib.suppress(FileNotFoundError):
+            info_path.unlink()
+    return 0
+
+
+def main():
+    args = parse_args()
+    root = Path(args.root).resolve()
+    if args.watch:
+        return run_watch(root, args)
+    out_dir, manifest_dir, manifest_dir_rel = resolve_output_dirs(root, args)
+    package_dirs = resolve_package_dirs(root, args.package_dir)
+    scan_cache = ScanCache(out_dir / SCAN_CACHE_NAME, root)
+    if not args.full:
+        scan_cache.load()
+    scan = scan_package_dirs(package_dirs, args.jobs)
+    generate(root, args, out_dir, manifest_dir, manifest_dir_rel, package_dirs, scan, scan_cache, refresh=args.full)
 
 
 if __name__ == "__main__":